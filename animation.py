@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+애니메이션 프레임 순서 결정 및 인코딩
+자연 정렬, 숫자 정규식, 매니페스트(JSON/CSV, 프레임별 지속시간) 기반 순서 지정
+프레임 크기 통일(잔상 방지)과 WebP/GIF 인코딩
+"""
+
+import csv
+import io
+import json
+import re
+from pathlib import Path
+
+from PIL import Image
+
+from file_utils import natural_sort_key
+
+# 프레임 순서 옵션 (키: 설명)
+FRAME_ORDER_OPTIONS = {
+    "name": "파일명 순 (기본)",
+    "natural": "자연 정렬 (frame2 → frame10)",
+    "regex": "정규식 숫자 기준",
+    "manifest": "매니페스트 파일 (frames.json / frames.csv)",
+}
+
+# 파일명의 마지막 숫자
+DEFAULT_FRAME_PATTERN = r'(\d+)(?!.*\d)'
+
+# 폴더 안에서 자동으로 찾는 매니페스트 파일명 (우선순위 순)
+MANIFEST_NAMES = ("frames.json", "frames.csv", "manifest.json", "manifest.csv")
+
+
+def find_manifest(folder):
+    """폴더에 있는 매니페스트 파일 경로 반환 (없으면 None)"""
+    folder = Path(folder)
+    for name in MANIFEST_NAMES:
+        manifest_path = folder / name
+        if manifest_path.is_file():
+            return manifest_path
+    return None
+
+
+def _parse_duration(value):
+    """지속시간 값 파싱 (비어 있으면 None)"""
+    if value is None or str(value).strip() == "":
+        return None
+    return int(float(value))
+
+
+def load_manifest(manifest_path):
+    """
+    매니페스트 읽기 → [(파일명, 지속시간ms 또는 None), ...]
+    JSON: ["a.png", ...] 또는 [{"file": "a.png", "duration": 120}, ...] 또는 {"frames": [...]}
+    CSV: file,duration 열 (헤더 생략 가능, duration 생략 가능)
+    """
+    manifest_path = Path(manifest_path)
+    entries = []
+
+    if manifest_path.suffix.lower() == ".json":
+        with open(manifest_path, 'r', encoding='utf-8') as manifest_file:
+            data = json.load(manifest_file)
+        if isinstance(data, dict):
+            data = data.get("frames", [])
+        for item in data:
+            if isinstance(item, str):
+                entries.append((item, None))
+            else:
+                entries.append((item["file"], _parse_duration(item.get("duration"))))
+    else:
+        with open(manifest_path, 'r', encoding='utf-8-sig', newline='') as manifest_file:
+            rows = [row for row in csv.reader(manifest_file) if row and row[0].strip()]
+        if rows and rows[0][0].strip().lower() in ("file", "filename", "frame"):
+            rows = rows[1:]
+        for row in rows:
+            duration = row[1] if len(row) > 1 else None
+            entries.append((row[0].strip(), _parse_duration(duration)))
+
+    return entries
+
+
+def order_by_regex(image_files, pattern, log=None):
+    """정규식 첫 번째 그룹(없으면 전체 일치)의 숫자로 정렬, 일치하지 않는 파일은 뒤에 자연 정렬"""
+    regex = re.compile(pattern)
+    matched = []
+    unmatched = []
+    for image_path in image_files:
+        match = regex.search(image_path.stem)
+        try:
+            number = int(match.group(1) if match.groups() else match.group(0))
+        except (AttributeError, TypeError, ValueError):
+            unmatched.append(image_path)
+            continue
+        matched.append((number, natural_sort_key(image_path.name), image_path))
+
+    if unmatched and log is not None:
+        log(f"⚠️ 정규식과 일치하지 않는 프레임 {len(unmatched)}개는 마지막에 배치: "
+            + ", ".join(path.name for path in unmatched[:5]))
+
+    matched.sort(key=lambda item: (item[0], item[1]))
+    unmatched.sort(key=lambda path: natural_sort_key(path.name))
+    return [item[2] for item in matched] + unmatched
+
+
+def order_by_manifest(folder, image_files, manifest_path, log=None):
+    """매니페스트 순서대로 프레임과 지속시간 목록 반환 (같은 프레임 반복 가능)"""
+    files_by_name = {image_path.name: image_path for image_path in image_files}
+    frames = []
+    durations = []
+    for name, duration in load_manifest(manifest_path):
+        image_path = files_by_name.get(name)
+        if image_path is None:
+            candidate = Path(folder) / name
+            if not candidate.is_file():
+                if log is not None:
+                    log(f"⚠️ 매니페스트의 프레임을 찾을 수 없음: {name}")
+                continue
+            image_path = candidate
+        frames.append(image_path)
+        durations.append(duration)
+    return frames, durations
+
+
+def order_frames(folder, image_files, order="name", pattern=DEFAULT_FRAME_PATTERN, log=None):
+    """
+    프레임 순서 결정 → (프레임 경로 목록, 프레임별 지속시간 목록)
+    지속시간이 지정되지 않은 프레임은 None (기본 지속시간 사용)
+    """
+    if order == "manifest":
+        manifest_path = find_manifest(folder)
+        if manifest_path is not None:
+            if log is not None:
+                log(f"📜 매니페스트 사용: {manifest_path.name}")
+            return order_by_manifest(folder, image_files, manifest_path, log=log)
+        if log is not None:
+            log(f"⚠️ 매니페스트 파일({', '.join(MANIFEST_NAMES)})이 없어 자연 정렬 사용")
+        order = "natural"
+
+    if order == "natural":
+        frames = sorted(image_files, key=lambda path: natural_sort_key(path.name))
+    elif order == "regex":
+        frames = order_by_regex(image_files, pattern, log=log)
+    else:
+        # 파일 목록은 이미 파일명 순으로 정렬되어 있음
+        frames = list(image_files)
+    return frames, [None] * len(frames)
+
+
+def center_on_canvas(image, size):
+    """투명 캔버스 중앙에 프레임 배치 (잔상 방지용 크기 통일)"""
+    canvas = Image.new('RGBA', size, (0, 0, 0, 0))
+    x_offset = (size[0] - image.width) // 2
+    y_offset = (size[1] - image.height) // 2
+    canvas.paste(image, (x_offset, y_offset), image)
+    return canvas
+
+
+def save_animation(images, output, format_type="webp", duration=100, loop=True, quality=80, prevent_ghost=True):
+    """
+    프레임 목록을 애니메이션(WebP/GIF)으로 output(파일 경로 또는 파일 객체)에 바로 저장
+    duration: 모든 프레임 공통 지속시간(ms) 또는 프레임별 목록
+    prevent_ghost: disposal=2로 이전 프레임을 지워 잔상 방지 (GIF는 투명 배경도 지정)
+    """
+    options = {
+        'save_all': True,
+        'append_images': images[1:],
+        'duration': duration,
+        'loop': 0 if loop else 1,
+    }
+
+    if format_type == "webp":
+        save_format = 'WEBP'
+        options.update({
+            'lossless': False,
+            'quality': quality,
+            'method': 4  # 균형잡힌 압축 (6에서 4로 변경 - 더 빠름)
+        })
+        if prevent_ghost:
+            options['disposal'] = 2  # 이전 프레임을 배경색으로 대체
+    elif format_type == "gif":
+        save_format = 'GIF'
+        options['optimize'] = True
+        if prevent_ghost:
+            options.update({
+                'disposal': 2,  # 이전 프레임을 배경색으로 대체
+                'transparency': 0,  # 투명도 활성화
+                'background': 0  # 배경 투명
+            })
+    else:
+        raise ValueError(f"지원하지 않는 애니메이션 형식: {format_type}")
+
+    images[0].save(output, format=save_format, **options)
+
+
+def encode_animation(images, format_type="webp", duration=100, loop=True, quality=80, prevent_ghost=True):
+    """애니메이션 bytes (HTTP 응답처럼 파일 없이 보낼 때만, 파일로 저장할 때는 save_animation으로 결과 복사본을 만들지 않음)"""
+    buffer = io.BytesIO()
+    save_animation(images, buffer, format_type, duration, loop, quality, prevent_ghost)
+    return buffer.getvalue()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+asyncio용 배경 제거/애니메이션 API (다른 asyncio 서비스에 넣어서 사용)
+추론과 인코딩은 스레드 풀에서 실행하므로 이벤트 루프가 막히지 않고, 동시 처리 수는 세마포어로 제한
+
+사용 예:
+    async with AsyncRemover(concurrency=2) as remover:
+        image = await remover.remove_image("in.png")
+        async for result in remover.remove_folder("frames", "out"):
+            print(result.source, result.output_path, result.error)
+
+    # 기본 인스턴스를 쓰는 모듈 함수
+    image = await async_api.remove_image("in.png", RemovalSettings(model="isnet-general-use"))
+"""
+
+import asyncio
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+import animation
+import file_utils
+import pipeline
+import processing
+
+DEFAULT_CONCURRENCY = 2
+
+
+@dataclass
+class RemovalResult:
+    """폴더 처리 결과 하나 (끝나는 순서대로 전달)"""
+    source: Path
+    output_path: Optional[Path] = None  # 출력 폴더를 지정한 경우 저장 경로
+    image: Optional[Image.Image] = None  # 출력 폴더를 지정하지 않은 경우 결과 이미지
+    error: Optional[BaseException] = None
+    elapsed_s: float = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class AsyncRemover:
+    """
+    모델 세션과 스레드 풀을 공유하는 비동기 처리기
+    concurrency: 동시에 스레드 풀에서 실행할 작업 수 (추론/인코딩 각각 하나로 계산)
+    취소: await 중인 작업을 취소하면 아직 시작하지 않은 이미지는 실행되지 않음
+          (이미 추론 중인 이미지는 스레드에서 끝까지 실행되지만 결과는 버려짐)
+    """
+
+    def __init__(self, settings=None, concurrency=DEFAULT_CONCURRENCY, executor=None):
+        self.settings = settings or pipeline.RemovalSettings()
+        self.concurrency = max(1, concurrency)
+        self._executor = executor or ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="async-remove")
+        self._owns_executor = executor is None
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._sessions = {}
+        self._session_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """스레드 풀 종료 (직접 만든 경우만, 실행 중인 작업이 끝날 때까지 대기)"""
+        if self._owns_executor:
+            await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    async def run(self, function, *args):
+        """동시 처리 제한 안에서 function을 스레드 풀에서 실행"""
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def get_session(self, model_name):
+        """모델 세션 (처음 한 번만 스레드 풀에서 로딩, 이후 재사용)"""
+        async with self._session_lock:
+            session = self._sessions.get(model_name)
+            if session is None:
+                session = await self.run(pipeline.create_session, model_name)
+                # 무거운 모델은 pipeline이 프로세스에 하나만 유지
+                if pipeline.model_profile(model_name) is None:
+                    self._sessions[model_name] = session
+            return session
+
+    def _remove(self, source, session, settings):
+        """스레드에서 실행: 배경 제거 + 리사이즈 (추론 전 리사이즈 포함)"""
+        source = pipeline.prescale_source(source, settings)
+        return pipeline.resize_image(pipeline.remove_image(source, session, settings), settings)
+
+    async def remove_image(self, source, settings=None):
+        """이미지 하나 배경 제거 → RGBA PIL Image (source: 경로, PIL Image 또는 bytes)"""
+        settings = settings or self.settings
+        session = await self.get_session(settings.model)
+        return await self.run(self._remove, source, session, settings)
+
+    async def encode(self, image, settings=None):
+        """결과 이미지를 설정한 출력 형식의 bytes로 인코딩 (스레드 풀에서 실행)"""
+        settings = settings or self.settings
+        return await self.run(processing.encode_image, image, settings.output_format, settings.png_compress_level)
+
+    async def remove_folder(self, folder, output_folder=None, settings=None):
+        """
+        폴더 이미지 배경 제거 → RemovalResult를 끝나는 순서대로 async for로 전달
+        output_folder를 지정하면 입력 폴더 구조 그대로(같은 이름 덮어쓰기) 저장하고 image는 비워 둠
+        (a.jpg와 a.png처럼 출력 이름이 겹치면 정렬 순서대로 a.png, a_2.png로 저장, 실제 경로는 output_path)
+        실패한 이미지도 error가 채워진 결과로 전달 (나머지는 계속 처리)
+        """
+        settings = settings or self.settings
+        folder = Path(folder)
+        output_folder = Path(output_folder) if output_folder is not None else None
+        session = await self.get_session(settings.model)
+        suffix = processing.OUTPUT_SUFFIXES[settings.output_format]
+        loop = asyncio.get_running_loop()
+
+        # 출력 폴더별 이름 할당기 (실행마다 덮어쓰므로 기존 파일은 사용 중으로 보지 않고, 이번 실행 안의 중복만 구분)
+        allocators = {}
+
+        def allocate(image_path):
+            relative_path = image_path.relative_to(folder).with_suffix(suffix)
+            directory = output_folder / relative_path.parent
+            allocator = allocators.get(directory)
+            if allocator is None:
+                allocator = allocators[directory] = file_utils.PathAllocator(directory, taken=[])
+            return allocator.allocate(relative_path.name)
+
+        def process(image_path, output_path):
+            started = time.perf_counter()
+            image = self._remove(image_path, session, settings)
+            if output_path is None:
+                return RemovalResult(image_path, image=image, elapsed_s=time.perf_counter() - started)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            processing.save_output(image, output_path, settings.output_format, settings.png_compress_level)
+            return RemovalResult(image_path, output_path=output_path, elapsed_s=time.perf_counter() - started)
+
+        async def process_safely(image_path, output_path):
+            try:
+                return await self.run(process, image_path, output_path)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return RemovalResult(image_path, output_path=output_path, error=e)
+
+        image_files = await loop.run_in_executor(
+            self._executor, file_utils.list_image_files, folder, pipeline.SUPPORTED_FORMATS, settings.recursive
+        )
+
+        # 동시에 만들어 두는 작업 수를 제한 (폴더가 커도 대기 작업/결과가 한꺼번에 쌓이지 않음)
+        max_pending = self.concurrency * 2
+        remaining = iter(image_files)
+        pending = set()
+        try:
+            while True:
+                for image_path in remaining:
+                    # 이름은 작업을 넘기기 전에 정렬 순서대로 할당 (동시에 처리되는 이미지가 같은 파일에 쓰지 않도록)
+                    output_path = allocate(image_path) if output_folder is not None else None
+                    pending.add(asyncio.ensure_future(process_safely(image_path, output_path)))
+                    if len(pending) >= max_pending:
+                        break
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            # 소비자가 중간에 멈추거나 취소하면 아직 끝나지 않은 작업 취소
+            for task in pending:
+                task.cancel()
+
+    async def create_animation(self, frames, format_type="webp", duration=100, loop=True, quality=80,
+                               prevent_ghost=True):
+        """프레임(경로 또는 PIL Image) 목록 → 애니메이션 bytes (로딩/합성/인코딩 모두 스레드 풀에서 실행)"""
+        def build():
+            images = []
+            for frame in frames:
+                image = processing.open_input(frame)
+                images.append(image.convert('RGBA') if image.mode != 'RGBA' else image)
+            if prevent_ghost:
+                size = (max(image.width for image in images), max(image.height for image in images))
+                images = [animation.center_on_canvas(image, size) for image in images]
+            return animation.encode_animation(images, format_type, duration, loop, quality, prevent_ghost)
+
+        if len(frames) < 2:
+            raise ValueError("애니메이션을 만들려면 최소 2개 이상의 프레임이 필요합니다")
+        return await self.run(build)
+
+
+# 이벤트 루프별 기본 처리기 (세마포어/락은 처음 사용한 루프에 묶이므로 루프마다 따로 생성)
+_default_removers = weakref.WeakKeyDictionary()
+
+
+def get_default_remover():
+    """모듈 함수가 함께 쓰는 현재 이벤트 루프의 기본 처리기 (처음 호출할 때 생성)"""
+    loop = asyncio.get_running_loop()
+    remover = _default_removers.get(loop)
+    if remover is None:
+        remover = _default_removers[loop] = AsyncRemover()
+    return remover
+
+
+async def remove_image(source, settings=None):
+    """기본 처리기로 이미지 하나 배경 제거 → RGBA PIL Image"""
+    return await get_default_remover().remove_image(source, settings)
+
+
+async def remove_folder(folder, output_folder=None, settings=None):
+    """기본 처리기로 폴더 배경 제거 (async for로 끝나는 순서대로 결과 전달)"""
+    async for result in get_default_remover().remove_folder(folder, output_folder, settings):
+        yield result
+
+
+async def create_animation(frames, format_type="webp", **options):
+    """기본 처리기로 애니메이션 생성 → bytes"""
+    return await get_default_remover().create_animation(frames, format_type, **options)
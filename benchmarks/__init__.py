@@ -0,0 +1,4 @@
+"""
+성능 벤치마크 (합성 코퍼스, 모델이 없으면 대체 모델 사용)
+실행: 프로젝트 폴더에서 python -m benchmarks
+"""
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+벤치마크용 합성 입력 생성 (오프라인, 시드 고정으로 매번 같은 결과)
+도트 스프라이트(단색 배경), 대용량 그라디언트 사진, 애니메이션 프레임 시퀀스
+"""
+
+from pathlib import Path
+
+from PIL import Image
+import numpy as np
+
+# 코퍼스 구성 (quick: 빠른 확인용 축소 구성)
+CORPORA = {
+    "full": {"sprites": 64, "photos": 4, "photo_size": (3000, 2000), "frames": 48},
+    "quick": {"sprites": 16, "photos": 2, "photo_size": (1600, 1200), "frames": 12},
+}
+
+CORPUS_FOLDERS = ("sprites", "photos", "frames")
+
+SPRITE_SIZE = 32
+SPRITE_SCALE = 4  # 도트 그대로 확대 (최근접 보간)
+
+
+def make_sprite(rng, size=SPRITE_SIZE, scale=SPRITE_SCALE, offset=(0, 0)):
+    """단색 배경 위 대칭형 도트 캐릭터 (팔레트 4색, 최근접 확대)"""
+    background = rng.integers(180, 256, 3)
+    palette = rng.integers(0, 160, (4, 3))
+
+    half = size // 2
+    body = rng.integers(0, 5, (size - 8, half - 4))  # 0은 빈칸
+    body[rng.random(body.shape) < 0.35] = 0
+    body = np.hstack([body, body[:, ::-1]])  # 좌우 대칭
+
+    pixels = np.empty((size, size, 3), np.uint8)
+    pixels[:] = background
+    top, left = 4 + offset[1], 4 + offset[0]
+    region = pixels[top:top + body.shape[0], left:left + body.shape[1]]
+    filled = body[:region.shape[0], :region.shape[1]]
+    region[filled > 0] = palette[filled[filled > 0] - 1]
+
+    image = Image.fromarray(pixels, 'RGB')
+    return image.resize((size * scale, size * scale), Image.Resampling.NEAREST)
+
+
+def make_photo(rng, size):
+    """그라디언트 배경 + 노이즈 + 타원형 피사체가 있는 사진풍 이미지"""
+    width, height = size
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+    start, end = rng.integers(0, 256, (2, 3)).astype(np.float32)
+    t = (xx / width * 0.7 + yy / height * 0.3)[..., None]
+    pixels = start * (1 - t) + end * t
+
+    # 피사체: 부드러운 경계의 타원
+    cx, cy = width * rng.uniform(0.4, 0.6), height * rng.uniform(0.4, 0.6)
+    rx, ry = width * rng.uniform(0.15, 0.25), height * rng.uniform(0.2, 0.3)
+    distance = ((xx - cx) / rx) ** 2 + ((yy - cy) / ry) ** 2
+    subject = np.clip((1.1 - distance) * 4, 0, 1)[..., None]
+    color = rng.integers(0, 256, 3).astype(np.float32)
+    pixels = pixels * (1 - subject) + color * subject
+
+    pixels += rng.normal(0, 6, pixels.shape).astype(np.float32)
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), 'RGB')
+
+
+def write_corpus(root, profile="quick", seed=0):
+    """
+    root 아래에 코퍼스 폴더 생성 → {'sprites': 폴더, 'photos': 폴더, 'frames': 폴더}
+    같은 profile/seed면 항상 같은 이미지가 생성됨
+    """
+    config = CORPORA[profile]
+    root = Path(root)
+    rng = np.random.default_rng(seed)
+    folders = {name: root / name for name in CORPUS_FOLDERS}
+    for folder in folders.values():
+        folder.mkdir(parents=True, exist_ok=True)
+
+    for index in range(config["sprites"]):
+        make_sprite(rng).save(folders["sprites"] / f"sprite_{index:03d}.png")
+
+    for index in range(config["photos"]):
+        make_photo(rng, config["photo_size"]).save(folders["photos"] / f"photo_{index:03d}.jpg", quality=90)
+
+    # 애니메이션: 같은 캐릭터가 조금씩 움직이는 프레임 (시드 고정 스프라이트를 위치만 이동)
+    frame_seed = int(rng.integers(0, 2 ** 31))
+    for index in range(config["frames"]):
+        frame_rng = np.random.default_rng(frame_seed)
+        offset = (index % 4, (index // 4) % 3)
+        make_sprite(frame_rng, offset=offset).save(folders["frames"] / f"frame_{index}.png")
+
+    return folders
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+배경 제거/애니메이션 성능 벤치마크
+합성 코퍼스로 GUI 없이 실제 처리 경로(pipeline.process_folder, animation.save_animation)를 실행하고
+케이스별 처리 속도와 단계별 시간을 JSON으로 저장 (커밋 간 비교용)
+
+사용 예 (프로젝트 폴더에서):
+    python -m benchmarks                                  # 빠른 구성, 모델이 없으면 대체 모델 사용
+    python -m benchmarks --profile full --model u2netp
+    python -m benchmarks --compare benchmarks/results/이전결과.json
+"""
+
+import argparse
+import importlib.metadata
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+import animation
+import file_utils
+import metrics
+import pipeline
+from benchmarks.corpora import CORPORA, CORPUS_FOLDERS, write_corpus
+from benchmarks.stub_model import StubSession, model_cached
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# 결과에 버전을 기록할 패키지
+TRACKED_PACKAGES = ("pillow", "numpy", "rembg", "onnxruntime", "pymatting", "scipy")
+
+
+def removal_cases():
+    """배경 제거 케이스: 이름 → (코퍼스 폴더, 설정)"""
+    return {
+        "remove_sprites_png": ("sprites", pipeline.RemovalSettings()),
+        "remove_sprites_webp": ("sprites", pipeline.RemovalSettings(output_format="webp")),
+        "remove_photos": ("photos", pipeline.RemovalSettings()),
+        "remove_photos_proxy": ("photos", pipeline.RemovalSettings(proxy_inference=True, proxy_max_side=1024)),
+        "remove_photos_proxy_matting": ("photos", pipeline.RemovalSettings(
+            proxy_inference=True, proxy_max_side=1024, alpha_matting=True,
+            foreground_threshold=240, background_threshold=10, erode_size=10
+        )),
+    }
+
+
+def run_removal(folder, output_root, session, settings):
+    """폴더 배경 제거 1회 → 실행 리포트"""
+    output_folder = pipeline.create_output_folder(folder, output_root)
+    stats = pipeline.process_folder(folder, output_folder, settings, session=session)
+    if stats['failed']:
+        raise RuntimeError(f"{stats['failed']}개 이미지 처리 실패")
+    return stats['report']
+
+
+def run_animation(folder, output_root, format_type):
+    """프레임 로딩 → 크기 통일 → 파일로 인코딩 1회 (GUI create_single_animation과 같은 단계) → 실행 리포트"""
+    timer = metrics.StageTimer()
+    frames = file_utils.list_image_files(folder, pipeline.SUPPORTED_FORMATS, natural=True)
+
+    images = []
+    for frame_path in frames:
+        with timer.stage("decode"):
+            image = Image.open(frame_path).convert('RGBA')
+        images.append(image)
+        timer.count_item()
+
+    size = (max(image.width for image in images), max(image.height for image in images))
+    with timer.stage("compose"):
+        images = [animation.center_on_canvas(image, size) for image in images]
+
+    output_path = Path(output_root) / f"{Path(folder).name}.{format_type}"
+    with timer.stage("encode"):
+        with file_utils.atomic_output(output_path) as temp_path:
+            animation.save_animation(images, temp_path, format_type)
+
+    return timer.report(frames=len(images), size_bytes=output_path.stat().st_size)
+
+
+def load_or_write_corpus(corpus_root, profile, seed, log):
+    """생성이 끝난 코퍼스가 있으면 재사용, 없으면 생성 (완료 표시 파일로 중단된 생성은 다시 만듦)"""
+    marker = corpus_root / ".complete"
+    if marker.exists():
+        return {name: corpus_root / name for name in CORPUS_FOLDERS}
+
+    log(f"🧪 코퍼스 생성: {corpus_root}")
+    folders = write_corpus(corpus_root, profile, seed)
+    marker.touch()
+    return folders
+
+
+def matting_available():
+    try:
+        import pymatting
+        import scipy
+        return True
+    except ImportError:
+        return False
+
+
+def collect_meta(args, model_name):
+    """실행 환경 정보 (커밋, 파이썬/패키지 버전, CPU 수)"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    versions = {}
+    for package in TRACKED_PACKAGES:
+        try:
+            versions[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            versions[package] = None
+
+    return {
+        'commit': commit,
+        'created_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'profile': args.profile,
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'model': model_name,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': versions,
+    }
+
+
+def run_case(name, run_once, repeat, log):
+    """케이스를 repeat회 실행 → 처리 속도 중앙값 실행의 리포트 + 전체 실행 속도"""
+    reports = []
+    for _ in range(repeat):
+        reports.append(run_once())
+    reports.sort(key=lambda report: report['items_per_sec'] or 0)
+    result = reports[len(reports) // 2]
+    result['runs_items_per_sec'] = [report['items_per_sec'] for report in reports]
+    log(f"  {name:<30} {result['items_per_sec']:>10.2f} 개/초  ({result['items']}개, {result['elapsed_s']:.2f}s)")
+    return result
+
+
+def compare_results(current, baseline, threshold, log):
+    """이전 결과와 케이스별 처리 속도 비교 → 기준보다 느려진 케이스 목록"""
+    regressions = []
+    log(f"\n📊 비교 기준: {baseline['meta'].get('commit')} ({baseline['meta'].get('created_at')})")
+    for name, result in current['cases'].items():
+        base = baseline['cases'].get(name)
+        if not base or not base.get('items_per_sec') or not result.get('items_per_sec'):
+            log(f"  {name:<30} (비교 대상 없음)")
+            continue
+        change = result['items_per_sec'] / base['items_per_sec'] - 1
+        marker = ""
+        if change < -threshold:
+            marker = "  ⚠️ 느려짐"
+            regressions.append(name)
+        log(f"  {name:<30} {base['items_per_sec']:>10.2f} → {result['items_per_sec']:>10.2f} 개/초 ({change:+.1%}){marker}")
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="배경 제거/애니메이션 벤치마크")
+    parser.add_argument("--profile", choices=list(CORPORA.keys()), default="quick", help="코퍼스 크기")
+    parser.add_argument("--seed", type=int, default=0, help="코퍼스 생성 시드")
+    parser.add_argument("--repeat", type=int, default=3, help="케이스별 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--model", default="u2netp", help="사용할 rembg 모델 (캐시되어 있지 않으면 대체 모델)")
+    parser.add_argument("--stub", action="store_true", help="모델이 있어도 대체 모델 사용")
+    parser.add_argument("--cases", nargs="+", help="실행할 케이스 이름 (기본값: 전체)")
+    parser.add_argument("--corpus-dir", help="코퍼스를 만들어 둘 폴더 (지정하지 않으면 임시 폴더)")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본값: benchmarks/results/시각-커밋.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.10, help="느려짐으로 표시할 처리 속도 감소 비율")
+    parser.add_argument("--fail-on-regression", action="store_true", help="느려진 케이스가 있으면 종료 코드 1")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    log = print
+
+    if args.stub or not model_cached(args.model):
+        if not args.stub:
+            log(f"⚠️ 모델 '{args.model}' 파일이 없어 대체 모델(stub)로 측정합니다.")
+        session, model_name = StubSession(), "stub"
+    else:
+        session, model_name = pipeline.create_session(args.model, log=log), args.model
+
+    cases = {}
+    for name, (corpus, settings) in removal_cases().items():
+        if settings.alpha_matting and not matting_available():
+            log(f"⚠️ {name}: Alpha Matting 라이브러리가 없어 건너뜀")
+            continue
+        cases[name] = ("removal", corpus, settings)
+    for format_type in ("webp", "gif"):
+        cases[f"animation_{format_type}"] = ("animation", "frames", format_type)
+    if args.cases:
+        unknown = set(args.cases) - set(cases)
+        if unknown:
+            log(f"❌ 알 수 없는 케이스: {', '.join(sorted(unknown))} (가능: {', '.join(cases)})")
+            return 2
+        cases = {name: case for name, case in cases.items() if name in args.cases}
+
+    with tempfile.TemporaryDirectory(prefix="removebg-bench-") as temp_dir:
+        corpus_root = Path(args.corpus_dir) if args.corpus_dir else Path(temp_dir) / "corpus"
+        corpus_root = corpus_root / f"{args.profile}-{args.seed}"
+        folders = load_or_write_corpus(corpus_root, args.profile, args.seed, log)
+        output_root = Path(temp_dir) / "output"
+
+        results = {'meta': collect_meta(args, model_name), 'cases': {}}
+        log(f"🚀 벤치마크 시작 (구성: {args.profile}, 모델: {model_name}, 반복: {args.repeat})")
+        for name, (kind, corpus, option) in cases.items():
+            if kind == "removal":
+                run_once = lambda: run_removal(folders[corpus], output_root / name, session, option)
+            else:
+                run_once = lambda: run_animation(folders[corpus], output_root / name, option)
+            (output_root / name).mkdir(parents=True, exist_ok=True)
+            results['cases'][name] = run_case(name, run_once, max(1, args.repeat), log)
+
+    output_path = Path(args.output) if args.output else (
+        RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{results['meta']['commit'] or 'unknown'}.json"
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as output_file:
+        json.dump(results, output_file, ensure_ascii=False, indent=2)
+    log(f"📄 결과 저장: {output_path}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare_results(results, baseline, args.threshold, log)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
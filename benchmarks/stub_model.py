@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+벤치마크용 초소형 대체 모델
+모델 파일이 캐시되어 있지 않은 환경(오프라인 CI 등)에서 rembg 세션 대신 사용
+실제 모델처럼 320x320 축소본에서 마스크를 계산한 뒤 원본 크기로 확대 (배경색 거리 기준)
+"""
+
+from PIL import Image, ImageFilter
+import numpy as np
+from rembg.sessions.base import BaseSession
+
+import model_variants
+
+MODEL_INPUT_SIZE = (320, 320)
+
+
+class StubSession(BaseSession):
+    """모서리 색상을 배경으로 보고 색 거리로 전경 마스크를 만드는 세션 (ONNX 없음)"""
+
+    def __init__(self, model_name="stub"):
+        # BaseSession.__init__은 ONNX 모델을 내려받으므로 호출하지 않음
+        self.model_name = model_name
+
+    def predict(self, img, *args, **kwargs):
+        small = np.asarray(img.convert('RGB').resize(MODEL_INPUT_SIZE, Image.Resampling.BILINEAR), np.float32)
+        corners = np.stack([small[0, 0], small[0, -1], small[-1, 0], small[-1, -1]])
+        background = np.median(corners, axis=0)
+        distance = np.sqrt(((small - background) ** 2).sum(axis=2))
+        mask = np.clip((distance - 20) * 8, 0, 255).astype(np.uint8)
+
+        mask_image = Image.fromarray(mask, 'L').filter(ImageFilter.GaussianBlur(1))
+        return [mask_image.resize(img.size, Image.Resampling.BILINEAR)]
+
+
+def model_cached(model_name):
+    """rembg 모델 파일이 이미 내려받아져 있는지 확인 (네트워크 접근 없음)"""
+    return model_variants.model_downloaded(model_name)
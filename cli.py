@@ -0,0 +1,674 @@
+#!/usr/bin/env python3
+"""
+명령줄 배경 제거 도구
+GUI와 같은 작업 저장소를 사용하므로, 중단된 작업은 resume으로 완료된 파일 다음부터 이어서 처리
+
+사용 예:
+    python cli.py remove ./images --model u2netp --resize 512x512
+    python cli.py resume
+    python cli.py jobs
+    python cli.py watch ./frames --animate webp   # 새로 들어오는 파일을 계속 처리
+    python cli.py --profile cpu remove ./images   # 프로파일 결과는 transparent/에 저장
+    python cli.py remove /mnt/shared/images --shard 2/4 --work-stealing   # 여러 컴퓨터로 나눠 처리
+    python cli.py merge-reports /mnt/shared/transparent/images           # 노드별 리포트 합치기
+    python cli.py remove ./images --workers 4     # 작업자 프로세스 4개로 동시 추론
+    python cli.py optimize-model u2net --kind int8 ort --compare ./images   # CPU용 최적화 모델 생성/비교
+    python cli.py compare-models ./images --ground-truth ./masks   # 모델별 속도/메모리/품질 비교
+    python cli.py sweep ./images --fg 200:270:35 --bg 5,10,20 --erode 5,10   # Alpha Matting 값 탐색
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+from pathlib import Path
+
+# 값을 받는 공통 옵션 (명령 이름을 찾을 때 값은 건너뜀)
+_GLOBAL_VALUE_OPTIONS = ("--store", "--output-root", "--profile")
+
+
+def _forks_workers(argv):
+    """
+    작업자 프로세스를 fork할 수 있는 명령인지 (모듈을 불러오기 전, argparse보다 먼저 판단해야 하므로 인자를 직접 확인)
+    resume(저장된 작업에 작업자 수가 있을 수 있음), sweep, remove --workers N(2 이상)
+    """
+    command = None
+    args = iter(argv)
+    for arg in args:
+        if arg in _GLOBAL_VALUE_OPTIONS:
+            next(args, None)
+        elif not arg.startswith("-"):
+            command = arg
+            break
+    if command in ("resume", "sweep"):
+        return True
+    if command != "remove":
+        return False
+    rest = list(args)
+    for index, arg in enumerate(rest):
+        if arg.startswith("--workers="):
+            value = arg.split("=", 1)[1]
+        elif arg == "--workers" and index + 1 < len(rest):
+            value = rest[index + 1]
+        else:
+            continue
+        try:
+            return int(value) > 1
+        except ValueError:
+            return False
+    return False
+
+
+# pymatting(numba) 병렬 처리 방식: TBB/OpenMP는 fork한 작업자 프로세스가 있으면 종료할 때 멈출 수 있으므로
+# 작업자를 fork하는 명령만 fork에 안전한 workqueue 사용 (GUI, 서버, async_api 등은 numba 기본값 그대로)
+# pymatting은 불러올 때 병렬 함수를 컴파일하며 스레드를 시작하므로 rembg(pipeline)보다 먼저 정해야 함, 이미 지정한 값은 그대로 사용
+if __name__ == "__main__" and _forks_workers(sys.argv[1:]):
+    os.environ.setdefault("NUMBA_THREADING_LAYER", "workqueue")
+
+import file_utils
+import metrics
+import model_benchmark
+import model_variants
+import pipeline
+import processing
+import profiling
+import sharding
+import sweep
+import watcher
+import worker_pool
+from job_store import DEFAULT_STORE_PATH, JobStore
+
+
+def log(message):
+    """로그 메시지 출력"""
+    print(message, flush=True)
+
+
+def parse_size(text):
+    """'가로x세로' 형식 크기 파싱"""
+    try:
+        width, height = (int(value) for value in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"크기는 가로x세로 형식이어야 합니다: {text}")
+    return width, height
+
+
+def parse_values(text):
+    """'200,240,270' 또는 '시작:끝:간격' 형식 값 목록 파싱 (argparse 타입)"""
+    try:
+        return sweep.parse_values(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_shard(text):
+    """'i/N' 형식 분할 지정 파싱 (argparse 타입)"""
+    try:
+        return sharding.parse_shard(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_settings(args):
+    """명령줄 인자로 처리 설정 생성"""
+    settings = pipeline.RemovalSettings(
+        model=args.model,
+        alpha_matting=args.alpha_matting,
+        foreground_threshold=args.fg_threshold,
+        background_threshold=args.bg_threshold,
+        erode_size=args.erode_size,
+        proxy_inference=args.proxy is not None,
+        maintain_aspect=not args.stretch,
+        resize_before_inference=args.prescale,
+        compare_resize_accuracy=args.compare,
+        output_format=args.output_format,
+        png_compress_level=min(9, max(0, args.png_level)),
+        encode_workers=max(1, args.encode_workers),
+        recursive=args.recursive,
+        memory_budget_mb=max(0, args.memory_budget),
+        mask_cache=args.mask_cache
+    )
+    if args.proxy is not None:
+        settings.proxy_max_side = args.proxy
+    if args.resize is not None:
+        settings.resize = True
+        settings.resize_width, settings.resize_height = args.resize
+    return settings
+
+
+def run_job(store, job, sessions, output_root, control=None, pools=None):
+    """
+    작업 하나 처리 (출력 폴더가 이미 있으면 완료된 파일을 건너뛰고 이어서 처리) → 결과 통계
+    pools: (모델, 작업자 수)별 RemovalPool (작업 설정에 workers가 있으면 모델을 미리 로딩해 만들고 다음 작업에도 재사용)
+    """
+    job_id = job['id']
+    settings = pipeline.RemovalSettings.from_dict(job['settings'])
+    shard = sharding.ShardSpec.from_dict((job['settings'] or {}).get('shard'))
+    workers = (job['settings'] or {}).get('workers', 0)
+    job_settings = settings.to_dict()
+    if shard is not None:
+        job_settings['shard'] = shard.to_dict()
+    if workers:
+        job_settings['workers'] = workers
+
+    if job['output_folder'] and Path(job['output_folder']).is_dir():
+        output_folder = Path(job['output_folder'])
+        completed = store.completed_files(job_id)
+        log(f"♻️ 이전 작업 이어서 처리 (완료 {len(completed)}개): {output_folder}")
+    elif shard is not None:
+        output_folder = sharding.shared_output_folder(job['folder'], output_root)
+        completed = {}
+        log(f"📁 공유 출력 폴더: {output_folder}")
+    else:
+        output_folder = pipeline.create_output_folder(job['folder'], output_root, log=log)
+        completed = {}
+    store.start_job(job_id, output_folder=output_folder, settings=job_settings)
+
+    files = claim = report_path = locks = None
+    if shard is not None:
+        files, claim, locks = plan_shard(job['folder'], output_folder, settings, shard)
+        report_path = sharding.report_path(output_folder, shard)
+
+    def on_file_done(relative_path, output_path):
+        store.mark_file_done(job_id, relative_path, output_path)
+        if locks is not None:
+            locks.finish(relative_path)
+
+    # 같은 모델은 세션을 한 번만 생성 (작업자 프로세스를 쓰면 각 작업자가 세션을 만듦)
+    session = remove_pool = None
+    if workers and pools is not None:
+        remove_pool = pools.get((settings.model, workers))
+        if remove_pool is None:
+            remove_pool = pools[(settings.model, workers)] = worker_pool.RemovalPool(workers, settings.model, log=log)
+    else:
+        session = sessions.get(settings.model)
+        if session is None:
+            session = pipeline.create_session(settings.model, log=log)
+            # 무거운 모델은 pipeline이 프로세스에 하나만 유지 (다른 무거운 모델 작업이 오면 교체)
+            if pipeline.model_profile(settings.model) is None:
+                sessions[settings.model] = session
+
+    stats = pipeline.process_folder(
+        job['folder'],
+        output_folder,
+        settings,
+        session=session,
+        log=log,
+        completed=completed,
+        on_file_done=on_file_done,
+        control=control,
+        files=files,
+        claim=claim,
+        report_path=report_path,
+        remove_pool=remove_pool
+    )
+    store.finish_job(job_id)
+    if locks is not None and locks.stolen:
+        log(f"🔒 중단된 노드의 오래된 잠금 {locks.stolen}개를 가져와 처리")
+
+    log(f"🎉 처리 완료! ✅ 성공: {stats['success']}개, ❌ 실패: {stats['failed']}개" +
+        (f", ⏭️ 이전 완료: {stats['skipped']}개" if stats['skipped'] else ""))
+    if stats['comparisons']:
+        summary = pipeline.summarize_comparisons(stats['comparisons'])
+        log(f"🔬 정확도 비교 ({summary['count']}개): 평균 IoU={summary['mean_iou']:.4f}, "
+            f"최저 IoU={summary['worst_iou']:.4f}, 평균 알파오차={summary['mean_mad']:.2f}")
+    if stats.get('report') is not None:
+        for line in metrics.format_summary(stats['report']):
+            log(line)
+        if stats.get('report_path'):
+            log(f"📄 실행 리포트: {stats['report_path']}")
+    log(f"📁 결과 저장 위치: {output_folder}")
+    return stats
+
+
+def plan_shard(folder, output_folder, settings, shard):
+    """
+    분할 처리할 파일 목록 → (files, claim, locks)
+    모든 노드가 같은 정렬 목록으로 출력 이름을 정하고, 이 노드 몫(작업 가로채기면 전체)을 처리 순서대로 반환
+    작업 가로채기를 쓰면 출력 폴더의 잠금 파일로 파일마다 한 노드만 처리
+    """
+    image_files = file_utils.list_image_files(folder, pipeline.SUPPORTED_FORMATS, recursive=settings.recursive)
+    planned = sharding.plan_outputs(folder, image_files, processing.OUTPUT_SUFFIXES[settings.output_format])
+    files = sharding.order_for_shard(folder, planned, shard)
+    own = sum(1 for image_path, _output in planned if shard.owns(image_path.relative_to(folder).as_posix()))
+    log(f"🧩 분할 {shard}: 전체 {len(planned)}개 중 {own}개 담당" +
+        (" (끝나면 다른 노드의 남은 파일 가로채기)" if shard.work_stealing else ""))
+    if not shard.work_stealing:
+        return files, None, None
+    locks = sharding.LockDirectory(Path(output_folder) / sharding.LOCK_FOLDER_NAME, shard.owner, shard.lock_timeout)
+    return files, locks.claim, locks
+
+
+def run_jobs(store, jobs, output_root, profile=None):
+    """
+    작업 목록 순서대로 처리 → 종료 코드 (실패한 파일이 있으면 1, 중지되면 130)
+    Ctrl+C 한 번: 현재 이미지를 저장한 뒤 중지 (다음 resume에서 이어서 처리), 두 번: 즉시 종료
+    profile: 'cpu' 또는 'memory'면 전체 실행을 프로파일링해 output_root에 저장
+    """
+    control = pipeline.JobControl()
+
+    def on_interrupt(signum, frame):
+        if control.cancelled:
+            raise KeyboardInterrupt
+        log("⏹️ 중지 요청: 현재 이미지를 마친 뒤 중지합니다. (즉시 종료하려면 Ctrl+C를 한 번 더)")
+        control.cancel()
+
+    previous_handler = signal.signal(signal.SIGINT, on_interrupt)
+    sessions = {}
+    pools = {}
+    failed = 0
+    try:
+        with profiling.profile_run(profile, output_root, "remove", log=log):
+            for job_idx, job in enumerate(jobs):
+                log(f"📁 [{job_idx + 1}/{len(jobs)}] 처리 중: {os.path.basename(job['folder'])}")
+                if not os.path.isdir(job['folder']):
+                    log(f"❌ 폴더를 찾을 수 없음: {job['folder']}")
+                    failed += 1
+                    continue
+                failed += run_job(store, job, sessions, output_root, control=control, pools=pools)['failed']
+    except pipeline.ProcessingCancelled:
+        log("⏹️ 처리가 중지되었습니다. 'python cli.py resume'으로 이어서 처리할 수 있습니다.")
+        return 130
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+        for remove_pool in pools.values():
+            remove_pool.close()
+    return 1 if failed else 0
+
+
+def cmd_remove(args, store):
+    """폴더를 작업으로 등록 후 처리"""
+    settings = build_settings(args)
+    job_settings = settings.to_dict()
+    if args.shard is not None:
+        job_settings['shard'] = sharding.ShardSpec(
+            *args.shard, work_stealing=args.work_stealing, lock_timeout=max(0, args.lock_timeout)
+        ).to_dict()
+    elif args.work_stealing:
+        log("⚠️ --work-stealing은 --shard와 함께 사용해야 합니다. (무시됨)")
+    if args.workers > 1:
+        job_settings['workers'] = args.workers
+    jobs = []
+    for folder in args.folders:
+        folder = os.path.abspath(folder)
+        if not os.path.isdir(folder):
+            log(f"⚠️ 폴더가 아니므로 제외: {folder}")
+            continue
+        jobs.append(store.get_job(store.add_job("remove", folder, job_settings)))
+
+    if not jobs:
+        log("❌ 처리할 폴더가 없습니다.")
+        return 1
+    return run_jobs(store, jobs, args.output_root, profile=args.profile)
+
+
+def cmd_resume(args, store):
+    """끝나지 않은 배경 제거 작업을 저장된 설정으로 이어서 처리"""
+    jobs = store.pending_jobs("remove")
+    if not jobs:
+        log("✅ 이어서 처리할 작업이 없습니다.")
+        return 0
+    log(f"♻️ 끝나지 않은 작업 {len(jobs)}개 이어서 처리")
+    return run_jobs(store, jobs, args.output_root, profile=args.profile)
+
+
+def cmd_watch(args, store):
+    """감시 폴더에 새로 들어오거나 바뀐 이미지를 계속 처리 (Ctrl+C로 중지, 작업 저장소는 사용하지 않음)"""
+    settings = build_settings(args)
+    folders = []
+    for folder in args.folders:
+        folder = os.path.realpath(folder)
+        if not os.path.isdir(folder):
+            log(f"⚠️ 폴더가 아니므로 제외: {folder}")
+            continue
+        folders.append(folder)
+    if not folders:
+        log("❌ 감시할 폴더가 없습니다.")
+        return 1
+
+    control = pipeline.JobControl()
+
+    def on_interrupt(signum, frame):
+        if control.cancelled:
+            raise KeyboardInterrupt
+        log("⏹️ 중지 요청: 현재 이미지를 마친 뒤 중지합니다. (즉시 종료하려면 Ctrl+C를 한 번 더)")
+        control.cancel()
+
+    session = pipeline.create_session(settings.model, log=log)
+    daemon = watcher.WatchDaemon(
+        folders, settings, session,
+        output_root=args.output_root,
+        animation_format=args.animate,
+        animation_duration=args.duration,
+        debounce=args.debounce,
+        log=log
+    )
+    for folder, output_folder in daemon.outputs.items():
+        log(f"📁 감시: {folder} → {output_folder}")
+
+    folder_watcher = watcher.create_watcher(
+        folders, recursive=settings.recursive, polling=args.polling, poll_interval=args.poll_interval, log=log
+    )
+    previous_handler = signal.signal(signal.SIGINT, on_interrupt)
+    try:
+        daemon.run(folder_watcher, control=control)
+    except pipeline.ProcessingCancelled:
+        log("⏹️ 감시를 중지했습니다.")
+        return 130
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+        folder_watcher.close()
+    return 0
+
+
+def cmd_merge_reports(args, store):
+    """분할 처리한 출력 폴더의 노드별 리포트를 run_report.json 하나로 합침"""
+    failed = 0
+    for output_folder in args.output_folders:
+        report_paths = sharding.find_shard_reports(output_folder)
+        if not report_paths:
+            log(f"❌ 노드별 리포트(run_report.shard-*.json)가 없습니다: {output_folder}")
+            failed += 1
+            continue
+        reports = []
+        for report_path in report_paths:
+            with open(report_path, encoding='utf-8') as report_file:
+                reports.append(json.load(report_file))
+        merged = metrics.merge_reports(reports)
+        merged['shard_reports'] = [path.name for path in report_paths]
+        merged_path = metrics.write_report(merged, os.path.join(output_folder, "run_report.json"))
+        log(f"🧩 노드 {len(reports)}개 리포트 합침: 성공 {merged.get('success', 0)}개, 실패 {merged.get('failed', 0)}개")
+        for line in metrics.format_summary(merged):
+            log(line)
+        log(f"📄 실행 리포트: {merged_path}")
+    return 1 if failed else 0
+
+
+def cmd_sweep(args, store):
+    """표본 이미지로 Alpha Matting 조합을 모두 계산해 contact sheet와 조합별 시간 리포트 저장"""
+    folder = Path(args.folder)
+    if not folder.is_dir():
+        log(f"❌ 폴더를 찾을 수 없습니다: {folder}")
+        return 1
+    image_paths = sweep.sample_images(folder, args.sample, recursive=args.recursive)
+    if not image_paths:
+        log(f"❌ 처리할 이미지 파일이 없습니다: {folder}")
+        return 1
+
+    grid = sweep.parameter_grid(args.fg, args.bg, args.erode)
+    log(f"🔬 Alpha Matting 탐색: 표본 {len(image_paths)}장, 조합 {len(grid)}개 "
+        f"(전경 {args.fg}, 배경 {args.bg}, 침식 {args.erode})")
+    session = pipeline.create_session(args.model, log=log)
+    try:
+        report, sheet = sweep.run_sweep(
+            image_paths, grid, session, max_side=args.max_side, workers=args.workers,
+            cell_size=args.cell, log=log
+        )
+    except ImportError as e:
+        log(f"❌ Alpha Matting 라이브러리가 없습니다: {str(e)} (pip install pymatting scipy)")
+        return 1
+    report['model'] = args.model
+    report['folder'] = str(folder)
+
+    output_folder = pipeline.create_output_folder(folder, args.output or sweep.SWEEP_ROOT, log=log)
+    sheet_path = output_folder / "contact_sheet.png"
+    processing.save_output(sheet, sheet_path)
+    report_path = metrics.write_report(report, output_folder / "sweep_report.json")
+
+    log("⏱️ 조합별 이미지당 시간 (p50 / 최대)")
+    for combination in report['combinations']:
+        timing = (f"{combination['p50_ms']:>8.1f} / {combination['max_ms']:>8.1f} ms"
+                  if combination['max_ms'] is not None else "실패")
+        log(f"  fg {combination['fg']:>3} bg {combination['bg']:>3} erode {combination['erode']:>3}  {timing}")
+    log(f"✅ 완료 ({report['elapsed_s']:.1f}s, 실패 {len(report['errors'])}건)")
+    log(f"🖼️ contact sheet: {sheet_path}")
+    log(f"📄 리포트: {report_path}")
+    return 1 if report['errors'] else 0
+
+
+def cmd_optimize_model(args, store):
+    """내려받은 모델로 INT8/ORT 최적화 변형을 만들고 (선택) 표본 이미지로 원본과 속도/마스크 IoU 비교"""
+    created = []
+    failed = 0
+    for kind in args.kind:
+        try:
+            created.append((kind, model_variants.create_variant(args.model, kind, force=args.force, log=log)))
+        except ImportError as e:
+            log(f"❌ {model_variants.VARIANT_KINDS[kind]}에 필요한 패키지가 없습니다: {str(e)} (pip install onnx)")
+            failed += 1
+        except (FileNotFoundError, ValueError) as e:
+            log(f"❌ {str(e)}")
+            failed += 1
+        except Exception as e:
+            log(f"❌ {model_variants.VARIANT_KINDS[kind]} 변형 생성 실패: {str(e)}")
+            failed += 1
+
+    if args.compare and created:
+        image_paths = sweep.sample_images(args.compare, args.sample)
+        if not image_paths:
+            log(f"❌ 비교할 이미지 파일이 없습니다: {args.compare}")
+            return 1
+        images = [processing.load_rgb_image(processing.open_input(path)) for path in image_paths]
+        reference = pipeline.create_session(args.model, log=log)
+        for kind, path in created:
+            name = model_variants.variant_name(args.model, kind)
+            try:
+                variant = model_variants.new_variant_session(name)
+            except Exception as e:
+                log(f"❌ 변형 로딩 실패 ({name}): {str(e)}")
+                failed += 1
+                continue
+            # 첫 실행의 초기화 시간이 섞이지 않도록 한 번씩 먼저 실행
+            reference.predict(images[0])
+            variant.predict(images[0])
+            comparison = model_variants.compare_sessions(images, reference, variant, repeats=args.repeats)
+            comparison.update(model=args.model, variant=name, files=[str(image_path) for image_path in image_paths])
+            report_path = metrics.write_report(comparison, path.with_name(path.name + ".compare.json"))
+            speedup = f"{comparison['speedup']:.2f}배" if comparison['speedup'] else "-"
+            log(f"🔬 {name}: {comparison['reference_ms'] / len(images):.1f}ms → "
+                f"{comparison['variant_ms'] / len(images):.1f}ms/장 ({speedup}), "
+                f"마스크 IoU 평균 {comparison['mean_iou']:.4f} / 최저 {comparison['worst_iou']:.4f}, "
+                f"평균 오차 {comparison['mean_mad']:.2f}")
+            log(f"📄 비교 리포트: {report_path}")
+
+    for kind, path in created:
+        log(f"✅ 모델 선택 목록에 추가됨: {model_variants.variant_name(args.model, kind)} ({path})")
+    return 1 if failed else 0
+
+
+def cmd_compare_models(args, store):
+    """로컬에 있는 모델을 모두 표본 이미지로 실행해 속도/메모리/마스크 품질 비교 리포트 저장"""
+    folder = Path(args.folder)
+    if not folder.is_dir():
+        log(f"❌ 폴더를 찾을 수 없습니다: {folder}")
+        return 1
+    if args.ground_truth and not Path(args.ground_truth).is_dir():
+        log(f"❌ 정답 마스크 폴더를 찾을 수 없습니다: {args.ground_truth}")
+        return 1
+    image_paths = sweep.sample_images(folder, args.sample, recursive=args.recursive)
+    if not image_paths:
+        log(f"❌ 처리할 이미지 파일이 없습니다: {folder}")
+        return 1
+
+    available = model_benchmark.available_models()
+    models = args.models or available
+    missing = [name for name in models if name not in available]
+    if missing:
+        log(f"⚠️ 모델 파일이 없어 제외 (먼저 한 번 실행해서 내려받으세요): {', '.join(missing)}")
+        models = [name for name in models if name in available]
+    if not models:
+        log("❌ 비교할 모델이 없습니다. 모델을 먼저 내려받으세요.")
+        return 1
+    if args.reference and args.reference not in models:
+        log(f"❌ 기준 모델이 비교 대상에 없습니다: {args.reference}")
+        return 1
+
+    log(f"🔬 모델 비교: {', '.join(models)} (표본 {len(image_paths)}장, 반복 {args.repeats}회)")
+    output_folder = pipeline.create_output_folder(folder, args.output or model_benchmark.COMPARE_ROOT, log=log)
+    report = model_benchmark.run_comparison(
+        image_paths, models, output_folder, ground_truth=args.ground_truth, reference=args.reference,
+        repeats=args.repeats, root=folder, log=log
+    )
+    report['folder'] = str(folder)
+    report['min_iou'] = args.min_iou
+    report['recommended'] = model_benchmark.recommend(report, args.min_iou)
+    report_path = metrics.write_report(report, output_folder / "model_report.json")
+
+    log(f"📊 모델별 결과 (품질 기준: {'정답 마스크' if args.ground_truth else report['quality_reference']})")
+    for line in model_benchmark.format_table(report):
+        log(line)
+    if report['recommended']:
+        log(f"✅ 평균 IoU {args.min_iou} 이상 중 가장 빠른 모델: {report['recommended']}")
+    else:
+        log(f"⚠️ 평균 IoU {args.min_iou} 이상인 모델이 없습니다.")
+    log(f"📄 리포트: {report_path}")
+    return 1 if any('error' in result for result in report['models'].values()) else 0
+
+
+def cmd_jobs(args, store):
+    """끝나지 않은 작업 목록 출력 (애니메이션 작업은 GUI에서 이어서 처리)"""
+    jobs = store.pending_jobs("remove") + store.pending_jobs("animate")
+    if not jobs:
+        log("✅ 끝나지 않은 작업이 없습니다.")
+        return 0
+    for job in jobs:
+        completed = len(store.completed_files(job['id']))
+        log(f"[{job['id']}] {job['kind']:<7} {job['status']:<7} 완료 {completed}개  {job['folder']}")
+    return 0
+
+
+def add_removal_arguments(parser):
+    """배경 제거 설정 인자 (remove, watch 공용)"""
+    parser.add_argument("--model", default="u2netp", choices=list(pipeline.model_options().keys()))
+    parser.add_argument("--alpha-matting", action="store_true", help="Alpha Matting으로 경계 개선")
+    parser.add_argument("--fg-threshold", type=int, default=270)
+    parser.add_argument("--bg-threshold", type=int, default=10)
+    parser.add_argument("--erode-size", type=int, default=10)
+    parser.add_argument("--proxy", type=int, nargs="?", const=processing.DEFAULT_PROXY_MAX_SIDE,
+                        metavar="MAX_SIDE", help="대용량 이미지는 축소본으로 추론")
+    parser.add_argument("--resize", type=parse_size, metavar="WxH", help="출력 리사이즈")
+    parser.add_argument("--stretch", action="store_true", help="비율을 유지하지 않고 강제 리사이즈")
+    parser.add_argument("--prescale", action="store_true", help="추론 전에 리사이즈 (속도 우선)")
+    parser.add_argument("--compare", action="store_true", help="원본 해상도 처리 결과와 정확도 비교")
+    parser.add_argument("--output-format", default="png", choices=list(processing.OUTPUT_FORMATS.keys()))
+    parser.add_argument("--png-level", type=int, default=processing.DEFAULT_PNG_COMPRESS_LEVEL)
+    parser.add_argument("--encode-workers", type=int, default=pipeline.DEFAULT_ENCODE_WORKERS)
+    parser.add_argument("--recursive", action="store_true", help="하위 폴더 포함 (폴더 구조 유지)")
+    parser.add_argument("--memory-budget", type=int, default=0, metavar="MB",
+                        help="메모리 예산 (넘을 것 같으면 동시 처리 제한/축소 추론, 0: 제한 없음)")
+    parser.add_argument("--mask-cache", action="store_true",
+                        help="모델 마스크를 캐시해 같은 이미지를 다시 처리할 때 추론 생략 (임계값/리사이즈만 바꿔 재실행)")
+
+
+def build_parser():
+    """명령줄 인자 파서 생성"""
+    parser = argparse.ArgumentParser(description="이미지 폴더 배경 제거 (GUI 없이 실행)")
+    parser.add_argument("--store", default=str(DEFAULT_STORE_PATH),
+                        help="작업 저장소 파일 (기본값: GUI와 같은 jobs.sqlite3)")
+    parser.add_argument("--output-root", default=str(pipeline.OUTPUT_ROOT),
+                        help="결과를 저장할 상위 폴더 (기본값: transparent/)")
+    parser.add_argument("--profile", choices=list(profiling.PROFILE_MODES.keys()),
+                        help="실행 프로파일링 (cpu: cProfile .prof, memory: tracemalloc 스냅샷, 결과 폴더에 저장)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    remove_parser = subparsers.add_parser("remove", help="폴더 배경 제거")
+    remove_parser.add_argument("folders", nargs="+", help="처리할 이미지 폴더")
+    add_removal_arguments(remove_parser)
+    remove_parser.add_argument("--shard", type=parse_shard, metavar="i/N",
+                               help="여러 컴퓨터로 나눠 처리: 파일을 N개로 나눈 중 i번째만 처리 (출력 폴더 공유)")
+    remove_parser.add_argument("--work-stealing", action="store_true",
+                               help="자기 몫을 끝내면 다른 노드의 남은 파일도 잠금 파일로 가져가서 처리")
+    remove_parser.add_argument("--lock-timeout", type=float, default=sharding.DEFAULT_LOCK_TIMEOUT, metavar="SEC",
+                               help="완료되지 않은 잠금을 중단된 노드로 보고 가져갈 시간(초, 0: 가져가지 않음)")
+    remove_parser.add_argument("--workers", type=int, default=0, metavar="N",
+                               help="작업자 프로세스 N개로 여러 장을 동시에 추론 (이미지는 공유 메모리로 전달)")
+    remove_parser.set_defaults(handler=cmd_remove)
+
+    watch_parser = subparsers.add_parser("watch", help="폴더 감시 (새로 들어오거나 바뀐 이미지만 계속 처리)")
+    watch_parser.add_argument("folders", nargs="+", help="감시할 이미지 폴더")
+    add_removal_arguments(watch_parser)
+    watch_parser.add_argument("--animate", choices=["webp", "gif"],
+                              help="프레임이 바뀌면 출력 폴더의 애니메이션을 animation/에 다시 생성")
+    watch_parser.add_argument("--duration", type=int, default=100, help="애니메이션 프레임 지속시간(ms)")
+    watch_parser.add_argument("--debounce", type=float, default=watcher.DEFAULT_DEBOUNCE,
+                              help="마지막 변경 후 처리까지 기다릴 시간(초)")
+    watch_parser.add_argument("--polling", action="store_true", help="inotify 대신 주기적 폴더 검사 사용 (NFS/SMB 공유 폴더는 자동으로 전환)")
+    watch_parser.add_argument("--poll-interval", type=float, default=watcher.DEFAULT_POLL_INTERVAL,
+                              help="주기적 검사 간격(초)")
+    watch_parser.set_defaults(handler=cmd_watch)
+
+    resume_parser = subparsers.add_parser("resume", help="중단된 작업 이어서 처리")
+    resume_parser.set_defaults(handler=cmd_resume)
+
+    jobs_parser = subparsers.add_parser("jobs", help="끝나지 않은 작업 목록")
+    jobs_parser.set_defaults(handler=cmd_jobs)
+
+    merge_parser = subparsers.add_parser("merge-reports", help="분할 처리한 노드별 실행 리포트 합치기")
+    merge_parser.add_argument("output_folders", nargs="+", help="공유 출력 폴더 (transparent/폴더명)")
+    merge_parser.set_defaults(handler=cmd_merge_reports)
+
+    optimize_parser = subparsers.add_parser("optimize-model", help="CPU용 INT8 양자화/ORT 최적화 모델 변형 생성")
+    optimize_parser.add_argument("model", help="원본 모델 (먼저 내려받아져 있어야 함)")
+    optimize_parser.add_argument("--kind", nargs="+", default=["int8"], choices=list(model_variants.VARIANT_KINDS),
+                                 help="만들 변형 (int8: 가중치 INT8 동적 양자화, ort: 그래프 최적화 저장)")
+    optimize_parser.add_argument("--force", action="store_true", help="이미 있는 변형도 다시 생성")
+    optimize_parser.add_argument("--compare", metavar="FOLDER", help="이 폴더의 표본 이미지로 원본과 속도/마스크 IoU 비교")
+    optimize_parser.add_argument("--sample", type=int, default=sweep.DEFAULT_SAMPLE_COUNT, metavar="N",
+                                 help="비교할 표본 이미지 수 (0: 전체)")
+    optimize_parser.add_argument("--repeats", type=int, default=3, help="이미지마다 반복 실행 횟수 (최솟값 사용)")
+    optimize_parser.set_defaults(handler=cmd_optimize_model)
+
+    compare_parser = subparsers.add_parser("compare-models", help="로컬에 있는 모델별 속도/메모리/마스크 품질 비교")
+    compare_parser.add_argument("folder", help="표본 이미지를 고를 폴더")
+    compare_parser.add_argument("--models", nargs="+", choices=list(pipeline.model_options().keys()), metavar="MODEL",
+                                help="비교할 모델 (기본값: 로컬에 내려받아져 있는 모델과 최적화 변형 전체)")
+    compare_parser.add_argument("--ground-truth", metavar="FOLDER",
+                                help="정답 마스크 폴더 (입력 폴더와 같은 구조와 파일 이름, 확장자만 다른 이미지가 있으면 "
+                                     "a.jpg.png처럼 원본 이름 전체, 없으면 기준 모델과 비교)")
+    compare_parser.add_argument("--reference", metavar="MODEL", help="정답 마스크가 없을 때 기준 모델 (기본값: 가장 품질이 높은 모델)")
+    compare_parser.add_argument("--sample", type=int, default=model_benchmark.DEFAULT_SAMPLE_COUNT, metavar="N",
+                                help="표본 이미지 수 (0: 전체)")
+    compare_parser.add_argument("--repeats", type=int, default=3, help="이미지마다 반복 실행 횟수 (최솟값 사용)")
+    compare_parser.add_argument("--min-iou", type=float, default=model_benchmark.DEFAULT_MIN_IOU,
+                                help="추천 모델의 최소 평균 IoU")
+    compare_parser.add_argument("--recursive", action="store_true", help="하위 폴더 이미지도 표본에 포함")
+    compare_parser.add_argument("--output", help="결과 상위 폴더 (기본값: model_compare/)")
+    compare_parser.set_defaults(handler=cmd_compare_models)
+
+    sweep_parser = subparsers.add_parser("sweep", help="Alpha Matting 전경/배경 임계값, 침식 크기 조합 탐색")
+    sweep_parser.add_argument("folder", help="표본 이미지를 고를 폴더")
+    sweep_parser.add_argument("--model", default="u2netp", choices=list(pipeline.model_options().keys()))
+    sweep_parser.add_argument("--fg", type=parse_values, default=[240, 270], metavar="VALUES",
+                              help="전경 임계값 목록 (예: 200,240,270 또는 200:280:20)")
+    sweep_parser.add_argument("--bg", type=parse_values, default=[5, 10, 20], metavar="VALUES",
+                              help="배경 임계값 목록")
+    sweep_parser.add_argument("--erode", type=parse_values, default=[5, 10, 15], metavar="VALUES",
+                              help="침식 크기 목록")
+    sweep_parser.add_argument("--sample", type=int, default=sweep.DEFAULT_SAMPLE_COUNT, metavar="N",
+                              help="폴더에서 고르게 고를 표본 이미지 수 (0: 전체)")
+    sweep_parser.add_argument("--max-side", type=int, default=sweep.DEFAULT_SWEEP_MAX_SIDE, metavar="PX",
+                              help="표본을 이 크기로 줄여서 탐색 (0: 원본 크기)")
+    sweep_parser.add_argument("--workers", type=int, default=0, metavar="N",
+                              help="조합을 나눠 계산할 작업자 프로세스 수 (기본값: 코어 수)")
+    sweep_parser.add_argument("--cell", type=int, default=sweep.DEFAULT_CELL_SIZE, metavar="PX",
+                              help="contact sheet 썸네일 크기")
+    sweep_parser.add_argument("--recursive", action="store_true", help="하위 폴더 이미지도 표본에 포함")
+    sweep_parser.add_argument("--output", help="결과 상위 폴더 (기본값: sweep/)")
+    sweep_parser.set_defaults(handler=cmd_sweep)
+
+    return parser
+
+
+def main(argv=None):
+    """메인 함수"""
+    args = build_parser().parse_args(argv)
+    store = JobStore(args.store)
+    try:
+        return args.handler(args, store)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+파일/경로 유틸리티
+이미지 파일 탐색, 출력 경로 중복 처리 등 GUI와 무관한 파일 시스템 관련 함수들
+"""
+
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+_DIGITS = re.compile(r'(\d+)')
+
+# 쓰는 중인 출력 파일의 임시 확장자 (완료되면 최종 이름으로 교체)
+PARTIAL_SUFFIX = ".part"
+
+
+class PathAllocator:
+    """
+    실행 단위 고유 경로 할당기
+    대상 폴더 목록을 한 번만 읽고, 이후에는 메모리상의 이름 집합으로 중복을 판별
+    (파일마다 exists()를 반복 호출하지 않으므로 네트워크 드라이브에서도 빠름)
+    """
+
+    def __init__(self, folder, taken=None):
+        """taken: 이미 사용 중으로 간주할 이름 목록 (지정하면 폴더를 읽지 않음, 이어서 처리할 때 사용)"""
+        self.folder = Path(folder)
+        self._lock = threading.Lock()
+        if taken is not None:
+            names = taken
+        else:
+            try:
+                names = os.listdir(self.folder)
+            except FileNotFoundError:
+                names = []
+        self._taken = {os.path.normcase(name) for name in names}
+        # (stem, suffix)별 마지막으로 사용한 번호 (다음 탐색 시작점)
+        self._counters = {}
+
+    def allocate(self, filename):
+        """중복되지 않는 경로를 예약 후 반환 (중복 시 stem_2, stem_3 ... 형태)"""
+        file_path = Path(filename)
+        stem = file_path.stem
+        suffix = file_path.suffix
+
+        with self._lock:
+            name = filename
+            if os.path.normcase(name) in self._taken:
+                counter = self._counters.get((stem, suffix), 1) + 1
+                name = f"{stem}_{counter}{suffix}"
+                while os.path.normcase(name) in self._taken:
+                    counter += 1
+                    name = f"{stem}_{counter}{suffix}"
+                self._counters[(stem, suffix)] = counter
+
+            self._taken.add(os.path.normcase(name))
+            return self.folder / name
+
+
+def natural_sort_key(path):
+    """자연 정렬 키 (frame_2가 frame_10보다 앞에 오도록 숫자 부분을 정수로 비교)"""
+    text = str(path)
+    return [
+        (0, int(part), '') if part.isdigit() else (1, 0, part.casefold())
+        for part in _DIGITS.split(text) if part
+    ]
+
+
+def iter_image_files(folder, supported_formats, recursive=False):
+    """
+    os.scandir 기반 이미지 파일 탐색 (발견 즉시 yield, 정렬하지 않음)
+    DirEntry에 캐시된 파일 종류(d_type)를 사용하므로 항목마다 stat 호출이 없음
+    recursive=True이면 하위 폴더까지 탐색 (심볼릭 링크 폴더는 따라가지 않음)
+    """
+    pending_dirs = [os.fspath(folder)]
+    while pending_dirs:
+        current = pending_dirs.pop()
+        subdirs = []
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            if os.path.splitext(entry.name)[1].lower() in supported_formats:
+                                yield Path(entry.path)
+                        elif recursive and entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            # 권한 없음 등으로 읽을 수 없는 폴더는 건너뜀
+            continue
+        # 이름 순서대로 내려가도록 역순으로 쌓음
+        pending_dirs.extend(sorted(subdirs, reverse=True))
+
+
+def list_image_files(folder, supported_formats, recursive=False, natural=False):
+    """폴더의 이미지 파일을 정렬된 목록으로 반환 (natural=True면 자연 정렬)"""
+    folder = Path(folder)
+    image_files = list(iter_image_files(folder, supported_formats, recursive=recursive))
+    if natural:
+        return sorted(image_files, key=lambda path: natural_sort_key(path.relative_to(folder)))
+    return sorted(image_files)
+
+
+def has_image_files(folder, supported_formats, recursive=False):
+    """이미지 파일이 하나라도 있는지 확인 (첫 파일 발견 즉시 반환)"""
+    return next(iter_image_files(folder, supported_formats, recursive=recursive), None) is not None
+
+
+@contextmanager
+def atomic_output(path):
+    """
+    임시 파일(이름.part)에 쓰고 완료되면 최종 경로로 교체 (os.replace는 원자적)
+    쓰는 도중 오류나 중지로 빠져나오면 임시 파일을 삭제하므로 반쯤 쓰인 출력이 남지 않음
+    """
+    path = Path(path)
+    temp_path = path.with_name(path.name + PARTIAL_SUFFIX)
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def remove_partial_files(folder):
+    """강제 종료 등으로 남은 임시 출력 파일(.part) 삭제 → 삭제한 개수"""
+    removed = 0
+    for current, _dirs, names in os.walk(folder):
+        for name in names:
+            if name.endswith(PARTIAL_SUFFIX):
+                try:
+                    os.remove(os.path.join(current, name))
+                    removed += 1
+                except OSError:
+                    pass
+    return removed
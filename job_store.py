@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+작업 저장소 (SQLite)
+대기열에 추가된 폴더와 파일별 완료 여부를 기록하여,
+프로그램이 비정상 종료되어도 다시 실행하면 중단된 지점부터 이어서 처리
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# 기본 저장소 위치 (스크립트와 같은 폴더)
+DEFAULT_STORE_PATH = Path(__file__).parent / "jobs.sqlite3"
+
+# 작업 상태
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    output_folder TEXT,
+    settings TEXT,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_files (
+    job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    output TEXT,
+    PRIMARY KEY (job_id, path)
+);
+"""
+
+
+class JobStore:
+    """
+    작업(폴더) 및 파일 완료 기록 저장소
+    GUI 스레드와 작업 스레드에서 함께 사용하므로 연결 하나를 잠금으로 보호
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            # WAL: 파일마다 커밋해도 빠르고, 비정상 종료 시에도 마지막 커밋까지 보존
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        """저장소 연결 닫기"""
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _to_job(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job['settings'] = json.loads(job['settings']) if job['settings'] else None
+        return job
+
+    def add_job(self, kind, folder, settings=None):
+        """작업 추가 후 id 반환 (kind: 'remove' 또는 'animate')"""
+        now = time.time()
+        cursor = self._execute(
+            "INSERT INTO jobs (kind, folder, settings, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, str(folder), json.dumps(settings) if settings is not None else None, STATUS_QUEUED, now, now)
+        )
+        return cursor.lastrowid
+
+    def get_job(self, job_id):
+        """작업 정보 dict 반환 (없으면 None)"""
+        rows = self._query("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return self._to_job(rows[0] if rows else None)
+
+    def pending_jobs(self, kind):
+        """완료되지 않은 작업 목록 (추가된 순서)"""
+        rows = self._query(
+            "SELECT * FROM jobs WHERE kind = ? AND status != ? ORDER BY id", (kind, STATUS_DONE)
+        )
+        return [self._to_job(row) for row in rows]
+
+    def start_job(self, job_id, output_folder=None, settings=None):
+        """작업 시작 기록 (출력 폴더와 사용한 설정 저장)"""
+        self._execute(
+            "UPDATE jobs SET status = ?, output_folder = COALESCE(?, output_folder), "
+            "settings = COALESCE(?, settings), updated_at = ? WHERE id = ?",
+            (STATUS_RUNNING, str(output_folder) if output_folder is not None else None,
+             json.dumps(settings) if settings is not None else None, time.time(), job_id)
+        )
+
+    def finish_job(self, job_id):
+        """작업 완료 기록"""
+        self._execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                      (STATUS_DONE, time.time(), job_id))
+
+    def remove_job(self, job_id):
+        """작업과 파일 기록 삭제"""
+        self._execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def mark_file_done(self, job_id, path, output=None):
+        """파일 하나의 처리 완료 기록 (path: 입력 폴더 기준 상대 경로)"""
+        self._execute(
+            "INSERT OR REPLACE INTO job_files (job_id, path, output) VALUES (?, ?, ?)",
+            (job_id, str(path), str(output) if output is not None else None)
+        )
+
+    def completed_files(self, job_id):
+        """완료된 파일의 {상대 경로: 출력 경로} dict"""
+        rows = self._query("SELECT path, output FROM job_files WHERE job_id = ?", (job_id,))
+        return {row['path']: row['output'] for row in rows}
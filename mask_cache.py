@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+모델 마스크 캐시
+추론으로 얻은 원본 마스크(L 모드)를 입력 이미지 해시 + 모델별로 압축 PNG로 저장해 두고,
+Alpha Matting 임계값이나 출력 리사이즈만 바꿔 다시 실행할 때는 추론 없이 trimap/matting 단계만 다시 계산
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from file_utils import atomic_output
+
+# 기본 캐시 폴더 (스크립트와 같은 위치)
+DEFAULT_CACHE_ROOT = Path(__file__).parent / "mask_cache"
+
+# 기본 최대 용량 (넘으면 오래 사용하지 않은 마스크부터 삭제)
+DEFAULT_MAX_MB = 1024
+
+# 마스크는 값이 단순해서 최대 압축도 빠르고 작게 저장됨
+MASK_COMPRESS_LEVEL = 9
+
+
+def image_key(image, model, variant=""):
+    """
+    캐시 키: 디코딩한 픽셀(모드/크기 포함) + 모델 + 추론 방식의 해시
+    파일 bytes 대신 픽셀을 해시하므로 같은 이미지는 경로/버퍼/작업자 공유 메모리 어디서 와도 같은 키
+    variant: 마스크가 달라지는 추론 방식 (축소 추론 최대 변 등)
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{model}|{variant}|{image.mode}|{image.size[0]}x{image.size[1]}|".encode())
+    digest.update(np.ascontiguousarray(np.asarray(image)).data)
+    return digest.hexdigest()
+
+
+class MaskCache:
+    """
+    디스크 마스크 캐시 (여러 스레드/프로세스가 같은 폴더를 함께 사용 가능)
+    키의 앞 두 글자로 하위 폴더를 나누고, 저장은 임시 파일에 쓴 뒤 이름 교체
+    """
+
+    def __init__(self, folder=DEFAULT_CACHE_ROOT, max_mb=DEFAULT_MAX_MB):
+        self.folder = Path(folder)
+        self.max_bytes = max(0, max_mb) * 1024 * 1024  # 0이면 제한 없음
+        self._lock = threading.Lock()
+        self._size = None  # 폴더 전체 크기 (처음 저장할 때 한 번 계산 후 추정)
+
+    def path_for(self, key):
+        return self.folder / key[:2] / f"{key}.png"
+
+    def get(self, key):
+        """캐시된 마스크(L 모드) 또는 None (읽은 마스크는 최근 사용으로 표시)"""
+        path = self.path_for(key)
+        try:
+            with Image.open(path) as cached:
+                mask = cached.convert('L') if cached.mode != 'L' else cached.copy()
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return mask
+
+    def put(self, key, mask):
+        """마스크 저장 (실패해도 처리를 막지 않도록 False 반환)"""
+        path = self.path_for(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_output(path) as temp_path:
+                mask.save(temp_path, format='PNG', compress_level=MASK_COMPRESS_LEVEL)
+            written = path.stat().st_size
+        except OSError:
+            return False
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._folder_size()
+            else:
+                self._size += written
+            over = self.max_bytes and self._size > self.max_bytes
+        if over:
+            self.prune()
+        return True
+
+    def _entries(self):
+        """(경로, 크기, 마지막 사용 시각) 목록"""
+        entries = []
+        for path in self.folder.glob("*/*.png"):
+            try:
+                info = path.stat()
+            except OSError:
+                continue
+            entries.append((path, info.st_size, info.st_mtime))
+        return entries
+
+    def _folder_size(self):
+        return sum(size for _path, size, _mtime in self._entries())
+
+    def prune(self, target_bytes=None):
+        """최대 용량의 90%(또는 target_bytes) 이하가 될 때까지 오래 사용하지 않은 마스크부터 삭제 → 삭제한 개수"""
+        if target_bytes is None:
+            target_bytes = self.max_bytes * 9 // 10
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _path, size, _mtime in entries)
+        removed = 0
+        for path, size, _mtime in entries:
+            if total <= target_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self._size = total
+        return removed
+
+    def clear(self):
+        """캐시 전체 삭제 → 삭제한 개수"""
+        return self.prune(target_bytes=0)
+
+
+# 프로세스별 기본 캐시 (작업자 프로세스도 같은 폴더를 사용)
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """기본 위치의 MaskCache (프로세스마다 하나)"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = MaskCache()
+        return _default_cache
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+메모리 예산
+이미지 헤더의 크기만으로 작업 메모리를 추정해 동시에 처리 중인 이미지 수를 제한하고,
+예산을 넘을 것 같으면 축소 추론(배경 제거)이나 원본 즉시 해제 모드(애니메이션)로 전환할 때 사용
+"""
+
+import threading
+
+from PIL import Image
+
+from processing import prescale_size
+
+MB = 1024 * 1024
+
+# 픽셀당 작업 메모리 추정치 (bytes, 디코딩본/마스크/결과/중간 복사본을 포함한 보수적인 값)
+PLAIN_BYTES_PER_PIXEL = 16  # rembg 기본 처리 (원본 해상도 추론 결과 합성)
+MATTING_BYTES_PER_PIXEL = 32  # + trimap, 결과 배열, 불확실 영역 표시 (타일 계산은 타일 크기로 제한됨)
+PROXY_BYTES_PER_PIXEL = 10  # 축소본 추론: 원본 디코딩본 + 업샘플 마스크 + 결과
+OUTPUT_BYTES_PER_PIXEL = 4  # 인코딩을 기다리는 RGBA 결과
+FRAME_BYTES_PER_PIXEL = 4  # 메모리에 올린 RGBA 애니메이션 프레임
+# 애니메이션 인코더가 저장을 마칠 때까지 잡고 있는 프레임당 메모리 (캔버스 픽셀 기준)
+# GIF는 팔레트로 바꾼 프레임(픽셀당 1바이트)을 모두 모아 두고, WebP는 인코딩 결과 전체를 만든 뒤 파일에 씀
+ENCODER_BYTES_PER_PIXEL = 1
+
+
+class MemoryBudget:
+    """
+    처리 중인 항목들의 추정 메모리 합계를 예산 이하로 유지 (여러 스레드에서 사용 가능)
+    reserve는 자리가 날 때까지 대기, 예산보다 큰 항목도 처리 중인 다른 항목이 없으면 단독으로 진행
+    """
+
+    def __init__(self, budget_mb=0):
+        """budget_mb: 예산(MB), 0 이하이면 제한 없음"""
+        self.limit = int(budget_mb * MB) if budget_mb and budget_mb > 0 else None
+        self._in_use = 0
+        self._condition = threading.Condition()
+        self.waits = 0  # 자리가 나기를 기다린 횟수 (리포트용)
+
+    @property
+    def enabled(self):
+        return self.limit is not None
+
+    def fits(self, nbytes):
+        """nbytes가 예산 안에 들어가는지 (제한 없으면 항상 True)"""
+        return self.limit is None or nbytes <= self.limit
+
+    def reserve(self, nbytes):
+        """nbytes만큼 예약 (다른 항목이 끝나 자리가 날 때까지 대기) → 예약한 크기"""
+        if self.limit is None:
+            return 0
+        with self._condition:
+            if self._in_use > 0 and self._in_use + nbytes > self.limit:
+                self.waits += 1
+            while self._in_use > 0 and self._in_use + nbytes > self.limit:
+                self._condition.wait()
+            self._in_use += nbytes
+        return nbytes
+
+    def try_reserve(self, nbytes):
+        """기다리지 않고 예약 시도 → 예약한 크기, 자리가 없으면 None"""
+        if self.limit is None:
+            return 0
+        with self._condition:
+            if self._in_use > 0 and self._in_use + nbytes > self.limit:
+                return None
+            self._in_use += nbytes
+        return nbytes
+
+    def release(self, nbytes):
+        """예약 해제 (대기 중인 reserve를 깨움)"""
+        if self.limit is None or not nbytes:
+            return
+        with self._condition:
+            self._in_use = max(0, self._in_use - nbytes)
+            self._condition.notify_all()
+
+
+def available_memory_mb():
+    """지금 새로 쓸 수 있는 시스템 메모리(MB, Linux MemAvailable 기준), 확인할 수 없으면 None"""
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def format_mb(nbytes):
+    return f"{nbytes / MB:.0f}MB"
+
+
+def read_image_size(path):
+    """헤더만 읽어 이미지 크기 확인 (픽셀은 디코딩하지 않음, 읽을 수 없으면 None)"""
+    try:
+        with Image.open(path) as image:
+            return image.size
+    except Exception:
+        return None
+
+
+def inference_size(size, settings):
+    """추론에 들어갈 이미지 크기 (추론 전 리사이즈를 쓰면 축소된 크기)"""
+    if settings.resize and settings.resize_before_inference:
+        return prescale_size(size, (settings.resize_width, settings.resize_height), settings.maintain_aspect) or size
+    return size
+
+
+def output_size(size, settings):
+    """저장할 결과 이미지 크기 (리사이즈 반영)"""
+    if not settings.resize:
+        return size
+    target_size = (settings.resize_width, settings.resize_height)
+    if not settings.maintain_aspect:
+        return target_size
+    ratio = min(1.0, target_size[0] / size[0], target_size[1] / size[1])
+    return max(1, round(size[0] * ratio)), max(1, round(size[1] * ratio))
+
+
+def estimate_removal_bytes(size, settings):
+    """
+    이미지 하나의 배경 제거 중 필요한 메모리 추정 (size: 헤더의 원본 크기)
+    settings: pipeline.RemovalSettings (축소 추론/Alpha Matting/리사이즈 반영)
+    """
+    width, height = inference_size(size, settings)
+    pixels = width * height
+    if settings.proxy_inference and max(width, height) > settings.proxy_max_side:
+        per_pixel = PROXY_BYTES_PER_PIXEL + (OUTPUT_BYTES_PER_PIXEL if settings.alpha_matting else 0)
+    elif settings.alpha_matting:
+        per_pixel = MATTING_BYTES_PER_PIXEL
+    else:
+        per_pixel = PLAIN_BYTES_PER_PIXEL
+    return pixels * per_pixel
+
+
+def estimate_output_bytes(size, settings):
+    """인코딩을 기다리는 동안 잡고 있는 결과 이미지 메모리 추정"""
+    width, height = output_size(inference_size(size, settings), settings)
+    return width * height * OUTPUT_BYTES_PER_PIXEL
+
+
+def estimate_animation_bytes(source_sizes, frame_count, canvas_size, compose, release_sources=False):
+    """
+    애니메이션 생성에 필요한 메모리 추정 (메모리에 올린 프레임 + 인코더가 저장을 마칠 때까지 잡고 있는 메모리)
+    source_sizes: 서로 다른 원본 프레임 크기 목록 (매니페스트에서 반복되는 프레임은 한 번만 로딩)
+    compose: 잔상 방지(캔버스 크기 통일) 사용 여부, canvas_size: 가장 큰 프레임 크기
+    release_sources: 원본을 캔버스로 옮긴 즉시 해제 (캔버스는 인코딩이 끝날 때까지 모두 유지,
+    반복 프레임은 캔버스를 재사용, 가장 큰 원본 하나만 동시에 유지)
+    """
+    sources = [width * height * FRAME_BYTES_PER_PIXEL for width, height in source_sizes]
+    encoder_bytes = frame_count * canvas_size[0] * canvas_size[1] * ENCODER_BYTES_PER_PIXEL
+    if not compose:
+        return sum(sources) + encoder_bytes
+    canvas_bytes = canvas_size[0] * canvas_size[1] * FRAME_BYTES_PER_PIXEL
+    if release_sources:
+        return len(sources) * canvas_bytes + max(sources, default=0) + encoder_bytes
+    return frame_count * canvas_bytes + sum(sources) + encoder_bytes
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+처리 단계별 시간 측정과 실행 리포트
+decode / infer / matting / resize / encode / write 등 단계별 p50/p95/최대 시간, 처리 속도, 최대 메모리(RSS)
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from file_utils import atomic_output
+
+# 리포트와 요약 로그에 표시할 단계 순서 (그 외 단계는 뒤에 이름순)
+STAGE_ORDER = ("decode", "prescale", "mask_cache", "mask_cache_miss", "infer", "refine", "matting", "cutout", "resize", "compose", "encode", "write")
+
+
+class StageTimer:
+    """
+    단계별 소요 시간 수집기 (인코딩 작업자 풀 등 여러 스레드에서 함께 기록 가능)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}
+        self.items = 0
+        self.started = time.perf_counter()
+        self.started_at = time.time()  # 다른 노드 리포트와 합칠 때 쓰는 시작 시각 (epoch 초, 시간대와 무관)
+
+    @contextmanager
+    def stage(self, name):
+        """with 블록의 소요 시간을 name 단계로 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        with self._lock:
+            self._samples.setdefault(name, []).append(seconds)
+
+    def samples(self):
+        """단계별 측정값 복사본 {단계: [초]} (작업자 프로세스에서 조정 프로세스로 보낼 때 사용)"""
+        with self._lock:
+            return {name: list(values) for name, values in self._samples.items()}
+
+    def extend(self, samples):
+        """다른 timer의 samples()를 합침"""
+        with self._lock:
+            for name, values in samples.items():
+                self._samples.setdefault(name, []).extend(values)
+
+    def count_item(self):
+        """처리 완료 항목 수 증가 (이미지 또는 애니메이션 하나)"""
+        with self._lock:
+            self.items += 1
+
+    def report(self, **extra):
+        """실행 리포트 dict (시간 단위는 ms, extra는 그대로 포함)"""
+        elapsed = time.perf_counter() - self.started
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            items = self.items
+
+        stages = {}
+        for name in sorted(samples, key=_stage_sort_key):
+            values = samples[name]
+            stages[name] = {
+                'count': len(values),
+                'total_ms': round(sum(values) * 1000, 2),
+                'p50_ms': round(percentile(values, 50) * 1000, 2),
+                'p95_ms': round(percentile(values, 95) * 1000, 2),
+                'max_ms': round(values[-1] * 1000, 2),
+            }
+
+        report = {
+            'created_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'started_at': round(self.started_at, 3),
+            'finished_at': round(self.started_at + elapsed, 3),
+            'items': items,
+            'elapsed_s': round(elapsed, 3),
+            'items_per_sec': round(items / elapsed, 3) if elapsed > 0 else None,
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': stages,
+        }
+        report.update(extra)
+        return report
+
+
+def stage(timer, name):
+    """timer가 없으면 아무것도 하지 않는 단계 측정 컨텍스트"""
+    if timer is None:
+        return nullcontext()
+    return timer.stage(name)
+
+
+def _stage_sort_key(name):
+    if name in STAGE_ORDER:
+        return (0, STAGE_ORDER.index(name), name)
+    return (1, 0, name)
+
+
+def percentile(sorted_values, q):
+    """정렬된 값 목록의 q 백분위수 (선형 보간)"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def peak_rss_mb():
+    """현재 프로세스의 최대 메모리 사용량(MB), 확인할 수 없으면 None"""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return None
+            return round(counters.PeakWorkingSetSize / (1024 * 1024), 1)
+
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS는 bytes, Linux는 KB 단위
+        if sys.platform == "darwin":
+            return round(peak / (1024 * 1024), 1)
+        return round(peak / 1024, 1)
+    except Exception:
+        return None
+
+
+def write_report(report, path):
+    """리포트를 JSON으로 저장 (임시 파일에 쓴 뒤 이름 교체)"""
+    with atomic_output(path) as temp_path:
+        with open(temp_path, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, ensure_ascii=False, indent=2)
+    return path
+
+
+def merge_reports(reports):
+    """
+    여러 노드(분할 처리)의 실행 리포트를 하나로 합침
+    경과 시간은 가장 먼저 시작한 노드부터 가장 늦게 끝난 노드까지, 처리 속도는 그 시간 기준
+    (started_at/finished_at epoch 시각 기준이라 노드의 시간대나 서머타임과 무관,
+    이 값이 없는 이전 리포트만 created_at(노드의 현지 시각, 초 단위)으로 추정)
+    단계별 p50은 횟수 가중 평균, p95/최대는 노드 중 최댓값 (원본 측정값이 없으므로 근사치)
+    """
+    spans = []
+    for report in reports:
+        if 'started_at' in report and 'finished_at' in report:
+            spans.append((report['started_at'], report['finished_at']))
+            continue
+        finished = time.mktime(time.strptime(report['created_at'], "%Y-%m-%dT%H:%M:%S"))
+        spans.append((finished - report['elapsed_s'], finished))
+    elapsed = max(end for _start, end in spans) - min(start for start, _end in spans) if spans else 0.0
+    items = sum(report['items'] for report in reports)
+
+    stages = {}
+    for report in reports:
+        for name, values in report['stages'].items():
+            merged = stages.setdefault(name, {'count': 0, 'total_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0})
+            merged['count'] += values['count']
+            merged['total_ms'] += values['total_ms']
+            merged['p50_ms'] += values['p50_ms'] * values['count']
+            merged['p95_ms'] = max(merged['p95_ms'], values['p95_ms'])
+            merged['max_ms'] = max(merged['max_ms'], values['max_ms'])
+    for values in stages.values():
+        values['total_ms'] = round(values['total_ms'], 2)
+        values['p50_ms'] = round(values['p50_ms'] / values['count'], 2) if values['count'] else 0.0
+
+    peaks = [report['peak_rss_mb'] for report in reports if report.get('peak_rss_mb') is not None]
+    merged_report = {
+        'created_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'started_at': round(min(start for start, _end in spans), 3) if spans else None,
+        'finished_at': round(max(end for _start, end in spans), 3) if spans else None,
+        'items': items,
+        'elapsed_s': round(elapsed, 3),
+        'items_per_sec': round(items / elapsed, 3) if elapsed > 0 else None,
+        'peak_rss_mb': max(peaks) if peaks else None,  # 노드별 최대 메모리 중 최댓값
+        'stages': {name: stages[name] for name in sorted(stages, key=_stage_sort_key)},
+        'nodes': len(reports),
+    }
+    for key in ('success', 'failed', 'skipped'):
+        if any(key in report for report in reports):
+            merged_report[key] = sum(report.get(key, 0) for report in reports)
+    for key in ('folder', 'output_folder', 'settings'):
+        if reports and key in reports[0]:
+            merged_report[key] = reports[0][key]
+    return merged_report
+
+
+def format_summary(report, unit="장"):
+    """GUI/명령줄 로그용 리포트 요약 줄 목록"""
+    lines = []
+    if report['stages']:
+        lines.append("⏱️ 단계별 시간 (p50 / p95 / 최대)")
+        for name, values in report['stages'].items():
+            lines.append(
+                f"  {name:<8} {values['p50_ms']:>8.1f} / {values['p95_ms']:>8.1f} / {values['max_ms']:>8.1f} ms"
+                f"  ({values['count']}회, 합계 {values['total_ms'] / 1000:.2f}s)"
+            )
+
+    speed = f"{report['items_per_sec']:.2f}{unit}/초" if report['items_per_sec'] is not None else "-"
+    memory = f"{report['peak_rss_mb']:.0f}MB" if report['peak_rss_mb'] is not None else "알 수 없음"
+    lines.append(f"🚀 처리 속도: {speed} ({report['items']}{unit}, {report['elapsed_s']:.1f}s), 최대 메모리: {memory}")
+    return lines
+
+
+def report_path_for(output_path):
+    """출력 폴더/파일 옆에 둘 리포트 경로 (폴더면 폴더 안, 파일이면 이름.report.json)"""
+    output_path = os.fspath(output_path)
+    if os.path.isdir(output_path):
+        return os.path.join(output_path, "run_report.json")
+    return output_path + ".report.json"
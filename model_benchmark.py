@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+모델 비교 벤치마크 (속도, 메모리, 마스크 품질)
+로컬에 내려받아져 있는 모델(최적화 변형 포함)마다 새 프로세스를 띄워 모델 로딩 시간, 이미지별 추론 시간, 최대 메모리를 측정하고
+각 모델의 마스크를 정답 마스크(없으면 기준 모델 마스크)와 비교해 IoU/SAD 계산
+모델마다 프로세스를 따로 쓰므로 앞 모델의 메모리/캐시가 뒤 모델 측정에 섞이지 않음
+"""
+
+import glob
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+import file_utils
+import metrics
+import model_variants
+import pipeline
+import processing
+import worker_pool
+
+# 결과 폴더 (스크립트와 같은 위치)
+COMPARE_ROOT = Path(__file__).parent / "model_compare"
+
+DEFAULT_SAMPLE_COUNT = 8
+DEFAULT_MIN_IOU = 0.95  # 추천 모델을 고를 때의 최소 평균 IoU
+
+# 정답 마스크가 없을 때 기준으로 삼을 모델 (앞쪽일수록 품질이 높다고 봄, 없는 모델은 건너뜀)
+QUALITY_ORDER = ("birefnet-general", "sam", "isnet-general-use", "silueta", "u2net", "u2net_human_seg", "u2netp")
+
+
+def _log(log, message):
+    """log 콜백이 있을 때만 메시지 출력"""
+    if log is not None:
+        log(message)
+
+
+def available_models():
+    """로컬에 모델 파일이 있는 모델과 최적화 변형 이름 목록 (내려받기 없이 측정 가능한 것만)"""
+    models = [name for name in pipeline.SESSION_MODELS if model_variants.model_downloaded(name)]
+    return models + list(model_variants.local_variants(models))
+
+
+def reference_model(models):
+    """정답 마스크가 없을 때 기준 모델 (QUALITY_ORDER 중 가장 앞쪽, 변형은 원본보다 뒤)"""
+    for name in QUALITY_ORDER:
+        if name in models:
+            return name
+    return models[0] if models else None
+
+
+def _shares_stem(image_path):
+    """같은 폴더에 확장자만 다른 입력 이미지가 있는지 (a.jpg와 a.png)"""
+    return any(
+        path != image_path and path.suffix.lower() in pipeline.SUPPORTED_FORMATS
+        for path in image_path.parent.glob(glob.escape(image_path.stem) + ".*")
+    )
+
+
+def find_ground_truth(image_path, ground_truth_folder, root=None):
+    """
+    이미지에 맞는 정답 마스크 경로 또는 None
+    정답 폴더는 입력 폴더(root)와 같은 하위 폴더 구조, 파일 이름은 확장자를 뺀 이름 (a.jpg → a.png)
+    같은 폴더에 확장자만 다른 입력이 있으면 원본 파일 이름 전체만 인정 (a.jpg → a.jpg.png, 서로의 정답을 쓰지 않도록)
+    """
+    image_path = Path(image_path)
+    folder = Path(ground_truth_folder)
+    if root is not None:
+        folder = folder / image_path.parent.relative_to(root)
+    names = [image_path.name] if _shares_stem(image_path) else [image_path.name, image_path.stem]
+    for name in names:
+        for suffix in pipeline.SUPPORTED_FORMATS:
+            candidate = folder / f"{name}{suffix}"
+            if candidate.exists():
+                return candidate
+    return None
+
+
+def mask_file_name(index, image_path):
+    """표본 순서로 구분한 마스크 파일 이름 (하위 폴더나 확장자만 다른 같은 이름 이미지의 마스크가 서로 덮어쓰지 않도록)"""
+    return f"{index:03d}_{Path(image_path).stem}.png"
+
+
+def load_mask(path):
+    """마스크 파일 → L 모드 (RGBA면 알파 채널, 그 외에는 밝기 사용)"""
+    with Image.open(path) as image:
+        return pipeline.mask_channel(image.convert('RGBA') if 'A' in image.getbands() else image.convert('L'))
+
+
+def mask_quality(mask, reference):
+    """
+    두 마스크(L 모드) 비교 → {'iou', 'mad', 'sad'}
+    IoU는 마스크>127 기준, MAD는 평균 절대 오차(0-255), SAD는 0-1로 정규화한 절대 오차 합 / 1000 (matting 논문 관례)
+    """
+    if mask.size != reference.size:
+        reference = reference.resize(mask.size, Image.Resampling.BILINEAR)
+    values = np.asarray(mask, dtype=np.int16)
+    reference_values = np.asarray(reference, dtype=np.int16)
+    solid = values > 127
+    reference_solid = reference_values > 127
+    union = np.count_nonzero(solid | reference_solid)
+    difference = np.abs(values - reference_values)
+    return {
+        'iou': float(np.count_nonzero(solid & reference_solid) / union) if union else 1.0,
+        'mad': float(difference.mean()),
+        'sad': float(difference.sum() / 255 / 1000),
+    }
+
+
+def _expected_model(name):
+    """세션의 model_name으로 확인할 원본 모델 이름 (변형이면 원본)"""
+    variant = model_variants.parse_variant(name)
+    return variant[0] if variant is not None else name
+
+
+def _measure_model(name, image_paths, mask_folder, repeats):
+    """
+    모델 전용 프로세스에서 실행: 모델 로딩 → 이미지별 추론(repeats회 중 최솟값) → 마스크 PNG 저장
+    → {'load_s', 'first_ms', 'per_image_ms', 'memory'}
+    """
+    before_load = worker_pool.process_memory()
+    started = time.perf_counter()
+    session = pipeline.create_session(name)
+    load_s = time.perf_counter() - started
+    # create_session은 실패하면 u2net으로 대체하므로 다른 모델을 측정하지 않도록 확인
+    loaded = getattr(session, 'model_name', None)
+    if loaded != _expected_model(name):
+        raise RuntimeError(f"모델 '{name}' 로딩 실패 ('{loaded}'(으)로 대체됨)")
+    after_load = worker_pool.process_memory()
+    # 무거운 모델은 배경 제거 처리와 같이 큰 이미지를 축소 추론 (pipeline.fit_model_settings와 같은 기준)
+    max_side = (pipeline.model_profile(name) or {}).get('max_side')
+
+    per_image_ms = []
+    first_ms = None
+    for index, path in enumerate(image_paths):
+        image = processing.load_rgb_image(processing.open_input(path))
+        best = None
+        for _ in range(max(1, repeats)):
+            infer_started = time.perf_counter()
+            mask = pipeline.mask_channel(processing.predict_mask(image, session, max_side=max_side))
+            elapsed = (time.perf_counter() - infer_started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+            if first_ms is None:
+                # 첫 추론은 초기화(메모리 할당 등)가 섞이므로 따로 기록
+                first_ms = elapsed
+        per_image_ms.append(round(best, 2))
+        mask_path = Path(mask_folder) / mask_file_name(index, path)
+        with file_utils.atomic_output(mask_path) as temp_path:
+            mask.save(temp_path, format='PNG')
+
+    return {
+        'load_s': round(load_s, 3),
+        'first_ms': round(first_ms, 2) if first_ms is not None else None,
+        'per_image_ms': per_image_ms,
+        'memory': {
+            'before_load': before_load,
+            'after_load': after_load,
+            'peak_rss_mb': metrics.peak_rss_mb(),
+        },
+    }
+
+
+def run_comparison(image_paths, models, output_folder, ground_truth=None, reference=None, repeats=1, root=None,
+                   log=None):
+    """
+    모델 비교 실행 → 리포트 dict (마스크는 output_folder/masks/모델/표본번호_이름.png로 저장)
+    ground_truth: 정답 마스크 폴더 (root 기준 같은 구조와 이름, find_ground_truth 참고),
+    없으면 reference 모델(기본값: 품질 순서상 가장 좋은 모델)과 비교
+    """
+    output_folder = Path(output_folder)
+    mask_names = [mask_file_name(index, path) for index, path in enumerate(image_paths)]
+    gt_paths = []
+    if ground_truth:
+        gt_paths = [find_ground_truth(path, ground_truth, root=root) for path in image_paths]
+        missing = [Path(path).name for path, gt_path in zip(image_paths, gt_paths) if gt_path is None]
+        if missing:
+            _log(log, f"⚠️ 정답 마스크가 없는 이미지 {len(missing)}장은 품질 비교에서 제외: {', '.join(missing[:5])}"
+                      + (" ..." if len(missing) > 5 else ""))
+    else:
+        reference = reference or reference_model(models)
+        _log(log, f"🎯 정답 마스크가 없어 기준 모델과 비교: {reference}")
+
+    # 모델마다 새 프로세스 (spawn: 부모의 메모리/스레드를 물려받지 않아 최대 메모리가 모델별로 분리됨)
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for index, name in enumerate(models, start=1):
+        mask_folder = output_folder / "masks" / name
+        mask_folder.mkdir(parents=True, exist_ok=True)
+        _log(log, f"🤖 [{index}/{len(models)}] {name}: 이미지 {len(image_paths)}장 측정 중...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            try:
+                result = executor.submit(_measure_model, name, image_paths, mask_folder, repeats).result()
+            except Exception as e:
+                _log(log, f"  ❌ 측정 실패: {str(e)}")
+                results[name] = {'error': str(e)}
+                continue
+        measured = sorted(result['per_image_ms'])
+        result['p50_ms'] = round(metrics.percentile(measured, 50), 2)
+        result['mean_ms'] = round(sum(measured) / len(measured), 2) if measured else None
+        results[name] = result
+        _log(log, f"  ⏱️ 로딩 {result['load_s']:.2f}s, 이미지당 p50 {result['p50_ms']:.1f}ms, "
+                  f"최대 RSS {result['memory']['peak_rss_mb'] or 0:.0f}MB")
+
+    # 품질 비교 (저장한 마스크 기준)
+    for name, result in results.items():
+        if 'error' in result:
+            continue
+        scores = []
+        for index, mask_name in enumerate(mask_names):
+            if ground_truth:
+                reference_path = gt_paths[index]
+            else:
+                reference_path = output_folder / "masks" / reference / mask_name
+                if name == reference or 'error' in results.get(reference, {}):
+                    reference_path = None
+            if reference_path is None:
+                scores.append(None)
+                continue
+            mask = load_mask(output_folder / "masks" / name / mask_name)
+            scores.append(mask_quality(mask, load_mask(reference_path)))
+        result['quality'] = scores
+        measured = [score for score in scores if score is not None]
+        if measured:
+            result['mean_iou'] = float(np.mean([score['iou'] for score in measured]))
+            result['worst_iou'] = float(np.min([score['iou'] for score in measured]))
+            result['mean_sad'] = float(np.mean([score['sad'] for score in measured]))
+
+    return {
+        'created_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'images': [str(path) for path in image_paths],
+        'mask_files': mask_names,
+        'repeats': repeats,
+        'quality_reference': 'ground_truth' if ground_truth else reference,
+        'ground_truth': str(ground_truth) if ground_truth else None,
+        'models': results,
+    }
+
+
+def recommend(report, min_iou=DEFAULT_MIN_IOU):
+    """평균 IoU가 min_iou 이상인 모델 중 이미지당 p50 시간이 가장 짧은 모델 이름 또는 None (기준 모델은 IoU 1.0으로 봄)"""
+    candidates = []
+    for name, result in report['models'].items():
+        if 'error' in result:
+            continue
+        mean_iou = result.get('mean_iou', 1.0 if name == report['quality_reference'] else None)
+        if mean_iou is not None and mean_iou >= min_iou:
+            candidates.append((result['p50_ms'], name))
+    return min(candidates)[1] if candidates else None
+
+
+def format_table(report):
+    """모델별 요약 로그 줄 목록 (이미지당 p50 시간 순)"""
+    rows = sorted(
+        (result.get('p50_ms', float('inf')), name, result) for name, result in report['models'].items()
+    )
+    lines = [f"  {'모델':<28} {'로딩':>8} {'p50':>10} {'최대 RSS':>10} {'IoU 평균':>9} {'최저':>7} {'SAD':>8}"]
+    for _p50, name, result in rows:
+        if 'error' in result:
+            lines.append(f"  {name:<28} 실패: {result['error']}")
+            continue
+        if 'mean_iou' in result:
+            quality = f"{result['mean_iou']:>9.4f} {result['worst_iou']:>7.4f} {result['mean_sad']:>8.2f}"
+        else:
+            quality = f"{'(기준)' if name == report['quality_reference'] else '-':>9} {'-':>7} {'-':>8}"
+        peak = result['memory']['peak_rss_mb']
+        lines.append(f"  {name:<28} {result['load_s']:>7.2f}s {result['p50_ms']:>8.1f}ms "
+                     f"{(f'{peak:.0f}MB' if peak is not None else '-'):>10} {quality}")
+    return lines
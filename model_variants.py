@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+CPU용 최적화 모델 변형 (내려받은 rembg ONNX 파일로 로컬에서 생성, 네트워크 접근 없음)
+int8: 가중치 INT8 동적 양자화 (onnxruntime.quantization, onnx 패키지 필요)
+ort: onnxruntime 그래프 최적화(노드 병합 등)를 미리 적용해 저장한 그래프 (로딩/추론 시 최적화 생략)
+변형은 원본 옆에 '모델.종류.onnx'로 저장되고, '모델-종류' 이름으로 원본과 같은 전처리/후처리 세션을 만듦
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+import onnxruntime as ort
+
+from file_utils import atomic_output
+
+# 변형 종류 → 설명
+VARIANT_KINDS = {
+    "int8": "INT8 양자화",
+    "ort": "ORT 최적화 그래프",
+}
+
+# 파일 여러 개(인코더/디코더)로 된 모델 → rembg 기본 파일 이름 (변형을 만들 수 없음)
+MULTI_FILE_MODELS = {
+    "sam": ("sam_vit_b_01ec64.encoder.onnx", "sam_vit_b_01ec64.decoder.onnx"),
+}
+
+
+def _log(log, message):
+    """log 콜백이 있을 때만 메시지 출력"""
+    if log is not None:
+        log(message)
+
+
+def _session_class(model_name):
+    """rembg 세션 클래스 (없으면 None)"""
+    from rembg.sessions import sessions_class
+
+    for session_class in sessions_class:
+        if session_class.name() == model_name:
+            return session_class
+    return None
+
+
+def _find_file(session_class, fname):
+    """이미 내려받은 파일 경로 또는 None"""
+    # 최신 rembg: 모델별 폴더와 예전 ~/.u2net 모두 확인
+    if hasattr(session_class, "resolve_existing"):
+        existing = session_class.resolve_existing(fname)
+        return Path(existing) if existing is not None else None
+    # 예전 rembg: U2NET_HOME, XDG_DATA_HOME 처리는 rembg에 맡김
+    path = Path(session_class.u2net_home()) / fname
+    return path if path.exists() else None
+
+
+def find_model_file(model_name):
+    """이미 내려받은 rembg 모델 파일 경로 또는 None (네트워크 접근 없음, 파일 여러 개로 된 모델은 None)"""
+    session_class = _session_class(model_name)
+    if session_class is None or model_name in MULTI_FILE_MODELS:
+        return None
+    return _find_file(session_class, f"{model_name}.onnx")
+
+
+def model_downloaded(model_name):
+    """모델 파일이 모두 내려받아져 있는지 (네트워크 접근 없음)"""
+    session_class = _session_class(model_name)
+    if session_class is None:
+        return False
+    fnames = MULTI_FILE_MODELS.get(model_name, (f"{model_name}.onnx",))
+    return all(_find_file(session_class, fname) is not None for fname in fnames)
+
+
+def variant_name(model_name, kind):
+    return f"{model_name}-{kind}"
+
+
+def parse_variant(name):
+    """'모델-종류' 이름 → (모델, 종류), 변형 이름이 아니면 None"""
+    model_name, _, kind = name.rpartition("-")
+    if kind in VARIANT_KINDS and model_name:
+        return model_name, kind
+    return None
+
+
+def variant_path(model_name, kind, model_file=None):
+    """변형 파일 경로 (원본 옆, 원본이 없으면 None)"""
+    model_file = model_file or find_model_file(model_name)
+    if model_file is None:
+        return None
+    return Path(model_file).with_name(f"{model_name}.{kind}.onnx")
+
+
+def local_variants(model_names, model_options=None):
+    """
+    이미 만들어 둔 변형 {이름: 설명} (모델 선택 목록에 추가)
+    model_options: 원본 모델 설명 (설명 앞부분에 사용)
+    """
+    variants = {}
+    for model_name in model_names:
+        model_file = find_model_file(model_name)
+        if model_file is None:
+            continue
+        for kind, description in VARIANT_KINDS.items():
+            if variant_path(model_name, kind, model_file).exists():
+                base = (model_options or {}).get(model_name, model_name)
+                variants[variant_name(model_name, kind)] = f"{base} - {description}"
+    return variants
+
+
+def create_variant(model_name, kind, force=False, log=None):
+    """
+    변형 파일 생성 → 경로 (이미 있으면 force가 아닌 한 그대로 사용)
+    원본 모델이 내려받아져 있지 않으면 FileNotFoundError, int8에 필요한 onnx 패키지가 없으면 ImportError
+    """
+    if kind not in VARIANT_KINDS:
+        raise ValueError(f"알 수 없는 변형 종류: {kind} (가능: {', '.join(VARIANT_KINDS)})")
+    if model_name in MULTI_FILE_MODELS:
+        raise ValueError(f"파일 여러 개로 된 모델은 변형을 만들 수 없습니다: {model_name}")
+    model_file = find_model_file(model_name)
+    if model_file is None:
+        raise FileNotFoundError(f"모델 파일이 없습니다: {model_name} (먼저 한 번 실행해서 내려받으세요)")
+    output_path = variant_path(model_name, kind, model_file)
+    if output_path.exists() and not force:
+        _log(log, f"♻️ 이미 있는 변형 사용: {output_path}")
+        return output_path
+
+    started = time.perf_counter()
+    _log(log, f"🔧 {VARIANT_KINDS[kind]} 변형 생성: {model_file.name} → {output_path.name}")
+    with atomic_output(output_path) as temp_path:
+        if kind == "int8":
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(str(model_file), str(temp_path), weight_type=QuantType.QUInt8)
+        else:
+            sess_opts = ort.SessionOptions()
+            # 확장 최적화까지만 적용 (레이아웃 최적화는 실행 환경에 묶여 저장해 두기에 적합하지 않음)
+            sess_opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+            sess_opts.optimized_model_filepath = str(temp_path)
+            ort.InferenceSession(str(model_file), sess_opts, providers=["CPUExecutionProvider"])
+
+    original_mb = model_file.stat().st_size / (1024 * 1024)
+    variant_mb = output_path.stat().st_size / (1024 * 1024)
+    _log(log, f"✅ 생성 완료 ({time.perf_counter() - started:.1f}s): {original_mb:.1f}MB → {variant_mb:.1f}MB")
+    return output_path
+
+
+def new_variant_session(name, sess_opts=None):
+    """
+    변형 세션 생성 (원본 모델의 rembg 세션 클래스를 그대로 쓰고 ONNX 파일만 바꿈)
+    변형 파일이 없으면 FileNotFoundError
+    """
+    model_name, kind = parse_variant(name)
+    session_class = _session_class(model_name)
+    path = variant_path(model_name, kind)
+    if session_class is None or path is None or not path.exists():
+        raise FileNotFoundError(f"모델 변형이 없습니다: {name} (cli.py optimize-model {model_name} --kind {kind})")
+
+    class VariantSession(session_class):
+        @classmethod
+        def download_models(cls, *args, **kwargs):
+            return str(path)
+
+    if sess_opts is None:
+        sess_opts = ort.SessionOptions()
+    return VariantSession(model_name, sess_opts)
+
+
+def compare_sessions(images, reference_session, variant_session, repeats=1):
+    """
+    같은 이미지에서 원본/변형 마스크 비교 → {'images', 'reference_ms', 'variant_ms', 'speedup', 'mean_iou', 'worst_iou', 'mean_mad'}
+    시간은 이미지별 최솟값(repeats회 중)의 합 기준, IoU는 마스크>127 기준
+    """
+    # processing은 rembg를 불러오므로 필요할 때만 import
+    import processing
+
+    reference_total = variant_total = 0.0
+    ious, mads = [], []
+    per_image = []
+    for image in images:
+        timings = {}
+        masks = {}
+        for label, session in (("reference", reference_session), ("variant", variant_session)):
+            best = None
+            for _ in range(max(1, repeats)):
+                started = time.perf_counter()
+                mask = session.predict(image)[0]
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings[label] = best
+            masks[label] = mask.convert('L')
+
+        comparison = processing.compare_alpha(_as_alpha(masks['variant']), _as_alpha(masks['reference']))
+        reference_total += timings['reference']
+        variant_total += timings['variant']
+        ious.append(comparison['iou'])
+        mads.append(comparison['mad'])
+        per_image.append({
+            'reference_ms': round(timings['reference'] * 1000, 2),
+            'variant_ms': round(timings['variant'] * 1000, 2),
+            **comparison,
+        })
+
+    return {
+        'images': per_image,
+        'reference_ms': round(reference_total * 1000, 2),
+        'variant_ms': round(variant_total * 1000, 2),
+        'speedup': round(reference_total / variant_total, 3) if variant_total > 0 else None,
+        'mean_iou': float(np.mean(ious)) if ious else None,
+        'worst_iou': float(np.min(ious)) if ious else None,
+        'mean_mad': float(np.mean(mads)) if mads else None,
+    }
+
+
+def _as_alpha(mask):
+    """L 마스크를 알파로 가진 RGBA 이미지 (compare_alpha 입력용)"""
+    image = mask.convert('RGBA')
+    image.putalpha(mask)
+    return image
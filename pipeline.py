@@ -0,0 +1,805 @@
+#!/usr/bin/env python3
+"""
+폴더 단위 배경 제거 파이프라인
+GUI(remove_bg.py)와 명령줄(cli.py)이 함께 사용하는 처리 설정, 모델 세션 생성, 폴더 처리 로직
+"""
+
+import collections
+import gc
+import itertools
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, fields, replace
+from pathlib import Path
+
+from PIL import Image, ImageOps
+import numpy as np
+import onnxruntime as ort
+from rembg import new_session, remove
+
+import file_utils
+import mask_cache
+import memory_budget
+import metrics
+import model_variants
+import processing
+from file_utils import PathAllocator
+from metrics import stage
+
+# 스크립트와 같은 위치의 결과 폴더
+SCRIPT_DIR = Path(__file__).parent
+OUTPUT_ROOT = SCRIPT_DIR / "transparent"
+ANIMATION_ROOT = SCRIPT_DIR / "animation"
+
+# 지원되는 이미지 확장자
+SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp'}
+
+# rembg 모델 정보
+MODEL_OPTIONS = {
+    "u2net": "U²-Net (범용)",
+    "u2net_human_seg": "U²-Net Human (사람 전용)",
+    "u2netp": "U²-Net-P (도트픽셀 최적, 추천)",
+    "silueta": "Silueta (고정밀)",
+    "isnet-general-use": "ISNet (최신, 고성능)",
+    "sam": "SAM (Segment Anything)",
+    "birefnet-general": "BiRefNet (최고 품질)"
+}
+
+# 세션을 바로 만들 수 있는 모델 (나머지는 u2net으로 대체)
+SESSION_MODELS = ("u2net", "u2netp", "u2net_human_seg", "silueta", "isnet-general-use", "sam", "birefnet-general")
+
+# 입력이 크고 메모리를 많이 쓰는 모델의 실행 제한 (최적화 변형에도 같은 제한 적용)
+# max_side: 이보다 큰 이미지는 자동으로 축소 추론 (모델 입력이 1024px 정도라 원본 해상도로 넣어도 품질 이득 없이 메모리만 사용)
+# max_workers: 작업자 프로세스 최대 수, worker_mb: 작업자 하나가 추론 중에 쓰는 메모리 추정 (가능한 메모리로 작업자 수 제한)
+# 이 모델들은 프로세스마다 세션을 하나만 유지하고 (다른 무거운 모델은 이전 세션을 다 쓴 뒤에 교체), 추론은 한 번에 하나씩
+HEAVY_MODELS = {
+    "sam": {'max_side': 1024, 'max_workers': 1, 'worker_mb': 2048},
+    "birefnet-general": {'max_side': 2048, 'max_workers': 2, 'worker_mb': 4096},
+}
+
+DEFAULT_ENCODE_WORKERS = 2
+
+
+def model_options():
+    """모델 선택 목록: MODEL_OPTIONS + 로컬에서 만들어 둔 최적화 변형 (model_variants 참고)"""
+    return {**MODEL_OPTIONS, **model_variants.local_variants(SESSION_MODELS, MODEL_OPTIONS)}
+
+
+def _log(log, message):
+    """log 콜백이 있을 때만 메시지 출력"""
+    if log is not None:
+        log(message)
+
+
+class ProcessingCancelled(Exception):
+    """사용자가 처리를 중지함"""
+
+
+class JobControl:
+    """
+    실행 중인 대기열의 중지/일시정지 신호 (GUI 스레드에서 설정, 작업 스레드에서 확인)
+    작업 스레드는 이미지/프레임 사이마다 checkpoint()를 호출
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    def cancel(self):
+        """중지 요청 (일시정지 중이면 대기를 풀어 바로 중지되도록 함)"""
+        self._cancelled.set()
+        self._running.set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def checkpoint(self):
+        """일시정지 중이면 재개될 때까지 대기, 중지 요청이 있으면 ProcessingCancelled 발생"""
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise ProcessingCancelled()
+
+
+@dataclass
+class RemovalSettings:
+    """배경 제거 처리 설정 (작업 저장소에 JSON으로 저장되어 이어서 처리할 때 그대로 복원)"""
+    model: str = "u2netp"
+    alpha_matting: bool = False
+    foreground_threshold: int = 270
+    background_threshold: int = 10
+    erode_size: int = 10
+    proxy_inference: bool = False
+    proxy_max_side: int = processing.DEFAULT_PROXY_MAX_SIDE
+    resize: bool = False
+    resize_width: int = 1024
+    resize_height: int = 768
+    maintain_aspect: bool = True
+    resize_before_inference: bool = False
+    compare_resize_accuracy: bool = False
+    output_format: str = "png"
+    png_compress_level: int = processing.DEFAULT_PNG_COMPRESS_LEVEL
+    encode_workers: int = DEFAULT_ENCODE_WORKERS
+    recursive: bool = False
+    memory_budget_mb: int = 0  # 0이면 제한 없음
+    mask_cache: bool = False  # 모델 마스크를 디스크에 캐시 (임계값만 바꿔 다시 처리할 때 추론 생략)
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        """저장된 설정 복원 (알 수 없는 키는 무시, 없는 키는 기본값)"""
+        names = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in (data or {}).items() if key in names})
+
+    def describe_resize(self):
+        """리사이즈 설정 설명 문자열"""
+        return f"{self.resize_width}x{self.resize_height}" + (" (비율유지)" if self.maintain_aspect else " (강제변경)")
+
+
+def model_profile(model_name):
+    """무거운 모델의 실행 제한 (HEAVY_MODELS 참고, 최적화 변형은 원본 기준), 그 외 모델은 None"""
+    variant = model_variants.parse_variant(model_name)
+    return HEAVY_MODELS.get(variant[0] if variant is not None else model_name)
+
+
+def fit_model_settings(settings):
+    """무거운 모델이면 max_side보다 큰 이미지를 축소 추론하도록 바꾼 설정 (그 외에는 그대로)"""
+    profile = model_profile(settings.model)
+    if profile is None or (settings.proxy_inference and settings.proxy_max_side <= profile['max_side']):
+        return settings
+    return replace(settings, proxy_inference=True, proxy_max_side=profile['max_side'])
+
+
+# 프로세스에 하나만 유지하는 무거운 모델 세션: (모델, 세션)
+# 다른 무거운 모델로 바꿀 때는 이전 세션을 약한 참조로만 남겨 두고(_heavy_retiring), 세션을 받아 간 곳이 모두 놓아
+# 실제로 해제된 뒤에 새 모델을 로딩 (두 모델이 동시에 메모리에 올라가지 않도록)
+_heavy_session = None
+_heavy_retiring = None  # (모델, weakref.ref(세션))
+_heavy_condition = threading.Condition(threading.RLock())
+
+# 이전 무거운 모델 세션이 해제되기를 기다리는 최대 시간 (초, 넘으면 RuntimeError)
+HEAVY_SWITCH_TIMEOUT = 300
+
+
+def heavy_session_model():
+    """지금 이 프로세스에 올라와 있는 무거운 모델 이름 또는 None (로딩 중에도 기다리지 않음)"""
+    current = _heavy_session
+    if current is not None:
+        return current[0]
+    retiring = _heavy_retiring
+    return retiring[0] if retiring is not None and retiring[1]() is not None else None
+
+
+def _new_session(model_name, sess_opts):
+    variant = model_variants.parse_variant(model_name)
+    if variant is not None and variant[0] in SESSION_MODELS:
+        return model_variants.new_variant_session(model_name, sess_opts=sess_opts)
+    return new_session(model_name, sess_opts=sess_opts)
+
+
+def _bound_predict(session):
+    """세션의 추론을 한 번에 하나씩만 실행 (여러 스레드가 같은 세션을 써도 추론 메모리가 겹치지 않도록)"""
+    lock = threading.Lock()
+    predict = type(session).predict
+    # 세션 → bounded_predict → 세션 순환 참조가 생기지 않도록 약한 참조 사용 (놓는 즉시 해제되어야 교체 가능)
+    session_ref = weakref.ref(session)
+
+    def bounded_predict(*args, **kwargs):
+        with lock:
+            return predict(session_ref(), *args, **kwargs)
+
+    session.predict = bounded_predict
+    return session
+
+
+def _heavy_released():
+    """무거운 모델 세션이 해제되면 교체를 기다리는 스레드를 깨움"""
+    with _heavy_condition:
+        _heavy_condition.notify_all()
+
+
+def _retire_heavy_session():
+    """현재 무거운 세션을 약한 참조로만 남김 → 아직 쓰는 곳이 있으면 True"""
+    global _heavy_session, _heavy_retiring
+    if _heavy_session is not None:
+        _heavy_retiring = (_heavy_session[0], weakref.ref(_heavy_session[1]))
+        _heavy_session = None
+        # 세션 내부의 순환 참조까지 정리해 받아 간 곳이 없으면 바로 해제되도록
+        gc.collect()
+    if _heavy_retiring is not None and _heavy_retiring[1]() is None:
+        _heavy_retiring = None
+    return _heavy_retiring is not None
+
+
+def _shared_heavy_session(model_name, sess_opts, log, timeout=HEAVY_SWITCH_TIMEOUT):
+    """
+    무거운 모델 세션 (프로세스에 모델 이름당 하나, 로딩에 실패하면 다른 모델로 대체하지 않고 예외 발생)
+    이미 올라와 있는 모델이면 스레드 수와 관계없이 그 세션을 돌려주고 (sess_opts는 처음 로딩할 때만 적용),
+    다른 무거운 모델이 올라와 있으면 그 세션을 쓰는 곳이 모두 놓을 때까지 기다렸다가 교체 (timeout초가 지나면 RuntimeError)
+    """
+    global _heavy_session, _heavy_retiring
+    deadline = time.monotonic() + timeout
+    waiting_logged = False
+    with _heavy_condition:
+        while True:
+            if _heavy_session is not None and _heavy_session[0] == model_name:
+                return _heavy_session[1]
+            if _heavy_retiring is not None and _heavy_retiring[0] == model_name:
+                # 교체를 기다리는 동안 다시 요청된 이전 모델은 아직 살아 있으면 그대로 다시 사용
+                session = _heavy_retiring[1]()
+                if session is not None:
+                    _heavy_session, _heavy_retiring = (model_name, session), None
+                    return session
+            if not _retire_heavy_session():
+                break
+            old_model = _heavy_retiring[0]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError(f"'{old_model}' 세션을 다른 작업이 아직 사용 중이라 '{model_name}'을(를) 로딩할 수 없습니다 "
+                                   f"({timeout}초 대기, 두 무거운 모델을 동시에 메모리에 올리지 않음)")
+            if not waiting_logged:
+                _log(log, f"⏳ '{old_model}' 세션을 쓰는 작업이 끝나면 {model_name}(으)로 교체합니다...")
+                waiting_logged = True
+            _heavy_condition.wait(remaining)
+
+        if waiting_logged:
+            _log(log, f"♻️ 무거운 모델 세션 교체 → {model_name}")
+        _log(log, f"🤖 AI 모델 로딩: {MODEL_OPTIONS.get(model_name, model_name)}")
+        try:
+            session = _bound_predict(_new_session(model_name, sess_opts))
+        except Exception as e:
+            _log(log, f"❌ 모델 로딩 실패: {str(e)}")
+            raise RuntimeError(f"모델 '{model_name}' 로딩 실패: {str(e)}") from e
+        weakref.finalize(session, _heavy_released)
+        _heavy_session = (model_name, session)
+        return session
+
+
+def create_session(model_name, log=None, threads=None):
+    """
+    rembg 세션 생성 (지원되지 않거나 로딩에 실패하면 u2net 사용)
+    '모델-int8', '모델-ort'는 로컬에서 만들어 둔 최적화 변형 (없으면 로딩 실패로 u2net 사용)
+    SAM/BiRefNet 등 무거운 모델(HEAVY_MODELS)은 프로세스에 세션을 하나만 유지해 같은 세션을 돌려주고
+    (스레드 수가 달라도 재사용, 다른 무거운 모델은 이전 세션을 쓰는 곳이 모두 놓은 뒤에 교체),
+    로딩에 실패하면 전혀 다른 모델이 실행되지 않도록 u2net 대신 RuntimeError 발생
+    threads: 추론 스레드 수 (작업자 프로세스 여러 개가 코어를 나눠 쓸 때 지정, 기본값은 onnxruntime이 결정)
+    """
+    sess_opts = None
+    if threads:
+        sess_opts = ort.SessionOptions()
+        sess_opts.intra_op_num_threads = threads
+        sess_opts.inter_op_num_threads = 1
+    if model_profile(model_name) is not None:
+        return _shared_heavy_session(model_name, sess_opts, log)
+    try:
+        _log(log, f"🤖 AI 모델 로딩: {MODEL_OPTIONS.get(model_name, model_name)}")
+
+        variant = model_variants.parse_variant(model_name)
+        if model_name in SESSION_MODELS or (variant is not None and variant[0] in SESSION_MODELS):
+            return _new_session(model_name, sess_opts)
+
+        _log(log, f"⚠️ 모델 '{model_name}' 지원되지 않음. u2net으로 변경")
+        return new_session("u2net", sess_opts=sess_opts)
+    except Exception as e:
+        _log(log, f"❌ 모델 로딩 실패: {str(e)}")
+        return new_session("u2net", sess_opts=sess_opts)
+
+
+def matting_cutout(source_image, session, foreground_threshold, background_threshold, erode_size,
+                   log=None, timer=None):
+    """rembg 마스크 → trimap → 불확실 영역만 Alpha Matting (라이브러리가 없으면 ImportError)"""
+    # RGB 모드로 변환 (RGBA나 다른 모드일 경우 대비, 마스크와 같도록 EXIF 회전 반영)
+    input_image = processing.load_rgb_image(source_image)
+
+    # 기본 rembg로 마스크 생성 후 알파 채널만 사용
+    with stage(timer, "infer"):
+        mask_image = mask_channel(remove(source_image, session=session, only_mask=True))
+
+    with stage(timer, "matting"):
+        return matting_from_mask(input_image, mask_image, foreground_threshold, background_threshold, erode_size,
+                                 log=log)
+
+
+def mask_channel(mask_image):
+    """rembg 마스크 결과를 L 모드로 (RGBA면 알파 채널만 사용)"""
+    if mask_image.mode == 'RGBA':
+        return mask_image.split()[-1]
+    if mask_image.mode != 'L':
+        return mask_image.convert('L')
+    return mask_image
+
+
+def matting_from_mask(input_image, mask_image, foreground_threshold, background_threshold, erode_size,
+                      workers=None, log=None):
+    """
+    이미 구한 마스크로 trimap → 불확실 영역만 Alpha Matting (input_image: EXIF 회전을 반영한 RGB)
+    workers: 타일 계산 스레드 수 (기본값: 코어 수, 여러 프로세스가 동시에 계산할 때는 1)
+    """
+    # trimap 생성 (Alpha Matting용): 0(배경), 128(불확실), 255(전경)
+    trimap = processing.build_trimap(np.array(mask_image), foreground_threshold, background_threshold, log=log)
+    trimap_image = Image.fromarray(trimap, mode='L')
+
+    _log(log, f"  🔍 원본: {input_image.mode} {input_image.size}, Trimap: {trimap_image.mode} {trimap_image.size}")
+
+    # 정규화된(0-1) 임계값 사용
+    return processing.band_matting_cutout(
+        input_image,
+        trimap_image,
+        foreground_threshold / 255.0,
+        background_threshold / 255.0,
+        erode_size,
+        workers=workers,
+        log=log
+    )
+
+
+def cached_mask(image, session, settings, log=None, timer=None, cache=None):
+    """
+    마스크 캐시에서 모델 마스크(L 모드)를 찾고, 없으면 추론해서 저장
+    image: EXIF 회전을 반영한 이미지 (픽셀 해시가 캐시 키)
+    축소 추론 대상이면 업샘플/경계 보정까지 마친 마스크를 최대 변 길이별로 저장
+    timer에는 적중은 mask_cache, 미스는 mask_cache_miss 단계로 키 계산/읽기/저장 시간을 기록
+    """
+    cache = cache or mask_cache.default_cache()
+    max_side = None
+    if settings.proxy_inference and max(image.size) > settings.proxy_max_side:
+        max_side = settings.proxy_max_side
+
+    started = time.perf_counter()
+    key = mask_cache.image_key(image, settings.model, f"proxy{max_side}" if max_side else "")
+    mask = cache.get(key)
+    lookup_seconds = time.perf_counter() - started
+    if mask is not None:
+        if timer is not None:
+            timer.add("mask_cache", lookup_seconds)
+        _log(log, "  ♻️ 캐시된 마스크 사용 (추론 생략)")
+        return mask
+
+    mask = mask_channel(processing.predict_mask(image, session, max_side, log=log, timer=timer))
+    started = time.perf_counter()
+    cache.put(key, mask)
+    if timer is not None:
+        timer.add("mask_cache_miss", lookup_seconds + time.perf_counter() - started)
+    return mask
+
+
+def _remove_with_mask_cache(source_image, session, settings, alpha_matting, log=None, timer=None):
+    """마스크 캐시 사용: 마스크만 캐시/추론으로 얻고 cutout 또는 trimap + Alpha Matting은 매번 다시 계산"""
+    with stage(timer, "decode"):
+        image = ImageOps.exif_transpose(source_image)
+    mask = cached_mask(image, session, settings, log=log, timer=timer)
+
+    if alpha_matting is not None:
+        _log(log, f"  🎯 Alpha Matting 적용 (FG:{alpha_matting[0]}, BG:{alpha_matting[1]}, Erode:{alpha_matting[2]})")
+        try:
+            with stage(timer, "matting"):
+                return matting_from_mask(processing.load_rgb_image(image), mask, *alpha_matting, log=log)
+        except ImportError:
+            raise
+        except Exception as e:
+            _log(log, f"  ❌ Alpha Matting 처리 오류: {str(e)}. 기본 처리 사용")
+
+    with stage(timer, "cutout"):
+        return processing.naive_cutout(image, mask)
+
+
+def prescale_source(source, settings):
+    """추론 전 리사이즈 설정(resize + resize_before_inference)이면 축소한 입력, 아니면 source 그대로"""
+    if not (settings.resize and settings.resize_before_inference):
+        return source
+    return processing.prescale_input(source, (settings.resize_width, settings.resize_height), settings.maintain_aspect)
+
+
+def remove_image(source, session, settings, log=None, timer=None):
+    """
+    이미지 하나의 배경 제거 → RGBA PIL Image
+    source: 파일 경로, PIL Image 또는 인코딩된 버퍼
+    Alpha Matting 라이브러리가 없으면 ImportError를 그대로 전달 (설치 안내는 호출 측에서)
+    timer: metrics.StageTimer (decode/infer/matting 단계 기록, 선택)
+    settings.mask_cache이면 모델 마스크를 캐시에서 읽거나 추론 후 저장 (cached_mask 참고)
+    무거운 모델(HEAVY_MODELS)은 큰 이미지를 자동으로 축소 추론 (fit_model_settings 참고)
+    """
+    source_image = processing.open_input(source)
+    settings = fit_model_settings(settings)
+    alpha_matting = None
+    if settings.alpha_matting:
+        alpha_matting = (settings.foreground_threshold, settings.background_threshold, settings.erode_size)
+
+    # 마스크 캐시: 같은 이미지/모델이면 추론 없이 저장된 마스크로 matting만 다시 계산
+    if settings.mask_cache:
+        return _remove_with_mask_cache(source_image, session, settings, alpha_matting, log=log, timer=timer)
+
+    # 대용량 이미지는 축소본으로 추론 (지연 로딩 이미지라 헤더 크기만 확인)
+    if settings.proxy_inference and max(source_image.size) > settings.proxy_max_side:
+        if alpha_matting is not None:
+            _log(log, f"  🎯 Alpha Matting 적용 (경계 대역만, FG:{alpha_matting[0]}, BG:{alpha_matting[1]}, Erode:{alpha_matting[2]})")
+        return processing.remove_background_proxy(
+            source_image, session, settings.proxy_max_side, alpha_matting=alpha_matting, log=log, timer=timer
+        )
+
+    # 지연 로딩 이미지의 디코딩 시간을 추론과 분리해서 측정
+    with stage(timer, "decode"):
+        source_image.load()
+
+    if alpha_matting is None:
+        with stage(timer, "infer"):
+            return remove(source_image, session=session)
+
+    _log(log, f"  🎯 Alpha Matting 적용 (FG:{alpha_matting[0]}, BG:{alpha_matting[1]}, Erode:{alpha_matting[2]})")
+    try:
+        return matting_cutout(source_image, session, *alpha_matting, log=log, timer=timer)
+    except ImportError:
+        raise
+    except Exception as e:
+        _log(log, f"  ❌ Alpha Matting 처리 오류: {str(e)}. 기본 처리 사용")
+        with stage(timer, "infer"):
+            return remove(source_image, session=session)
+
+
+def resize_image(image, settings):
+    """출력 이미지 리사이즈 (리사이즈 미사용 시 그대로 반환)"""
+    if not settings.resize:
+        return image
+
+    target_size = (settings.resize_width, settings.resize_height)
+    if settings.maintain_aspect:
+        # 비율 유지하며 리사이즈
+        image.thumbnail(target_size, Image.Resampling.LANCZOS)
+        return image
+    # 강제 리사이즈
+    return image.resize(target_size, Image.Resampling.LANCZOS)
+
+
+def create_output_folder(folder, output_root=OUTPUT_ROOT, log=None):
+    """입력 폴더명으로 출력 폴더 생성 (중복 시 이름_2, 이름_3 ...)"""
+    folder_name = Path(folder).name
+    output_root = Path(output_root)
+    output_root.mkdir(parents=True, exist_ok=True)
+
+    output_folder = PathAllocator(output_root).allocate(folder_name)
+    output_folder.mkdir(parents=True, exist_ok=True)
+
+    if output_folder.name != folder_name:
+        _log(log, f"📁 출력 폴더 생성 (중복으로 인한 이름 변경): {output_folder}")
+    else:
+        _log(log, f"📁 출력 폴더 생성: {output_folder}")
+    return output_folder
+
+
+def summarize_comparisons(comparisons):
+    """정확도 비교 결과 요약 (평균 IoU, 최저 IoU, 평균 알파오차)"""
+    return {
+        'count': len(comparisons),
+        'mean_iou': sum(c['iou'] for c in comparisons) / len(comparisons),
+        'worst_iou': min(c['iou'] for c in comparisons),
+        'mean_mad': sum(c['mad'] for c in comparisons) / len(comparisons),
+    }
+
+
+def process_folder(folder, output_folder, settings, session=None, remove_fn=None, log=None,
+                   progress=None, completed=None, on_file_done=None, control=None, files=None, claim=None,
+                   report_path=None, remove_pool=None):
+    """
+    폴더 이미지 일괄 배경 제거 (입력 폴더 구조대로 output_folder에 저장) → 결과 통계 dict
+    remove_fn(입력, timer, 설정): 배경 제거 함수 (기본값: session으로 remove_image 호출)
+                               설정은 메모리 예산 때문에 축소 추론으로 바뀐 이미지별 설정일 수 있음
+    completed: 이미 처리된 파일 {상대 경로: 출력 경로} → 추론하지 않고 건너뜀
+               (지정하면 이어서 처리로 간주하여 기록되지 않은 이전 출력 파일은 덮어씀)
+    on_file_done(상대 경로, 출력 경로): 파일 저장이 끝날 때마다 호출 (작업 저장소 기록용)
+    progress(처리 수): 이미지 하나를 처리할 때마다 호출
+    control: JobControl (이미지 사이마다 확인, 중지 시 저장이 끝난 파일까지 기록 후 ProcessingCancelled 발생)
+    files: [(이미지 경로, 출력 상대 경로)] 처리할 순서와 출력 이름을 미리 정한 목록 (분할 처리용)
+           지정하면 폴더를 탐색하지 않고, 이름 중복 처리 없이 정해진 경로에 저장 (다른 노드의 임시 파일도 건드리지 않음)
+    claim(상대 경로): 처리 직전에 호출, False면 다른 노드가 처리하므로 건너뜀 (stats['claimed_elsewhere'])
+    report_path: 실행 리포트 경로 (기본값: output_folder/run_report.json)
+    remove_pool: worker_pool.RemovalPool (지정하면 session/remove_fn 대신 작업자 프로세스에서 여러 장을 동시에 추론)
+    단계별 시간/처리 속도/최대 메모리 리포트는 output_folder/run_report.json에 저장 (stats['report'])
+    settings.memory_budget_mb가 있으면 헤더 크기로 추정한 메모리 합계가 예산을 넘지 않도록
+    다음 이미지 처리를 인코딩 대기 결과가 줄어들 때까지 미루고, 혼자서도 넘는 이미지는 축소 추론으로 처리
+    """
+    folder = Path(folder)
+    output_folder = Path(output_folder)
+    if remove_fn is None:
+        remove_fn = lambda source, timer, image_settings: remove_image(
+            source, session, image_settings, log=log, timer=timer
+        )
+    stats = {'processed': 0, 'success': 0, 'failed': 0, 'skipped': 0, 'claimed_elsewhere': 0, 'comparisons': []}
+    timer = metrics.StageTimer()
+
+    # 이미지 파일 탐색 (발견 즉시 처리하도록 스트리밍, 전체 목록을 기다리지 않음)
+    if files is None:
+        planned = ((image_path, None) for image_path in
+                   file_utils.iter_image_files(folder, SUPPORTED_FORMATS, recursive=settings.recursive))
+    else:
+        planned = iter(files)
+    first_item = next(planned, None)
+    if first_item is None:
+        _log(log, "❌ 처리할 이미지 파일이 없습니다.")
+        return stats
+    planned = itertools.chain([first_item], planned)
+
+    # 처리 설정 정보 로그
+    _log(log, "🚀 파일 처리 시작" + (" (하위 폴더 포함, 폴더 구조 유지)" if settings.recursive else ""))
+    _log(log, f"🤖 사용 모델: {MODEL_OPTIONS.get(settings.model, settings.model)}")
+    fitted = fit_model_settings(settings)
+    if fitted is not settings:
+        _log(log, f"🧠 메모리를 많이 쓰는 모델이라 {fitted.proxy_max_side}px보다 큰 이미지는 축소 추론")
+        settings = fitted
+    if settings.alpha_matting:
+        _log(log, "🎯 Alpha Matting: 활성화")
+    if settings.resize:
+        _log(log, f"📏 리사이즈: {settings.describe_resize()}")
+    if settings.mask_cache:
+        _log(log, f"♻️ 마스크 캐시: 활성화 ({mask_cache.default_cache().folder})")
+
+    # 추론 전 리사이즈 (리사이즈 사용 시에만 의미 있음)
+    prescale = settings.resize and settings.resize_before_inference
+    compare = prescale and settings.compare_resize_accuracy
+    if prescale:
+        _log(log, "⚡ 추론 전 리사이즈: 활성화" + (" (정확도 비교)" if compare else ""))
+
+    output_format = settings.output_format
+    output_suffix = processing.OUTPUT_SUFFIXES[output_format]
+    encode_workers = max(1, settings.encode_workers)
+    _log(log, f"💾 출력 형식: {processing.OUTPUT_FORMATS[output_format]}" +
+         (f" (압축 {settings.png_compress_level})" if output_format == "png" else "") +
+         f", 인코딩 작업자 {encode_workers}개")
+
+    budget = memory_budget.MemoryBudget(settings.memory_budget_mb)
+    downscaled = 0
+    if budget.enabled:
+        _log(log, f"💾 메모리 예산: {settings.memory_budget_mb}MB (헤더 크기로 추정해 동시 처리량과 처리 방식 조절)")
+
+    def plan_memory(image_path):
+        """메모리 예산 기준 이미지별 (설정, 작업 메모리 추정, 결과 메모리 추정)"""
+        nonlocal downscaled
+        size = memory_budget.read_image_size(image_path)
+        if size is None:
+            return settings, 0, 0
+
+        work_bytes = memory_budget.estimate_removal_bytes(size, settings)
+        if not budget.fits(work_bytes) and not settings.proxy_inference:
+            proxy_settings = replace(settings, proxy_inference=True)
+            proxy_bytes = memory_budget.estimate_removal_bytes(size, proxy_settings)
+            if proxy_bytes < work_bytes:
+                downscaled += 1
+                _log(log, f"  💾 예상 메모리 {memory_budget.format_mb(work_bytes)}가 예산"
+                          f"({memory_budget.format_mb(budget.limit)})을 넘어 축소 추론으로 전환 "
+                          f"(최대 변 {proxy_settings.proxy_max_side}px)")
+                return proxy_settings, proxy_bytes, memory_budget.estimate_output_bytes(size, proxy_settings)
+
+        if not budget.fits(work_bytes):
+            _log(log, f"  ⚠️ 예상 메모리 {memory_budget.format_mb(work_bytes)}가 예산"
+                      f"({memory_budget.format_mb(budget.limit)})보다 커서 다른 이미지 없이 단독 처리")
+        return settings, work_bytes, memory_budget.estimate_output_bytes(size, settings)
+
+    # 이어서 처리: 완료 기록된 출력 이름만 사용 중으로 간주
+    reserved = None
+    if completed is not None:
+        reserved = {}
+        for output in completed.values():
+            if output:
+                output_path = Path(output)
+                reserved.setdefault(output_path.parent, []).append(output_path.name)
+        if completed:
+            _log(log, f"♻️ 이전에 완료된 파일 {len(completed)}개는 건너뜀")
+        removed = file_utils.remove_partial_files(output_folder) if files is None else 0
+        if removed:
+            _log(log, f"🧹 이전 실행에서 남은 임시 파일 {removed}개 삭제")
+    completed = completed or {}
+
+    # 출력 폴더 목록을 한 번만 읽고 이후 이름 중복은 메모리에서 판별 (하위 폴더별 할당기)
+    allocators = {}
+
+    def allocate(relative_path, output_filename, planned_output):
+        if planned_output is not None:
+            output_path = output_folder / planned_output
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            return output_path
+        target_folder = output_folder / relative_path.parent
+        allocator = allocators.get(target_folder)
+        if allocator is None:
+            target_folder.mkdir(parents=True, exist_ok=True)
+            taken = reserved.get(target_folder, ()) if reserved is not None else None
+            allocator = PathAllocator(target_folder, taken=taken)
+            allocators[target_folder] = allocator
+        return allocator.allocate(output_filename)
+
+    def collect(pending_item):
+        future, relative_key, image_name, output_filename = pending_item
+        try:
+            output_path = future.result()
+        except Exception as e:
+            _log(log, f"❌ 저장 오류 ({image_name}): {str(e)}")
+            return
+        if output_path.name != output_filename:
+            _log(log, f"✅ 저장 완료 (중복으로 인한 이름 변경): {output_path.name}")
+        else:
+            _log(log, f"✅ 저장 완료: {output_filename}")
+        stats['success'] += 1
+        timer.count_item()
+        # 저장이 끝난 뒤에만 완료로 기록 (중단 시 저장되지 않은 파일은 다시 처리)
+        if on_file_done is not None:
+            on_file_done(relative_key, output_path)
+
+    pending = []  # 저장 중 (future, 상대 경로, 원본 파일명, 출력 파일명)
+    in_flight = collections.deque()  # 추론 중 (future, 이미지 경로, 상대 경로, 정해진 출력 경로, 입력, 설정, 예약 메모리, 결과 메모리)
+    max_in_flight = remove_pool.workers + 1 if remove_pool is not None else 1
+    if remove_pool is not None:
+        _log(log, f"🧵 작업자 프로세스 {remove_pool.workers}개로 동시 추론")
+
+    def start_removal(source, image_timer, image_settings):
+        """추론 시작 → 결과 Future (작업자 풀이 없으면 이 스레드에서 바로 처리)"""
+        if remove_pool is not None:
+            return remove_pool.submit(source, image_timer, image_settings)
+        future = Future()
+        try:
+            future.set_result(remove_fn(source, image_timer, image_settings))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def count_processed():
+        stats['processed'] += 1
+        if progress is not None:
+            progress(stats['processed'])
+
+    def finish(item, encoder_pool):
+        """추론 결과를 받아 리사이즈/정확도 비교 후 저장 요청"""
+        (future, image_path, relative_path, planned_output, input_source,
+         image_settings, reserved_bytes, output_bytes) = item
+        try:
+            output_image = future.result()
+
+            if settings.resize:
+                original_size = output_image.size
+                _log(log, f"  원본 크기: {original_size[0]}x{original_size[1]}")
+                with timer.stage("resize"):
+                    output_image = resize_image(output_image, settings)
+                new_size = output_image.size
+                _log(log, f"  리사이즈 후: {new_size[0]}x{new_size[1]}")
+
+            # 정확도 비교: 원본 해상도로 처리 후 리사이즈한 결과와 비교
+            if compare and input_source is not image_path:
+                reference_image = resize_image(start_removal(image_path, None, image_settings).result(), settings)
+                comparison = processing.compare_alpha(output_image, reference_image)
+                stats['comparisons'].append(comparison)
+                _log(log, f"  🔬 정확도 비교: IoU={comparison['iou']:.4f}, 알파 평균오차={comparison['mad']:.2f}")
+
+            # 결과 저장 (투명도를 유지하는 선택 형식으로 인코딩)
+            output_filename = image_path.stem + output_suffix if planned_output is None else planned_output.name
+            output_path = allocate(relative_path, output_filename, planned_output)
+            future = encoder_pool.submit(
+                processing.save_output, output_image, output_path, output_format,
+                settings.png_compress_level, timer
+            )
+            pending.append((future, relative_path.as_posix(), image_path.name, output_filename))
+
+            # 추론이 끝났으므로 결과 이미지 몫만 남기고 해제, 나머지는 저장이 끝나면 해제
+            if reserved_bytes:
+                budget.release(reserved_bytes - output_bytes)
+                future.add_done_callback(lambda _future, nbytes=output_bytes: budget.release(nbytes))
+                reserved_bytes = 0
+
+            # 완료된 저장 결과 수집 (대기 중인 결과가 쌓이지 않도록 제한)
+            while pending and (pending[0][0].done() or len(pending) > encode_workers * 2):
+                collect(pending.pop(0))
+
+        except Exception as e:
+            _log(log, f"❌ 오류 ({image_path.name}): {str(e)}")
+            budget.release(reserved_bytes)
+        count_processed()
+
+    # 출력 인코딩은 별도 작업자 풀에서 처리 (다음 이미지 추론과 병행)
+    try:
+        with ThreadPoolExecutor(max_workers=encode_workers) as encoder_pool:
+            try:
+                for image_path, planned_output in planned:
+                    relative_path = image_path.relative_to(folder)
+                    relative_key = relative_path.as_posix()
+                    if relative_key in completed:
+                        stats['skipped'] += 1
+                        continue
+
+                    if control is not None:
+                        control.checkpoint()
+
+                    if claim is not None and not claim(relative_key):
+                        stats['claimed_elsewhere'] += 1
+                        continue
+
+                    reserved_bytes = 0
+                    try:
+                        _log(log, f"🖼️ 처리 중: {image_path.name}")
+
+                        # 메모리 예산: 앞선 결과의 인코딩이 끝나 자리가 날 때까지 대기
+                        # (추론 중인 이미지가 예약을 잡고 있으면 이 스레드가 기다려서는 풀리지 않으므로 먼저 마무리)
+                        image_settings, work_bytes, output_bytes = settings, 0, 0
+                        if budget.enabled:
+                            image_settings, work_bytes, output_bytes = plan_memory(image_path)
+                            needed_bytes = max(work_bytes, output_bytes)
+                            reserved_bytes = budget.try_reserve(needed_bytes)
+                            while reserved_bytes is None and in_flight:
+                                finish(in_flight.popleft(), encoder_pool)
+                                reserved_bytes = budget.try_reserve(needed_bytes)
+                            if reserved_bytes is None:
+                                reserved_bytes = budget.reserve(needed_bytes)
+
+                        # 원본 이미지는 경로로 전달 (파일 전체를 bytes로 읽어 복사하지 않고 PIL이 지연 로딩)
+                        input_source = image_path
+                        if prescale:
+                            with timer.stage("prescale"):
+                                input_source = prescale_source(image_path, settings)
+
+                        in_flight.append((start_removal(input_source, timer, image_settings), image_path, relative_path,
+                                          planned_output, input_source, image_settings, reserved_bytes, output_bytes))
+
+                    except Exception as e:
+                        _log(log, f"❌ 오류 ({image_path.name}): {str(e)}")
+                        budget.release(reserved_bytes)
+                        count_processed()
+                        continue
+
+                    # 작업자가 모두 바쁘면 먼저 보낸 이미지부터 마무리 (출력 이름은 입력 순서대로 정해짐)
+                    while len(in_flight) >= max_in_flight:
+                        finish(in_flight.popleft(), encoder_pool)
+            finally:
+                # 중지되더라도 이미 추론을 시작한 이미지는 마무리해서 저장
+                while in_flight:
+                    finish(in_flight.popleft(), encoder_pool)
+    finally:
+        # 작업자 풀 종료 시 남은 저장이 모두 끝나므로, 중단되더라도 저장된 파일은 완료로 기록
+        for pending_item in pending:
+            collect(pending_item)
+
+    stats['failed'] = stats['processed'] - stats['success']
+
+    extra = {}
+    if stats['claimed_elsewhere']:
+        extra['claimed_elsewhere'] = stats['claimed_elsewhere']
+        _log(log, f"🔒 다른 노드가 처리 중이거나 처리한 파일 {stats['claimed_elsewhere']}개는 건너뜀")
+    if remove_pool is not None:
+        extra['worker_pool'] = remove_pool.memory_report()
+        for line in remove_pool.format_memory():
+            _log(log, line)
+    if settings.mask_cache:
+        samples = timer.samples()
+        hits = len(samples.get('mask_cache', ()))
+        misses = len(samples.get('mask_cache_miss', ()))
+        extra['mask_cache'] = {'hits': hits, 'misses': misses}
+        _log(log, f"♻️ 마스크 캐시: 적중 {hits}장 (추론 생략), 새로 추론 {misses}장")
+    if budget.enabled:
+        extra['memory_budget'] = {'budget_mb': settings.memory_budget_mb, 'waits': budget.waits, 'downscaled': downscaled}
+        if budget.waits or downscaled:
+            _log(log, f"💾 메모리 예산: 대기 {budget.waits}회, 축소 추론 전환 {downscaled}장")
+
+    # 실행 리포트 (이번 실행에서 처리한 이미지 기준, 이어서 처리한 경우 건너뛴 파일 제외)
+    stats['report'] = timer.report(
+        folder=str(folder),
+        output_folder=str(output_folder),
+        settings=settings.to_dict(),
+        success=stats['success'],
+        failed=stats['failed'],
+        skipped=stats['skipped'],
+        **extra
+    )
+    try:
+        stats['report_path'] = metrics.write_report(stats['report'], report_path or metrics.report_path_for(output_folder))
+    except OSError as e:
+        _log(log, f"⚠️ 실행 리포트 저장 실패: {str(e)}")
+    return stats
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+배경 제거 미리보기 (GUI 미리보기 창용)
+선택한 이미지 한 장을 축소본으로 열어 모델 마스크를 한 번만 추론해 메모리에 캐시하고,
+Alpha Matting 임계값 등 설정이 바뀌면 캐시된 마스크로 cutout / trimap + matting만 다시 계산
+렌더링은 백그라운드 스레드 하나에서 처리하며, 처리 중에 들어온 요청은 가장 마지막 것만 남김
+"""
+
+import collections
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+import pipeline
+import processing
+
+DEFAULT_PREVIEW_MAX_SIDE = 512  # 미리보기 축소본 최대 변 길이
+DEFAULT_DEBOUNCE_MS = 200  # 설정 변경 후 이 시간(ms) 동안 추가 변경이 없으면 다시 렌더링
+MASK_CACHE_SIZE = 16  # 메모리에 남겨 둘 (이미지, 모델)별 마스크 수
+ORIENTATION_TAG = 0x0112  # EXIF 회전 정보 (5-8이면 가로/세로가 바뀜)
+
+
+def _log(log, message):
+    """log 콜백이 있을 때만 메시지 출력"""
+    if log is not None:
+        log(message)
+
+
+@dataclass
+class PreviewResult:
+    """미리보기 렌더링 결과 (error가 있으면 image는 None)"""
+    source: Path
+    image: Image.Image = None  # 축소본 크기의 RGBA 결과
+    original_size: tuple = None
+    mask_cached: bool = False  # True면 추론 없이 캐시된 마스크로 다시 계산
+    infer_s: float = 0.0
+    render_s: float = 0.0
+    error: str = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def checkerboard(image, cell=8):
+    """투명 영역이 보이도록 RGBA 이미지를 체크무늬 배경 위에 합성한 RGB 이미지"""
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    gray = Image.new('RGB', (cell, cell), (204, 204, 204))
+    for y in range(0, image.size[1], cell):
+        for x in range((y // cell) % 2 * cell, image.size[0], cell * 2):
+            background.paste(gray, (x, y))
+    background.paste(image, (0, 0), image)
+    return background
+
+
+class PreviewRenderer:
+    """
+    미리보기 렌더러 (GUI 스레드에서 request, 결과는 on_result(PreviewResult)로 작업 스레드에서 전달)
+    축소본과 마스크는 (경로, 수정 시각, 모델)로 캐시하므로 파일이 바뀌면 다시 추론
+    """
+
+    def __init__(self, on_result=None, max_side=DEFAULT_PREVIEW_MAX_SIDE, log=None):
+        self.max_side = max_side
+        self._on_result = on_result
+        self._log = log
+        self._sessions = {}  # 모델 → 세션
+        self._proxy = None  # (경로, 수정 시각, 축소본, 원본 크기)
+        self._masks = collections.OrderedDict()  # (경로, 수정 시각, 모델) → L 모드 마스크
+        self._condition = threading.Condition()
+        self._pending = None
+        self._generation = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="preview-worker", daemon=True)
+        self._thread.start()
+
+    def request(self, source, settings):
+        """미리보기 요청 (앞서 기다리던 요청은 버림, 바로 반환)"""
+        with self._condition:
+            self._generation += 1
+            self._pending = (self._generation, Path(source), settings)
+            self._condition.notify()
+
+    def close(self):
+        """작업 스레드 종료 (진행 중인 렌더링은 끝나고 결과는 버림)"""
+        with self._condition:
+            self._closed = True
+            self._pending = None
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                generation, source, settings = self._pending
+                self._pending = None
+
+            result = self.render(source, settings)
+
+            with self._condition:
+                # 렌더링하는 동안 새 요청이 들어왔으면 오래된 결과는 표시하지 않음
+                stale = self._closed or generation != self._generation
+            if not stale and self._on_result is not None:
+                self._on_result(result)
+
+    def _load_proxy(self, source):
+        """축소본 (같은 파일이면 재사용) → (수정 시각, 축소본, 원본 크기)"""
+        modified = source.stat().st_mtime_ns
+        if self._proxy is not None and self._proxy[:2] == (source, modified):
+            return self._proxy[1:]
+
+        with Image.open(source) as image:
+            # 원본 크기는 EXIF 회전을 반영해 헤더에서 확인 (draft로 줄이기 전)
+            original_size = image.size
+            if image.getexif().get(ORIENTATION_TAG) in (5, 6, 7, 8):
+                original_size = original_size[::-1]
+            # JPEG는 디코딩 단계에서 미리 줄여서 읽음 (큰 사진도 빠르게 열림)
+            image.draft('RGB', (self.max_side, self.max_side))
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+            image.thumbnail((self.max_side, self.max_side), Image.Resampling.LANCZOS)
+            image.load()
+        self._proxy = (source, modified, image, original_size)
+        return self._proxy[1:]
+
+    def _session(self, model):
+        session = self._sessions.get(model)
+        if session is None:
+            session = pipeline.create_session(model, log=self._log)
+            # 무거운 모델은 pipeline이 프로세스에 하나만 유지 (처리 중인 작업과 같은 세션 공유)
+            if pipeline.model_profile(model) is None:
+                self._sessions[model] = session
+        return session
+
+    def render(self, source, settings):
+        """미리보기 한 장 렌더링 (작업 스레드 밖에서 바로 호출해도 됨) → PreviewResult"""
+        source = Path(source)
+        result = PreviewResult(source)
+        try:
+            modified, proxy, result.original_size = self._load_proxy(source)
+
+            key = (source, modified, settings.model)
+            mask = self._masks.get(key)
+            result.mask_cached = mask is not None
+            if mask is None:
+                session = self._session(settings.model)
+                started = time.perf_counter()
+                mask = pipeline.mask_channel(processing.predict_mask(proxy, session))
+                result.infer_s = time.perf_counter() - started
+                self._masks[key] = mask
+                while len(self._masks) > MASK_CACHE_SIZE:
+                    self._masks.popitem(last=False)
+            else:
+                self._masks.move_to_end(key)
+
+            started = time.perf_counter()
+            result.image = self._cutout(proxy, mask, settings, result.original_size)
+            result.render_s = time.perf_counter() - started
+        except Exception as e:
+            result.error = str(e)
+        return result
+
+    def _cutout(self, proxy, mask, settings, original_size):
+        """캐시된 마스크로 결과 계산 (Alpha Matting 침식 크기는 축소 비율만큼 줄여 원본 처리와 비슷한 경계 폭 유지)"""
+        if not settings.alpha_matting:
+            return processing.naive_cutout(proxy, mask)
+
+        erode_size = processing.scaled_erode_size(settings.erode_size, proxy.size, original_size)
+        try:
+            return pipeline.matting_from_mask(
+                processing.load_rgb_image(proxy), mask,
+                settings.foreground_threshold, settings.background_threshold, erode_size
+            )
+        except ImportError:
+            raise
+        except Exception as e:
+            _log(self._log, f"  ❌ 미리보기 Alpha Matting 오류: {str(e)}. 기본 처리로 표시")
+            return processing.naive_cutout(proxy, mask)
+
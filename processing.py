@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+배경 제거 처리 로직
+GUI와 분리된 순수 이미지 처리 함수들 (대용량 이미지용 프록시 추론, 경계 보정, 부분 Alpha Matting)
+"""
+
+import io
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PIL import Image, ImageOps
+import numpy as np
+from rembg import remove
+
+from file_utils import atomic_output
+from metrics import stage
+
+# 프록시 추론 기본 최대 변 길이 (이보다 큰 이미지는 축소본으로 마스크 추론)
+DEFAULT_PROXY_MAX_SIDE = 2048
+
+# 경계 보정/Alpha Matting 타일 크기
+DEFAULT_TILE_SIZE = 512
+
+
+def _log(log, message):
+    """log 콜백이 있을 때만 메시지 출력"""
+    if log is not None:
+        log(message)
+
+
+class _BufferReader(io.RawIOBase):
+    """memoryview/mmap 버퍼를 복사 없이 읽는 파일 객체 (BytesIO는 memoryview를 복사함)"""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast('B')
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, offset)
+        return self._position
+
+    def readinto(self, target):
+        chunk = self._view[self._position:self._position + len(target)]
+        target[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+
+def open_input(source):
+    """
+    입력 이미지를 지연 로딩으로 열기 (헤더만 읽고 픽셀은 필요할 때 디코딩)
+    source: 파일 경로(PIL이 파일에서 직접 읽음), PIL Image, 또는 bytes/memoryview 버퍼(복사 없음)
+    """
+    if isinstance(source, Image.Image):
+        return source
+    if isinstance(source, (str, os.PathLike)):
+        return Image.open(source)
+    if isinstance(source, bytes):
+        return Image.open(io.BytesIO(source))
+    return Image.open(_BufferReader(source))
+
+
+def load_rgb_image(image):
+    """EXIF 회전을 반영한 RGB 이미지 반환"""
+    image = ImageOps.exif_transpose(image)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return image
+
+
+def proxy_size(size, max_side):
+    """최대 변 길이가 max_side가 되도록 비율 유지 축소 크기 계산"""
+    width, height = size
+    scale = max_side / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def scaled_erode_size(erode_size, size, original_size):
+    """원본 픽셀 기준 침식 크기 → 축소본(size) 기준 (축소본에서도 원본과 비슷한 경계 폭 유지, 0은 그대로)"""
+    if erode_size <= 0:
+        return 0
+    return max(1, round(erode_size * max(size) / max(original_size)))
+
+
+def build_trimap(mask_array, fg_threshold, bg_threshold, log=None):
+    """마스크로부터 trimap 생성: 0(배경), 128(불확실), 255(전경)"""
+    unique_values = np.unique(mask_array)
+    _log(log, f"  📊 마스크 값 분포: min={mask_array.min()}, max={mask_array.max()}, unique={len(unique_values)}")
+
+    trimap = np.zeros_like(mask_array, dtype=np.uint8)
+
+    # 마스크 값을 0-1 범위로 정규화
+    mask_normalized = mask_array.astype(np.float32) / 255.0
+    fg_norm = fg_threshold / 255.0
+    bg_norm = bg_threshold / 255.0
+
+    trimap[mask_normalized > fg_norm] = 255  # 확실한 전경
+    trimap[mask_normalized < bg_norm] = 0    # 확실한 배경
+    trimap[(mask_normalized >= bg_norm) & (mask_normalized <= fg_norm)] = 128  # 불확실
+
+    fg_count = np.sum(trimap == 255)
+    bg_count = np.sum(trimap == 0)
+    uncertain_count = np.sum(trimap == 128)
+    _log(log, f"  🎯 Trimap - 전경: {fg_count}, 배경: {bg_count}, 불확실: {uncertain_count}")
+
+    # 전경이 없으면 임계값 조정
+    if fg_count == 0 and np.any(mask_array > 0):
+        _log(log, f"  ⚠️ 전경 영역이 없음. 임계값을 자동 조정합니다.")
+        # 마스크의 상위 20% 값을 전경으로 설정
+        fg_auto_threshold = np.percentile(mask_array[mask_array > 0], 80)
+        fg_auto_norm = fg_auto_threshold / 255.0
+        trimap[mask_normalized > fg_auto_norm] = 255
+        fg_count = np.sum(trimap == 255)
+        _log(log, f"  🔧 자동 조정된 전경 임계값: {fg_auto_threshold:.1f} (정규화: {fg_auto_norm:.3f}), 전경 픽셀: {fg_count}")
+
+    return trimap
+
+
+def iter_band_tiles(band, tile_size, pad):
+    """
+    band(bool 배열)가 포함된 타일만 순회
+    (inner, outer, local) 슬라이스 튜플 반환:
+    inner=결과를 기록할 영역, outer=패딩 포함 계산 영역, local=outer 내부에서의 inner 위치
+    """
+    rows = np.flatnonzero(band.any(axis=1))
+    cols = np.flatnonzero(band.any(axis=0))
+    if rows.size == 0:
+        return
+
+    height, width = band.shape
+    y_start, y_end = rows[0], rows[-1] + 1
+    x_start, x_end = cols[0], cols[-1] + 1
+
+    for ty in range(y_start, y_end, tile_size):
+        for tx in range(x_start, x_end, tile_size):
+            iy0, iy1 = ty, min(ty + tile_size, y_end)
+            ix0, ix1 = tx, min(tx + tile_size, x_end)
+            if not band[iy0:iy1, ix0:ix1].any():
+                continue
+
+            oy0, oy1 = max(iy0 - pad, 0), min(iy1 + pad, height)
+            ox0, ox1 = max(ix0 - pad, 0), min(ix1 + pad, width)
+            yield (
+                (slice(iy0, iy1), slice(ix0, ix1)),
+                (slice(oy0, oy1), slice(ox0, ox1)),
+                (slice(iy0 - oy0, iy1 - oy0), slice(ix0 - ox0, ix1 - ox0)),
+            )
+
+
+def _box_filter(array, radius):
+    """적분 영상 기반 평균 필터 (가장자리는 edge 패딩)"""
+    size = 2 * radius + 1
+    padded = np.pad(array, radius, mode='edge')
+    integral = np.cumsum(np.cumsum(padded, axis=0), axis=1)
+    integral = np.pad(integral, ((1, 0), (1, 0)))
+    window = (integral[size:, size:] - integral[:-size, size:]
+              - integral[size:, :-size] + integral[:-size, :-size])
+    return window / (size * size)
+
+
+def guided_filter(guide, src, radius, eps):
+    """가이디드 필터 (He et al.) - guide 영상의 경계를 따라 src를 보정"""
+    mean_i = _box_filter(guide, radius)
+    mean_p = _box_filter(src, radius)
+    cov_ip = _box_filter(guide * src, radius) - mean_i * mean_p
+    var_i = _box_filter(guide * guide, radius) - mean_i * mean_i
+
+    a = cov_ip / (var_i + eps)
+    b = mean_p - a * mean_i
+    return _box_filter(a, radius) * guide + _box_filter(b, radius)
+
+
+def refine_mask_edges(image, mask, radius, eps=1e-4, tile_size=DEFAULT_TILE_SIZE):
+    """
+    업샘플된 마스크의 경계(중간값) 영역만 원본 영상 기준으로 가이디드 필터 보정
+    전경/배경이 확실한 영역은 건드리지 않음
+    """
+    mask_array = np.array(mask, dtype=np.uint8)
+    band = (mask_array > 0) & (mask_array < 255)
+    if not band.any():
+        return mask
+
+    gray = np.asarray(image.convert('L'))
+
+    for inner, outer, local in iter_band_tiles(band, tile_size, radius * 2):
+        guide = gray[outer].astype(np.float32) / 255.0
+        src = mask_array[outer].astype(np.float32) / 255.0
+        refined = guided_filter(guide, src, radius, eps)[local]
+
+        tile_band = band[inner]
+        tile_mask = mask_array[inner]
+        tile_mask[tile_band] = np.clip(refined[tile_band] * 255.0 + 0.5, 0, 255).astype(np.uint8)
+
+    return Image.fromarray(mask_array, mode='L')
+
+
+def predict_mask(image, session, max_side=None, log=None, timer=None):
+    """
+    원본 크기의 마스크(L 모드) 예측
+    max_side보다 큰 이미지는 축소본(프록시)으로 추론한 뒤 업샘플 + 경계 보정
+    timer: metrics.StageTimer (infer/resize/refine 단계 기록, 선택)
+    """
+    if not max_side or max(image.size) <= max_side:
+        with stage(timer, "infer"):
+            return remove(image, session=session, only_mask=True)
+
+    small_size = proxy_size(image.size, max_side)
+    _log(log, f"  🔍 프록시 추론: {image.size[0]}x{image.size[1]} → {small_size[0]}x{small_size[1]}")
+
+    with stage(timer, "resize"):
+        proxy = image.resize(small_size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+    with stage(timer, "infer"):
+        small_mask = remove(proxy, session=session, only_mask=True)
+
+    # 축소 배율에 비례한 반경으로 경계만 보정
+    with stage(timer, "refine"):
+        mask = small_mask.resize(image.size, Image.Resampling.BILINEAR)
+        scale = max(image.size) / max_side
+        radius = max(2, math.ceil(scale * 2))
+        return refine_mask_edges(image, mask, radius)
+
+
+def matting_trimap(mask_array, foreground_threshold, background_threshold, erode_structure_size):
+    """rembg.bg.alpha_matting_cutout 내부와 동일한 규칙으로 최종 trimap 계산"""
+    from scipy.ndimage import binary_erosion
+
+    is_foreground = mask_array > foreground_threshold
+    is_background = mask_array < background_threshold
+
+    structure = None
+    if erode_structure_size > 0:
+        structure = np.ones((erode_structure_size, erode_structure_size), dtype=np.uint8)
+
+    is_foreground = binary_erosion(is_foreground, structure=structure)
+    is_background = binary_erosion(is_background, structure=structure, border_value=1)
+
+    trimap = np.full(mask_array.shape, dtype=np.uint8, fill_value=128)
+    trimap[is_foreground] = 255
+    trimap[is_background] = 0
+    return trimap
+
+
+def _solve_matting_tile(image_tile, trimap_tile):
+    """타일 하나의 알파/전경 계산 (pymatting closed-form)"""
+    from pymatting import estimate_alpha_cf, estimate_foreground_ml
+
+    image_tile = image_tile / 255.0
+    alpha = estimate_alpha_cf(image_tile, trimap_tile / 255.0)
+    foreground = estimate_foreground_ml(image_tile, alpha)
+    return alpha, foreground
+
+
+def band_matting_cutout(image, mask, foreground_threshold, background_threshold,
+                        erode_structure_size, tile_size=DEFAULT_TILE_SIZE, workers=None, log=None):
+    """
+    alpha_matting_cutout과 같은 결과를 불확실 영역(trimap==128) 타일에서만 계산
+    타일은 서로 독립적으로 병렬 계산 후 합성하며,
+    전경/배경이 확정된 픽셀은 원본 색상과 0/255 알파를 그대로 사용
+    """
+    import pymatting  # noqa: F401 - 의존성 없으면 여기서 ImportError
+
+    image_array = np.asarray(image)
+    mask_array = np.asarray(mask)
+    trimap = matting_trimap(mask_array, foreground_threshold,
+                            background_threshold, erode_structure_size)
+    unknown = trimap == 128
+
+    result = np.dstack([image_array, trimap]).astype(np.uint8)
+    result[trimap == 0, :3] = 0
+    result[trimap == 128, 3] = 0
+
+    pad = max(erode_structure_size, 8) * 2
+    tiles = []
+    for inner, outer, local in iter_band_tiles(unknown, tile_size, pad):
+        tile_trimap = trimap[outer]
+        if not ((tile_trimap == 0).any() and (tile_trimap == 255).any()):
+            # 확정 전경/배경이 모두 있어야 풀 수 있으므로 한쪽이라도 없으면 원래 마스크 값 사용
+            tile_result = result[inner]
+            tile_unknown = unknown[inner]
+            tile_result[tile_unknown, 3] = mask_array[inner][tile_unknown]
+            continue
+        tiles.append((inner, outer, local))
+
+    _log(log, f"  🧩 Alpha Matting 대상: {np.count_nonzero(unknown)}/{unknown.size} 픽셀, {len(tiles)}개 타일")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tiles) or 1))) as executor:
+        futures = {
+            executor.submit(_solve_matting_tile, image_array[outer], trimap[outer]): (inner, local)
+            for inner, outer, local in tiles
+        }
+        for future in as_completed(futures):
+            inner, local = futures[future]
+            alpha, foreground = future.result()
+
+            tile_unknown = unknown[inner]
+            tile_result = result[inner]
+            tile_result[tile_unknown, :3] = np.clip(foreground[local][tile_unknown] * 255, 0, 255).astype(np.uint8)
+            tile_result[tile_unknown, 3] = np.clip(alpha[local][tile_unknown] * 255, 0, 255).astype(np.uint8)
+
+    return Image.fromarray(result, mode='RGBA')
+
+
+def naive_cutout(image, mask):
+    """마스크를 알파로 사용해 배경 제거 (rembg 기본 방식과 동일)"""
+    empty = Image.new('RGBA', image.size, 0)
+    return Image.composite(image.convert('RGBA'), empty, mask)
+
+
+def remove_background_proxy(image, session, max_side=DEFAULT_PROXY_MAX_SIDE,
+                            alpha_matting=None, log=None, timer=None):
+    """
+    대용량 이미지용 배경 제거: 프록시 추론 → 마스크 업샘플/경계 보정 → (선택) 경계 대역 Alpha Matting
+    alpha_matting: None 또는 (fg_threshold, bg_threshold, erode_size) 튜플
+    """
+    with stage(timer, "decode"):
+        image = load_rgb_image(image)
+    mask = predict_mask(image, session, max_side, log=log, timer=timer)
+
+    if alpha_matting is None:
+        with stage(timer, "cutout"):
+            return naive_cutout(image, mask)
+
+    fg_threshold, bg_threshold, erode_size = alpha_matting
+    with stage(timer, "matting"):
+        return _proxy_matting(image, mask, fg_threshold, bg_threshold, erode_size, log)
+
+
+def _proxy_matting(image, mask, fg_threshold, bg_threshold, erode_size, log):
+    trimap = build_trimap(np.asarray(mask), fg_threshold, bg_threshold, log=log)
+    return band_matting_cutout(
+        image,
+        Image.fromarray(trimap, mode='L'),
+        fg_threshold / 255.0,  # 기존 처리와 동일하게 0-1 정규화 값 사용
+        bg_threshold / 255.0,
+        erode_size,
+        log=log
+    )
+
+
+def prescale_size(size, target_size, maintain_aspect):
+    """
+    추론 전 축소 크기 계산 (확대는 하지 않음, 축소가 필요 없으면 None)
+    비율 유지: 목표 상자 안에 맞춤 / 강제 변경: 목표 크기를 덮는 최소 크기까지만 축소
+    """
+    width, height = size
+    target_width, target_height = target_size
+    if maintain_aspect:
+        ratio = min(target_width / width, target_height / height)
+    else:
+        ratio = max(target_width / width, target_height / height)
+
+    if ratio >= 1:
+        return None
+    return max(1, round(width * ratio)), max(1, round(height * ratio))
+
+
+def prescale_input(source, target_size, maintain_aspect):
+    """입력 이미지를 추론 전에 축소한 PIL Image 반환 (축소 불필요 시 source 그대로 반환)"""
+    image = ImageOps.exif_transpose(open_input(source))
+    new_size = prescale_size(image.size, target_size, maintain_aspect)
+    if new_size is None:
+        return source
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    return image.resize(new_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+def compare_alpha(image, reference):
+    """두 결과 이미지의 알파 채널 비교 (IoU: 알파>127 기준, MAD: 평균 절대 오차 0-255)"""
+    if image.size != reference.size:
+        reference = reference.resize(image.size, Image.Resampling.LANCZOS)
+
+    alpha = np.asarray(image.convert('RGBA'))[..., 3].astype(np.int16)
+    reference_alpha = np.asarray(reference.convert('RGBA'))[..., 3].astype(np.int16)
+
+    solid = alpha > 127
+    reference_solid = reference_alpha > 127
+    union = np.count_nonzero(solid | reference_solid)
+    iou = np.count_nonzero(solid & reference_solid) / union if union else 1.0
+    mad = float(np.abs(alpha - reference_alpha).mean())
+    return {'iou': float(iou), 'mad': mad}
+
+
+# 배경 제거 결과 출력 형식 (속도/용량 선택)
+OUTPUT_FORMATS = {
+    "png": "PNG (압축 레벨 선택, 기본)",
+    "webp": "WebP 무손실 (작은 용량)",
+    "qoi": "QOI (무손실, 외부 도구 연동용, Pillow 11.1 이상)",
+    "npy": "NPY (비압축 RGBA 배열, 후처리 도구용)",
+}
+
+OUTPUT_SUFFIXES = {
+    "png": ".png",
+    "webp": ".webp",
+    "qoi": ".qoi",
+    "npy": ".npy",
+}
+
+DEFAULT_PNG_COMPRESS_LEVEL = 6
+
+
+def encode_image(image, output_format="png", png_compress_level=DEFAULT_PNG_COMPRESS_LEVEL):
+    """RGBA 결과 이미지를 선택한 형식의 bytes로 인코딩"""
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+
+    buffer = io.BytesIO()
+    if output_format == "png":
+        image.save(buffer, format='PNG', compress_level=png_compress_level)
+    elif output_format == "webp":
+        image.save(buffer, format='WEBP', lossless=True, method=2)
+    elif output_format == "qoi":
+        Image.init()
+        if 'QOI' not in Image.SAVE:
+            raise ValueError("현재 Pillow 버전은 QOI 저장을 지원하지 않습니다 (11.1 이상 필요)")
+        image.save(buffer, format='QOI')
+    elif output_format == "npy":
+        np.save(buffer, np.asarray(image))
+    else:
+        raise ValueError(f"지원하지 않는 출력 형식: {output_format}")
+    return buffer.getvalue()
+
+
+def save_output(image, output_path, output_format="png", png_compress_level=DEFAULT_PNG_COMPRESS_LEVEL,
+                timer=None):
+    """결과 이미지를 인코딩하여 저장 (인코딩 작업자 풀에서 호출, 임시 파일에 쓴 뒤 이름 교체)"""
+    with stage(timer, "encode"):
+        data = encode_image(image, output_format, png_compress_level)
+    with stage(timer, "write"):
+        with atomic_output(output_path) as temp_path:
+            with open(temp_path, 'wb') as output_file:
+                output_file.write(data)
+    return output_path
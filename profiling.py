@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+단일 실행 프로파일링 (소스를 고치지 않고 느린 폴더의 원인 확인)
+cpu: cProfile → .prof 파일 (snakeviz, pstats 등으로 열기, 실행 중에 시작된 스레드(인코딩/matting 풀)도 합쳐서 기록)
+memory: tracemalloc → .tracemalloc 스냅샷 (tracemalloc.Snapshot.load로 열기)
+실행이 끝나면(중지/오류 포함) 상위 N개 지점을 로그로 요약
+"""
+
+import cProfile
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from file_utils import atomic_output
+
+# 프로파일링 방식 (GUI 콤보박스/명령줄 --profile 선택지)
+PROFILE_MODES = {
+    "cpu": "CPU 시간 (cProfile, .prof)",
+    "memory": "메모리 할당 (tracemalloc, .tracemalloc)",
+}
+
+DEFAULT_TOP_N = 15
+
+# tracemalloc이 기록할 호출 스택 깊이 (깊을수록 느려짐)
+TRACEMALLOC_FRAMES = 10
+
+
+def _log(log, message):
+    """log 콜백이 있을 때만 메시지 출력"""
+    if log is not None:
+        log(message)
+
+
+class _ThreadProfiles:
+    """
+    실행 중에 새로 시작되는 스레드마다 cProfile을 붙임 (cProfile.enable은 호출한 스레드만 기록하므로
+    인코딩 스레드 풀, 경계 대역 matting 타일 스레드 등은 이렇게 따로 붙여야 결과에 나타남)
+    """
+
+    def __init__(self):
+        self.profiles = []  # (스레드, 프로파일러)
+        self._previous = None
+
+    def _start(self, frame, event, arg):
+        # threading.setprofile 함수는 새 스레드가 시작할 때 그 스레드에서 처음 호출됨 → 그 스레드 전용 프로파일러로 교체
+        profiler = cProfile.Profile()
+        profiler.enable()
+        self.profiles.append((threading.current_thread(), profiler))
+
+    def install(self):
+        self._previous = threading.getprofile()
+        threading.setprofile(self._start)
+
+    def uninstall(self):
+        threading.setprofile(self._previous)
+
+    def merge_into(self, stats, log=None):
+        """스레드별 결과를 stats(pstats.Stats)에 합침 → 합친 스레드 수"""
+        running = 0
+        for thread, profiler in self.profiles:
+            # 다른 스레드의 프로파일러는 disable하지 않고(호출한 스레드 기준으로 동작) 지금까지 기록만 가져옴
+            profiler.snapshot_stats()
+            stats.add(_Snapshot(profiler.stats))
+            if thread.is_alive():
+                running += 1
+        if running:
+            _log(log, f"⚠️ 아직 실행 중인 스레드 {running}개는 지금까지의 기록만 포함 (스레드가 끝날 때까지 계속 기록됨)")
+        return len(self.profiles)
+
+
+class _Snapshot:
+    """이미 계산한 통계를 pstats.Stats에 넘기기 위한 객체 (create_stats가 프로파일러를 멈추지 않도록)"""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def profile_path(output_dir, name, mode):
+    """결과 폴더 안의 프로파일 파일 경로 (이름-시각.prof / .tracemalloc)"""
+    suffix = ".prof" if mode == "cpu" else ".tracemalloc"
+    return Path(output_dir) / f"{name}-profile-{time.strftime('%Y%m%d-%H%M%S')}{suffix}"
+
+
+@contextmanager
+def profile_run(mode, output_dir, name="run", top=DEFAULT_TOP_N, log=None):
+    """
+    with 블록 실행을 프로파일링하고 output_dir에 결과 저장 (mode가 None/빈 값이면 아무것도 하지 않음)
+    py-spy 등 외부 프로파일러로 붙을 수 있도록 시작할 때 프로세스 id와 스레드 이름을 로그에 남김
+    cpu: 블록 안에서 시작된 스레드도 기록해 합침 (작업자 프로세스(--workers)는 포함되지 않으므로 py-spy 사용)
+    """
+    if not mode:
+        yield None
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"지원하지 않는 프로파일링 방식: {mode}")
+
+    _log(log, f"🔬 프로파일링 시작: {PROFILE_MODES[mode]} "
+              f"(pid {os.getpid()}, 스레드 '{threading.current_thread().name}')")
+
+    profiler = thread_profiles = None
+    if mode == "cpu":
+        thread_profiles = _ThreadProfiles()
+        thread_profiles.install()
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+
+    try:
+        yield mode
+    finally:
+        try:
+            output_path = profile_path(output_dir, name, mode)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            if profiler is not None:
+                profiler.disable()
+                thread_profiles.uninstall()
+                stats = pstats.Stats(profiler)
+                threads = thread_profiles.merge_into(stats, log=log)
+                with atomic_output(output_path) as temp_path:
+                    stats.dump_stats(temp_path)
+                lines = format_cpu_hotspots(stats, top)
+                if threads:
+                    lines.insert(1, f"  (작업 스레드 {threads}개 포함)")
+            else:
+                snapshot = tracemalloc.take_snapshot().filter_traces([
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                ])
+                _current, peak = tracemalloc.get_traced_memory()
+                if started_tracing:
+                    tracemalloc.stop()
+                with atomic_output(output_path) as temp_path:
+                    snapshot.dump(temp_path)
+                lines = format_memory_hotspots(snapshot, peak, top)
+
+            for line in lines:
+                _log(log, line)
+            _log(log, f"📄 프로파일 저장: {output_path}")
+        except Exception as e:
+            # 프로파일 저장 실패가 처리 결과(또는 원래 예외)를 가리지 않도록 로그만 남김
+            _log(log, f"⚠️ 프로파일 저장 실패: {str(e)}")
+
+
+def _location(filename, lineno):
+    """로그용 짧은 위치 표시 (파일 이름:줄)"""
+    if filename == "~":
+        return "내장 함수"
+    return f"{os.path.basename(filename)}:{lineno}"
+
+
+def format_cpu_hotspots(stats, top=DEFAULT_TOP_N):
+    """자체 시간(tottime) 상위 함수 요약 줄 목록"""
+    entries = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    lines = [f"🔥 CPU 시간 상위 {len(entries)}개 (자체 / 누적, 총 {stats.total_tt:.2f}s)"]
+    for (filename, lineno, function), (_primitive, calls, own, cumulative, _callers) in entries:
+        lines.append(
+            f"  {own:>8.3f}s / {cumulative:>8.3f}s  {calls:>7}회  {function} ({_location(filename, lineno)})"
+        )
+    return lines
+
+
+def format_memory_hotspots(snapshot, peak, top=DEFAULT_TOP_N):
+    """남아 있는 할당량 상위 위치 요약 줄 목록 (peak: 실행 중 최대 추적 메모리)"""
+    statistics = snapshot.statistics("lineno")[:top]
+    lines = [f"🔥 메모리 할당 상위 {len(statistics)}개 (실행 중 최대 {peak / (1024 * 1024):.1f}MB)"]
+    for stat in statistics:
+        frame = stat.traceback[0]
+        lines.append(
+            f"  {stat.size / (1024 * 1024):>8.2f}MB  {stat.count:>7}개  {_location(frame.filename, frame.lineno)}"
+        )
+    return lines
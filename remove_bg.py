@@ -20,11 +20,21 @@ except ImportError:
     # 기본 Tkinter 사용
     import tkinter as tk
     TkinterDnD = tk
-from PIL import Image
+from PIL import Image, ImageTk
 import threading
-from rembg import remove, new_session
 import time
 import json
+import dataclasses
+import processing
+import file_utils
+import animation
+import pipeline
+import metrics
+import memory_budget
+import preview
+import profiling
+from file_utils import PathAllocator
+from job_store import JobStore, STATUS_DONE
 
 class BackgroundRemover:
     def __init__(self):
@@ -51,7 +61,7 @@ class BackgroundRemover:
         }
         
         # 지원되는 이미지 확장자
-        self.supported_formats = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp'}
+        self.supported_formats = pipeline.SUPPORTED_FORMATS
         
         # 프로그램 종료 처리 설정
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -59,12 +69,21 @@ class BackgroundRemover:
         # 배경 제거 탭 변수들
         self.folder_path = tk.StringVar()
         self.folder_queue = []  # 배경 제거용 폴더 대기열
+        self.folder_jobs = {}  # 폴더 경로 → 작업 저장소 id
+        self.recursive_search = tk.BooleanVar(value=False)  # 하위 폴더 포함 (출력 폴더 구조 유지)
         
         # 설정 변수들
         self.enable_resize = tk.BooleanVar(value=False)
         self.resize_width = tk.StringVar(value="1024")
         self.resize_height = tk.StringVar(value="768")
         self.maintain_aspect = tk.BooleanVar(value=True)
+        self.resize_before_inference = tk.BooleanVar(value=False)  # 추론 전에 축소 (속도 우선)
+        self.compare_resize_accuracy = tk.BooleanVar(value=False)  # 원본 해상도 처리 결과와 비교
+        
+        # 출력 형식 설정 변수들
+        self.output_format = tk.StringVar(value="png")
+        self.png_compress_level = tk.StringVar(value=str(processing.DEFAULT_PNG_COMPRESS_LEVEL))
+        self.encode_workers = tk.StringVar(value="2")
         
         # rembg 설정 변수들 (도트 픽셀 이미지에 최적화된 기본값)
         self.selected_model = tk.StringVar(value="u2netp")  # 도트 픽셀에 최적
@@ -73,25 +92,40 @@ class BackgroundRemover:
         self.alpha_matting_background_threshold = tk.StringVar(value="10")
         self.alpha_matting_erode_size = tk.StringVar(value="10")
         
+        # 대용량 이미지 프록시 추론 설정 (축소본으로 추론 후 마스크 업샘플)
+        self.enable_proxy_inference = tk.BooleanVar(value=False)
+        self.proxy_max_side = tk.StringVar(value=str(processing.DEFAULT_PROXY_MAX_SIDE))
+        
+        # 모델 마스크 캐시 (임계값/리사이즈만 바꿔 다시 처리할 때 추론 생략)
+        self.enable_mask_cache = tk.BooleanVar(value=False)
+        
+        # 미리보기 (선택한 이미지 한 장의 축소본, 설정이 바뀌면 잠시 뒤 다시 렌더링)
+        self.preview_image_path = tk.StringVar()
+        self.preview_renderer = None  # 처음 이미지를 고를 때 생성
+        self.preview_after_id = None
+        self.preview_photo = None  # 표시 중인 이미지 참조 유지
+        
         # rembg 모델 정보
-        self.model_options = {
-            "u2net": "U²-Net (범용)",
-            "u2net_human_seg": "U²-Net Human (사람 전용)",
-            "u2netp": "U²-Net-P (도트픽셀 최적, 추천)",
-            "silueta": "Silueta (고정밀)",
-            "isnet-general-use": "ISNet (최신, 고성능)",
-            "sam": "SAM (Segment Anything)",
-            "birefnet-general": "BiRefNet (최고 품질)"
-        }
+        self.model_options = pipeline.model_options()
         
         # 애니메이션 설정 변수들
         self.animation_folder_path = tk.StringVar()
         self.animation_queue = []  # 애니메이션용 폴더 대기열
+        self.animation_jobs = {}  # 폴더 경로 → 작업 저장소 id
         self.animation_format = tk.StringVar(value="webp")
         self.animation_duration = tk.StringVar(value="100")  # ms per frame
         self.animation_loop = tk.BooleanVar(value=True)
         self.animation_quality = tk.StringVar(value="80")
         self.prevent_ghosting = tk.BooleanVar(value=True)  # 잔상 방지
+        self.animation_frame_order = tk.StringVar(value="name")  # 프레임 순서 결정 방식
+        self.animation_frame_pattern = tk.StringVar(value=animation.DEFAULT_FRAME_PATTERN)
+        
+        # 메모리 예산 (두 탭 공용, MB 단위, 0이면 제한 없음)
+        self.memory_budget_mb = tk.StringVar(value="0")
+        
+        # 프로파일링 설정 (두 탭 공용, 켜면 다음 실행의 작업 스레드 전체를 측정)
+        self.enable_profiling = tk.BooleanVar(value=False)
+        self.profile_mode = tk.StringVar(value="cpu")
         
         # Alpha Matting 사용 가능 여부 체크
         self.alpha_matting_available = self.check_alpha_matting_availability()
@@ -99,7 +133,21 @@ class BackgroundRemover:
         # Alpha Matting 설치 관련 사용자 선택 기억
         self.alpha_matting_install_declined = False
         
+        # 작업 스레드와 중지/일시정지 신호 (시작할 때마다 새로 생성)
+        self.processing_thread = None
+        self.processing_control = pipeline.JobControl()
+        self.animation_thread = None
+        self.animation_control = pipeline.JobControl()
+        
+        # 작업 저장소 (대기열과 파일별 완료 기록, 사용할 수 없으면 기록 없이 동작)
+        try:
+            self.job_store = JobStore()
+        except Exception as e:
+            print(f"⚠️ 작업 저장소를 열 수 없음: {e}")
+            self.job_store = None
+        
         self.setup_ui()
+        self.restore_pending_jobs()
     
     def check_alpha_matting_availability(self):
         """Alpha Matting 라이브러리 사용 가능 여부 확인"""
@@ -339,6 +387,26 @@ class BackgroundRemover:
         self.queue_listbox.pack(side='left', fill='both', expand=True)
         queue_scrollbar.pack(side='right', fill='y')
         
+        # 하위 폴더 포함 옵션
+        recursive_frame = tk.Frame(queue_card, bg=self.colors['card'])
+        recursive_frame.pack(fill='x', padx=20, pady=(0, 15))
+        
+        tk.Checkbutton(
+            recursive_frame,
+            text="📂 하위 폴더 포함",
+            variable=self.recursive_search,
+            command=self.update_queue_display,
+            bg=self.colors['card']
+        ).pack(side='left')
+        
+        tk.Label(
+            recursive_frame, 
+            text="← transparent/ 아래에 같은 폴더 구조로 저장", 
+            font=("맑은 고딕", 8), 
+            bg=self.colors['card'], 
+            fg=self.colors['muted']
+        ).pack(side='left', padx=(5, 0))
+        
         # 리사이즈 설정 카드
         resize_card = tk.Frame(scrollable_frame, bg=self.colors['card'], relief='flat', bd=0)
         resize_card.pack(fill='x', pady=(0, 15), padx=10)
@@ -361,6 +429,72 @@ class BackgroundRemover:
         tk.Label(resize_frame, text="x", bg=self.colors['card']).pack(side='left')
         tk.Entry(resize_frame, textvariable=self.resize_height, width=8).pack(side='left', padx=2)
         
+        # 추론 전 리사이즈 옵션
+        prescale_frame = tk.Frame(resize_card, bg=self.colors['card'])
+        prescale_frame.pack(fill='x', padx=20, pady=(0, 20))
+        
+        tk.Checkbutton(
+            prescale_frame,
+            text="⚡ 추론 전 리사이즈 (빠름)",
+            variable=self.resize_before_inference,
+            bg=self.colors['card']
+        ).pack(side='left')
+        
+        tk.Checkbutton(
+            prescale_frame,
+            text="🔬 정확도 비교",
+            variable=self.compare_resize_accuracy,
+            bg=self.colors['card']
+        ).pack(side='left', padx=(10, 0))
+        
+        tk.Label(
+            prescale_frame, 
+            text="← 원본 해상도 처리 결과와 IoU/오차 비교 (2배 느림)", 
+            font=("맑은 고딕", 8), 
+            bg=self.colors['card'], 
+            fg=self.colors['muted']
+        ).pack(side='left', padx=(5, 0))
+        
+        # 출력 형식 카드
+        output_card = tk.Frame(scrollable_frame, bg=self.colors['card'], relief='flat', bd=0)
+        output_card.pack(fill='x', pady=(0, 15), padx=10)
+        
+        output_frame = tk.Frame(output_card, bg=self.colors['card'])
+        output_frame.pack(fill='x', padx=20, pady=(20, 5))
+        
+        tk.Label(
+            output_frame, 
+            text="💾 출력 형식:", 
+            font=("맑은 고딕", 10, "bold"), 
+            bg=self.colors['card'], 
+            fg=self.colors['primary']
+        ).pack(side='left')
+        
+        self.output_format_combo = ttk.Combobox(
+            output_frame,
+            textvariable=self.output_format,
+            values=list(processing.OUTPUT_FORMATS.keys()),
+            state='readonly',
+            width=8
+        )
+        self.output_format_combo.pack(side='left', padx=10)
+        self.output_format_combo.bind('<<ComboboxSelected>>', self.on_output_format_change)
+        
+        tk.Label(output_frame, text="PNG 압축(0-9):", bg=self.colors['card']).pack(side='left', padx=(10, 2))
+        tk.Entry(output_frame, textvariable=self.png_compress_level, width=4).pack(side='left', padx=2)
+        
+        tk.Label(output_frame, text="인코딩 작업자:", bg=self.colors['card']).pack(side='left', padx=(10, 2))
+        tk.Entry(output_frame, textvariable=self.encode_workers, width=4).pack(side='left', padx=2)
+        
+        self.output_format_description = tk.Label(
+            output_card,
+            text=processing.OUTPUT_FORMATS[self.output_format.get()],
+            font=("맑은 고딕", 8),
+            bg=self.colors['card'],
+            fg=self.colors['muted']
+        )
+        self.output_format_description.pack(anchor='w', padx=20, pady=(0, 15))
+        
         # rembg 설정 카드
         rembg_card = tk.Frame(scrollable_frame, bg=self.colors['card'], relief='flat', bd=0)
         rembg_card.pack(fill='x', pady=(0, 10), padx=10)
@@ -412,6 +546,50 @@ class BackgroundRemover:
         )
         self.model_description.pack(anchor='w', pady=(0, 10))
         
+        # 대용량 이미지 프록시 추론 설정
+        proxy_frame = tk.Frame(rembg_card, bg=self.colors['card'])
+        proxy_frame.pack(fill='x', padx=15, pady=(0, 10))
+        
+        tk.Checkbutton(
+            proxy_frame,
+            text="🔍 대용량 이미지 축소 추론",
+            variable=self.enable_proxy_inference,
+            font=("맑은 고딕", 9, "bold"),
+            bg=self.colors['card'],
+            fg=self.colors['primary']
+        ).pack(side='left')
+        
+        tk.Label(proxy_frame, text="최대 변:", bg=self.colors['card']).pack(side='left', padx=(10, 2))
+        tk.Entry(proxy_frame, textvariable=self.proxy_max_side, width=8).pack(side='left', padx=2)
+        tk.Label(
+            proxy_frame, 
+            text="px 초과 시 축소본으로 마스크 추론 후 경계 보정", 
+            font=("맑은 고딕", 8), 
+            bg=self.colors['card'], 
+            fg=self.colors['muted']
+        ).pack(side='left', padx=(5, 0))
+        
+        # 모델 마스크 캐시 설정
+        cache_frame = tk.Frame(rembg_card, bg=self.colors['card'])
+        cache_frame.pack(fill='x', padx=15, pady=(0, 10))
+        
+        tk.Checkbutton(
+            cache_frame,
+            text="♻️ 마스크 캐시",
+            variable=self.enable_mask_cache,
+            font=("맑은 고딕", 9, "bold"),
+            bg=self.colors['card'],
+            fg=self.colors['primary']
+        ).pack(side='left')
+        
+        tk.Label(
+            cache_frame,
+            text="같은 이미지를 다시 처리하면 추론 없이 Alpha Matting/리사이즈만 다시 계산",
+            font=("맑은 고딕", 8),
+            bg=self.colors['card'],
+            fg=self.colors['muted']
+        ).pack(side='left', padx=(5, 0))
+        
         # Alpha Matting 설정
         alpha_frame = tk.Frame(rembg_card, bg=self.colors['card'])
         alpha_frame.pack(fill='x', padx=15, pady=(0, 15))
@@ -484,6 +662,9 @@ class BackgroundRemover:
                 fg=self.colors['muted']
             ).pack(side='left')
         
+        # 미리보기 카드
+        self.setup_preview_card(scrollable_frame)
+        
         # 로그 및 진행률 카드
         log_card = tk.Frame(scrollable_frame, bg=self.colors['card'], relief='flat', bd=0)
         log_card.pack(fill='both', expand=True, pady=(0, 10), padx=10)
@@ -516,6 +697,9 @@ class BackgroundRemover:
         self.log_text.pack(side='left', fill='both', expand=True)
         log_scrollbar.pack(side='right', fill='y')
         
+        # 메모리 예산/프로파일링
+        self.setup_run_options(log_card, padx=15)
+        
         # 버튼
         button_frame = tk.Frame(log_card, bg=self.colors['card'])
         button_frame.pack(pady=15)
@@ -532,10 +716,37 @@ class BackgroundRemover:
         )
         self.start_btn.pack(side='left', padx=10)
         
+        # 일시정지/중지 (이미지 사이마다 확인)
+        self.pause_btn = tk.Button(
+            button_frame,
+            text="⏸️ 일시정지",
+            command=self.toggle_pause_processing,
+            state='disabled',
+            bg=self.colors['warning'],
+            fg=self.colors['dark'],
+            font=("맑은 고딕", 10),
+            padx=15,
+            pady=10
+        )
+        self.pause_btn.pack(side='left', padx=5)
+        
+        self.stop_btn = tk.Button(
+            button_frame,
+            text="⏹️ 중지",
+            command=self.stop_processing,
+            state='disabled',
+            bg=self.colors['secondary'],
+            fg='white',
+            font=("맑은 고딕", 10),
+            padx=15,
+            pady=10
+        )
+        self.stop_btn.pack(side='left', padx=5)
+        
         tk.Button(
             button_frame,
             text="❌ 종료",
-            command=self.root.quit,
+            command=self.on_closing,
             bg=self.colors['danger'],
             fg='white',
             font=("맑은 고딕", 10),
@@ -543,6 +754,164 @@ class BackgroundRemover:
             pady=10
         ).pack(side='left', padx=10)
     
+    def setup_preview_card(self, parent):
+        """미리보기 카드 (이미지 한 장을 축소본으로 처리해 현재 설정의 결과 표시)"""
+        preview_card = tk.Frame(parent, bg=self.colors['card'], relief='flat', bd=0)
+        preview_card.pack(fill='x', pady=(0, 10), padx=10)
+        
+        preview_title_frame = tk.Frame(preview_card, bg=self.colors['card'])
+        preview_title_frame.pack(fill='x', padx=15, pady=(15, 8))
+        
+        tk.Label(
+            preview_title_frame,
+            text="🖼️ 미리보기",
+            font=("맑은 고딕", 11, "bold"),
+            bg=self.colors['card'],
+            fg=self.colors['dark']
+        ).pack(side='left')
+        
+        tk.Button(
+            preview_title_frame,
+            text="이미지 선택",
+            command=self.select_preview_image,
+            bg=self.colors['secondary'],
+            fg='white',
+            font=("맑은 고딕", 8, "bold"),
+            relief='flat',
+            bd=0,
+            padx=10,
+            pady=5
+        ).pack(side='right')
+        
+        tk.Label(
+            preview_card,
+            textvariable=self.preview_image_path,
+            font=("맑은 고딕", 8),
+            bg=self.colors['card'],
+            fg=self.colors['muted']
+        ).pack(anchor='w', padx=15)
+        
+        # 임계값 슬라이더 (위의 Alpha Matting 입력값과 같은 값을 바꿈)
+        slider_frame = tk.Frame(preview_card, bg=self.colors['card'])
+        slider_frame.pack(fill='x', padx=15, pady=(5, 0))
+        
+        self.preview_sliders = {}
+        sliders = [
+            ("전경", self.alpha_matting_foreground_threshold, 0, 300),
+            ("배경", self.alpha_matting_background_threshold, 0, 255),
+            ("침식", self.alpha_matting_erode_size, 0, 40)
+        ]
+        for label_text, var, low, high in sliders:
+            scale = tk.Scale(
+                slider_frame,
+                label=label_text,
+                from_=low,
+                to=high,
+                orient='horizontal',
+                length=180,
+                font=("맑은 고딕", 8),
+                bg=self.colors['card'],
+                highlightthickness=0,
+                command=lambda value, var=var: var.set(str(int(float(value))))
+            )
+            scale.pack(side='left', padx=(0, 10))
+            self.preview_sliders[str(var)] = (scale, var)
+            self.sync_preview_slider(var)
+        
+        self.preview_label = tk.Label(
+            preview_card,
+            text="이미지를 선택하면 현재 설정으로 처리한 축소본이 표시됩니다",
+            font=("맑은 고딕", 8),
+            bg=self.colors['light'],
+            fg=self.colors['muted'],
+            height=6
+        )
+        self.preview_label.pack(fill='x', padx=15, pady=(5, 5))
+        
+        self.preview_status = tk.Label(preview_card, text="", font=("맑은 고딕", 8),
+                                       bg=self.colors['card'], fg=self.colors['muted'])
+        self.preview_status.pack(anchor='w', padx=15, pady=(0, 15))
+        
+        # 미리보기에 영향을 주는 설정이 바뀌면 잠시 뒤 다시 렌더링 (슬라이더를 끄는 동안 매번 처리하지 않음)
+        for var in (self.alpha_matting_foreground_threshold, self.alpha_matting_background_threshold,
+                    self.alpha_matting_erode_size):
+            var.trace_add('write', lambda *args, var=var: (self.sync_preview_slider(var), self.schedule_preview()))
+        for var in (self.enable_alpha_matting, self.selected_model):
+            var.trace_add('write', lambda *args: self.schedule_preview())
+    
+    def sync_preview_slider(self, var):
+        """입력칸에서 바꾼 값을 슬라이더에 반영 (숫자가 아니면 그대로 둠)"""
+        scale, _var = self.preview_sliders[str(var)]
+        try:
+            value = int(var.get())
+        except ValueError:
+            return
+        if int(float(scale.get())) != value:
+            scale.set(value)
+    
+    def select_preview_image(self):
+        """미리보기 이미지 선택"""
+        extensions = " ".join(f"*{suffix}" for suffix in sorted(self.supported_formats))
+        path = filedialog.askopenfilename(
+            title="미리보기 이미지 선택",
+            filetypes=[("이미지", extensions), ("모든 파일", "*.*")]
+        )
+        if not path:
+            return
+        self.preview_image_path.set(path)
+        if self.preview_renderer is None:
+            self.preview_renderer = preview.PreviewRenderer(
+                on_result=lambda result: self.root.after(0, self.show_preview, result),
+                log=self.log_message
+            )
+        self.schedule_preview(delay=0)
+    
+    def schedule_preview(self, delay=preview.DEFAULT_DEBOUNCE_MS):
+        """미리보기 다시 렌더링 예약 (delay 안에 다시 호출되면 이전 예약 취소)"""
+        if self.preview_renderer is None or not self.preview_image_path.get():
+            return
+        if self.preview_after_id is not None:
+            self.root.after_cancel(self.preview_after_id)
+        self.preview_after_id = self.root.after(delay, self.request_preview)
+    
+    def request_preview(self):
+        """현재 설정으로 미리보기 요청 (처리는 미리보기 작업 스레드에서)"""
+        self.preview_after_id = None
+        settings = self.get_preview_settings()
+        self.preview_status.config(text="⏳ 미리보기 처리 중...")
+        self.preview_renderer.request(self.preview_image_path.get(), settings)
+    
+    def get_preview_settings(self):
+        """미리보기용 처리 설정 (입력 중인 잘못된 값은 로그 없이 기본값 사용)"""
+        settings = pipeline.RemovalSettings(
+            model=self.selected_model.get(),
+            alpha_matting=self.enable_alpha_matting.get() and self.alpha_matting_available
+        )
+        try:
+            settings.foreground_threshold = int(self.alpha_matting_foreground_threshold.get())
+            settings.background_threshold = int(self.alpha_matting_background_threshold.get())
+            settings.erode_size = int(self.alpha_matting_erode_size.get())
+        except ValueError:
+            pass
+        return settings
+    
+    def show_preview(self, result):
+        """미리보기 결과 표시 (GUI 스레드)"""
+        if not result.ok:
+            self.preview_status.config(text=f"❌ 미리보기 실패: {result.error}")
+            return
+        self.preview_photo = ImageTk.PhotoImage(preview.checkerboard(result.image))
+        self.preview_label.config(image=self.preview_photo, text="", height=0)
+        
+        width, height = result.original_size
+        if result.mask_cached:
+            timing = f"캐시된 마스크로 재계산 {result.render_s * 1000:.0f}ms"
+        else:
+            timing = f"추론 {result.infer_s * 1000:.0f}ms + 처리 {result.render_s * 1000:.0f}ms"
+        self.preview_status.config(
+            text=f"✅ {result.image.size[0]}x{result.image.size[1]} 축소본 (원본 {width}x{height}), {timing}"
+        )
+    
     def setup_animation_tab(self):
         """애니메이션 생성 탭 설정"""
         # 애니메이션 탭용 스크롤 프레임
@@ -770,6 +1139,33 @@ class BackgroundRemover:
                 bg=self.colors['card'], fg=self.colors['muted'], 
                 font=("맑은 고딕", 8)).pack(side='left', padx=(10, 0))
         
+        # 프레임 순서 설정
+        settings_row4 = tk.Frame(anim_settings_frame, bg=self.colors['card'])
+        settings_row4.pack(fill='x', pady=5)
+        
+        tk.Label(settings_row4, text="프레임 순서:", bg=self.colors['card']).pack(side='left')
+        frame_order_combo = ttk.Combobox(
+            settings_row4,
+            textvariable=self.animation_frame_order,
+            values=list(animation.FRAME_ORDER_OPTIONS.keys()),
+            state='readonly',
+            width=10
+        )
+        frame_order_combo.pack(side='left', padx=10)
+        frame_order_combo.bind('<<ComboboxSelected>>', self.on_frame_order_change)
+        
+        tk.Label(settings_row4, text="정규식:", bg=self.colors['card']).pack(side='left', padx=(10, 5))
+        tk.Entry(settings_row4, textvariable=self.animation_frame_pattern, width=16).pack(side='left', padx=5)
+        
+        self.frame_order_description = tk.Label(
+            anim_settings_frame,
+            text=animation.FRAME_ORDER_OPTIONS[self.animation_frame_order.get()],
+            bg=self.colors['card'], 
+            fg=self.colors['muted'], 
+            font=("맑은 고딕", 8)
+        )
+        self.frame_order_description.pack(anchor='w')
+        
         # 애니메이션 진행률 및 로그
         anim_log_card = tk.Frame(anim_scrollable_frame, bg=self.colors['card'], relief='flat', bd=0)
         anim_log_card.pack(fill='both', expand=True, pady=(0, 15), padx=10)
@@ -802,6 +1198,9 @@ class BackgroundRemover:
         self.anim_log_text.pack(side='left', fill='both', expand=True)
         anim_log_scrollbar.pack(side='right', fill='y')
         
+        # 메모리 예산/프로파일링
+        self.setup_run_options(anim_log_card, padx=20)
+        
         # 버튼
         anim_button_frame = tk.Frame(anim_log_card, bg=self.colors['card'])
         anim_button_frame.pack(pady=20)
@@ -817,6 +1216,88 @@ class BackgroundRemover:
             pady=10
         )
         self.create_animation_btn.pack(side='left', padx=10)
+        
+        # 일시정지/중지 (프레임 사이마다 확인)
+        self.anim_pause_btn = tk.Button(
+            anim_button_frame,
+            text="⏸️ 일시정지",
+            command=self.toggle_pause_animation,
+            state='disabled',
+            bg=self.colors['warning'],
+            fg=self.colors['dark'],
+            font=("맑은 고딕", 10),
+            padx=15,
+            pady=10
+        )
+        self.anim_pause_btn.pack(side='left', padx=5)
+        
+        self.anim_stop_btn = tk.Button(
+            anim_button_frame,
+            text="⏹️ 중지",
+            command=self.stop_animation,
+            state='disabled',
+            bg=self.colors['secondary'],
+            fg='white',
+            font=("맑은 고딕", 10),
+            padx=15,
+            pady=10
+        )
+        self.anim_stop_btn.pack(side='left', padx=5)
+    
+    def setup_run_options(self, parent, padx):
+        """메모리 예산과 프로파일링 설정 줄 (배경 제거/애니메이션 탭이 같은 설정 변수를 공유)"""
+        budget_frame = tk.Frame(parent, bg=self.colors['card'])
+        budget_frame.pack(fill='x', padx=padx, pady=(0, 5))
+        
+        tk.Label(budget_frame, text="💾 메모리 예산(MB):", bg=self.colors['card']).pack(side='left')
+        tk.Entry(budget_frame, textvariable=self.memory_budget_mb, width=8).pack(side='left', padx=5)
+        tk.Label(
+            budget_frame,
+            text="← 0: 제한 없음, 넘을 것 같으면 동시 처리 제한/축소 추론/원본 프레임 즉시 해제",
+            font=("맑은 고딕", 8),
+            bg=self.colors['card'],
+            fg=self.colors['muted']
+        ).pack(side='left')
+        
+        profiling_frame = tk.Frame(parent, bg=self.colors['card'])
+        profiling_frame.pack(fill='x', padx=padx)
+        
+        tk.Checkbutton(
+            profiling_frame,
+            text="🔬 이번 실행 프로파일링",
+            variable=self.enable_profiling,
+            bg=self.colors['card']
+        ).pack(side='left')
+        
+        ttk.Combobox(
+            profiling_frame,
+            textvariable=self.profile_mode,
+            values=list(profiling.PROFILE_MODES.keys()),
+            state='readonly',
+            width=8
+        ).pack(side='left', padx=10)
+        
+        tk.Label(
+            profiling_frame,
+            text="← cpu: .prof, memory: 할당 스냅샷 (결과 폴더에 저장, 상위 지점은 로그에 표시)",
+            font=("맑은 고딕", 8),
+            bg=self.colors['card'],
+            fg=self.colors['muted']
+        ).pack(side='left')
+    
+    def start_worker(self, target, name, output_dir, log):
+        """작업 스레드 시작 (프로파일링이 켜져 있으면 스레드 전체를 감싸서 측정)"""
+        profile_mode = self.profile_mode.get() if self.enable_profiling.get() else None
+        
+        def run():
+            with profiling.profile_run(profile_mode, output_dir, name, log=log):
+                target()
+        
+        # 스레드 이름은 py-spy dump 등 외부 도구에서 구분할 수 있도록 지정
+        worker = threading.Thread(target=run, name=f"{name}-worker")
+        worker.daemon = True
+        worker.start()
+        return worker
     
     def on_animation_drop(self, event):
         """애니메이션용 드래그 앤 드롭 이벤트 처리 (다중 폴더 지원)"""
@@ -960,6 +1441,12 @@ class BackgroundRemover:
         cancel_btn = tk.Button(button_frame, text="❌ 취소", command=folder_window.destroy)
         cancel_btn.pack(side=tk.LEFT, padx=5)
     
+    def on_frame_order_change(self, event=None):
+        """프레임 순서 방식 변경시 설명 업데이트"""
+        description = animation.FRAME_ORDER_OPTIONS.get(self.animation_frame_order.get(), "")
+        self.frame_order_description.config(text=description)
+        self.anim_log_message(f"프레임 순서 변경: {description}")
+    
     def anim_log_message(self, message):
         """애니메이션 로그 메시지 출력"""
         timestamp = time.strftime("%H:%M:%S")
@@ -977,13 +1464,24 @@ class BackgroundRemover:
         
         # UI 상태 변경
         self.create_animation_btn.config(state='disabled', text='⏳ 큐 생성 중...')
+        self.anim_pause_btn.config(state='normal', text='⏸️ 일시정지')
+        self.anim_stop_btn.config(state='normal')
         self.anim_progress['value'] = 0
         self.anim_progress_label.config(text="애니메이션 큐 생성 중...")
         
-        # 별도 스레드에서 처리 (UI 블로킹 방지)
-        thread = threading.Thread(target=self.process_animation_queue)
-        thread.daemon = True
-        thread.start()
+        # 별도 스레드에서 처리 (UI 블로킹 방지, 중지/일시정지는 control로 전달)
+        self.animation_control = pipeline.JobControl()
+        self.animation_thread = self.start_worker(
+            self.process_animation_queue, "animation", pipeline.ANIMATION_ROOT, self.anim_log_message
+        )
+    
+    def toggle_pause_animation(self):
+        """애니메이션 큐 일시정지/재개"""
+        self.toggle_pause(self.animation_control, self.anim_pause_btn, self.anim_progress_label, self.anim_log_message)
+    
+    def stop_animation(self):
+        """애니메이션 큐 중지 (현재 프레임 처리 후)"""
+        self.request_stop(self.animation_control, self.anim_stop_btn, self.anim_pause_btn, self.anim_log_message)
     
     def process_animation_queue(self):
         """애니메이션 폴더 대기열 처리"""
@@ -1001,6 +1499,7 @@ class BackgroundRemover:
                 self.root.update()
                 
                 # 개별 폴더 애니메이션 생성
+                self.animation_control.checkpoint()
                 self.create_single_animation(folder_path)
                 
                 self.anim_log_message(f"✅ [{folder_idx + 1}/{total_folders}] 완료: {os.path.basename(folder_path)}")
@@ -1018,6 +1517,10 @@ class BackgroundRemover:
                 f"📁 결과 저장 위치: animation/ 폴더"
             )
             
+        except pipeline.ProcessingCancelled:
+            self.anim_progress_label.config(text="중지됨")
+            self.anim_log_message("⏹️ 애니메이션 생성이 중지되었습니다. (저장 중이던 파일은 남지 않으며, 남은 폴더는 다음 실행 시 복원)")
+        
         except Exception as e:
             self.anim_log_message(f"❌ 애니메이션 큐 처리 오류: {str(e)}")
             messagebox.showerror("오류", f"애니메이션 큐 처리 중 오류가 발생했습니다:\n{str(e)}")
@@ -1030,8 +1533,14 @@ class BackgroundRemover:
         try:
             folder_path = Path(folder_path_str)
             
-            # 이미지 파일 목록
-            image_files = self.get_image_files(folder_path)
+            # 이미지 파일 목록 (선택한 방식으로 프레임 순서 결정, 매니페스트는 프레임별 지속시간 포함)
+            image_files, frame_durations = animation.order_frames(
+                folder_path,
+                self.get_image_files(folder_path),
+                order=self.animation_frame_order.get(),
+                pattern=self.animation_frame_pattern.get(),
+                log=self.anim_log_message
+            )
             
             if not image_files:
                 self.anim_log_message("❌ 처리할 이미지 파일이 없습니다.")
@@ -1045,6 +1554,7 @@ class BackgroundRemover:
             
             total_files = len(image_files)
             self.anim_log_message(f"🎬 총 {total_files}개 프레임으로 애니메이션 생성 시작")
+            timer = metrics.StageTimer()  # 단계별 시간 측정 (프레임 로딩/합성/인코딩/쓰기)
             
             # 설정값 가져오기
             format_type = self.animation_format.get()
@@ -1056,6 +1566,10 @@ class BackgroundRemover:
             self.anim_log_message(f"⚙️ 설정: {format_type.upper()}, {duration}ms/프레임, 무한반복: {'ON' if loop else 'OFF'}, 품질: {quality}")
             self.anim_log_message(f"🚫 잔상 방지: {'ON' if prevent_ghost else 'OFF'}")
             
+            # 메모리 예산: 헤더 크기로 프레임 메모리를 추정해 넘을 것 같으면 원본 즉시 해제 모드
+            # (프레임을 읽는 즉시 최종 캔버스로 옮기고 원본은 바로 해제, 캔버스는 인코딩이 끝날 때까지 유지)
+            release_sources, canvas_size = self.plan_animation_memory(image_files, prevent_ghost)
+            
             # 이미지 로드 및 전처리
             images = []
             max_width = 0
@@ -1063,18 +1577,31 @@ class BackgroundRemover:
             
             # 1단계: 모든 이미지 로드 및 최대 크기 찾기
             temp_images = []
+            durations = []  # 로드에 성공한 프레임별 지속시간
+            loaded_frames = {}  # 매니페스트에서 같은 프레임이 반복되면 다시 읽지 않음
             for i, image_path in enumerate(image_files):
+                self.animation_control.checkpoint()
                 try:
-                    self.anim_log_message(f"📷 프레임 로딩: {image_path.name}")
-                    
-                    # 이미지 열기
-                    img = Image.open(image_path)
-                    
-                    # RGBA로 변환 (투명도 지원)
-                    if img.mode != 'RGBA':
-                        img = img.convert('RGBA')
+                    img = loaded_frames.get(image_path)
+                    if img is None:
+                        self.anim_log_message(f"📷 프레임 로딩: {image_path.name}")
+                        
+                        with timer.stage("decode"):
+                            # 이미지 열기
+                            img = Image.open(image_path)
+                            
+                            # RGBA로 변환 (투명도 지원)
+                            if img.mode != 'RGBA':
+                                img = img.convert('RGBA')
+                            img.load()
+                        if release_sources:
+                            with timer.stage("compose"):
+                                img = animation.center_on_canvas(img, canvas_size)
+                        loaded_frames[image_path] = img
                     
                     temp_images.append(img)
+                    timer.count_item()
+                    durations.append(frame_durations[i] or duration)
                     max_width = max(max_width, img.width)
                     max_height = max(max_height, img.height)
                     
@@ -1094,19 +1621,19 @@ class BackgroundRemover:
             self.anim_log_message(f"📐 최대 크기: {max_width}x{max_height} (모든 프레임 통일)")
             
             # 2단계: 잔상 방지 설정에 따른 프레임 전처리
-            if prevent_ghost:
+            if release_sources:
+                # 원본 즉시 해제 모드: 로딩하면서 이미 같은 크기의 캔버스로 옮겨 둠
+                images = temp_images
+            elif prevent_ghost:
                 self.anim_log_message("🛠️ 잔상 방지 처리: 모든 프레임 크기 통일 중...")
                 # 배치 처리로 최적화 (UI 업데이트 빈도 감소)
                 batch_size = max(1, len(temp_images) // 10)  # 10회 정도만 업데이트
                 for i, img in enumerate(temp_images):
+                    self.animation_control.checkpoint()
                     try:
-                        # 투명한 배경에 중앙 정렬로 배치
-                        canvas = Image.new('RGBA', (max_width, max_height), (0, 0, 0, 0))
-                        
-                        # 이미지를 캔버스 중앙에 배치
-                        x_offset = (max_width - img.width) // 2
-                        y_offset = (max_height - img.height) // 2
-                        canvas.paste(img, (x_offset, y_offset), img)
+                        with timer.stage("compose"):
+                            # 투명한 배경의 중앙에 배치
+                            canvas = animation.center_on_canvas(img, (max_width, max_height))
                         
                         images.append(canvas)
                         
@@ -1133,12 +1660,16 @@ class BackgroundRemover:
                 self.anim_log_message("❌ 처리된 이미지가 없습니다.")
                 return
             
+            # 매니페스트로 프레임별 지속시간이 지정된 경우 목록으로 전달
+            if len(images) == len(durations) and len(set(durations)) > 1:
+                self.anim_log_message(f"⏱️ 프레임별 지속시간 적용: {min(durations)}~{max(durations)}ms")
+                duration = durations
+            
             # 애니메이션 파일명 및 저장 경로 생성
             folder_name = folder_path.name  # 선택한 폴더명 추출
             
             # 스크립트와 같은 위치에 animation 폴더 생성
-            script_dir = Path(__file__).parent
-            output_base_folder = script_dir / "animation"
+            output_base_folder = pipeline.ANIMATION_ROOT
             output_base_folder.mkdir(exist_ok=True)
             
             # 중복된 파일명이 있을 경우 고유한 파일 경로 생성
@@ -1151,45 +1682,19 @@ class BackgroundRemover:
                 self.anim_log_message(f"💾 애니메이션 저장 중: {output_filename}")
             
             # 애니메이션 생성 및 저장
-            if format_type == "webp":
-                webp_options = {
-                    'save_all': True,
-                    'append_images': images[1:],
-                    'duration': duration,
-                    'loop': 0 if loop else 1,
-                    'lossless': False,
-                    'quality': quality,
-                    'method': 4  # 균형잡힌 압축 (6에서 4로 변경 - 더 빠름)
-                }
-                
-                if prevent_ghost:
-                    webp_options['disposal'] = 2  # 이전 프레임을 배경색으로 대체
-                    self.anim_log_message("  🎯 WebP 설정: disposal=2 (잔상 방지)")
-                else:
-                    self.anim_log_message("  📐 WebP 설정: 기본 모드 (원본 크기 유지)")
-                
-                images[0].save(output_path, **webp_options)
-                
-            elif format_type == "gif":
-                gif_options = {
-                    'save_all': True,
-                    'append_images': images[1:],
-                    'duration': duration,
-                    'loop': 0 if loop else 1,
-                    'optimize': True
-                }
-                
-                if prevent_ghost:
-                    gif_options.update({
-                        'disposal': 2,  # 이전 프레임을 배경색으로 대체
-                        'transparency': 0,  # 투명도 활성화
-                        'background': 0  # 배경 투명
-                    })
+            format_label = "WebP" if format_type == "webp" else format_type.upper()
+            if prevent_ghost:
+                if format_type == "gif":
                     self.anim_log_message("  🎯 GIF 설정: disposal=2, transparency=0 (잔상 방지)")
                 else:
-                    self.anim_log_message("  📐 GIF 설정: 기본 모드 (원본 크기 유지)")
-                
-                images[0].save(output_path, **gif_options)
+                    self.anim_log_message(f"  🎯 {format_label} 설정: disposal=2 (잔상 방지)")
+            else:
+                self.anim_log_message(f"  📐 {format_label} 설정: 기본 모드 (원본 크기 유지)")
+            
+            # 임시 파일에 바로 인코딩한 뒤 이름 교체 (중간에 중단되어도 반쯤 쓰인 파일이 남지 않음)
+            with timer.stage("encode"):
+                with file_utils.atomic_output(output_path) as temp_path:
+                    animation.save_animation(images, temp_path, format_type, duration, loop, quality, prevent_ghost)
             
             # 진행률 완료
             self.anim_progress['value'] = 100
@@ -1198,6 +1703,29 @@ class BackgroundRemover:
             self.anim_log_message(f"🎉 애니메이션 생성 완료!")
             self.anim_log_message(f"📁 저장 위치: {output_path}")
             
+            # 실행 리포트 (애니메이션 파일 옆에 이름.report.json)
+            report = timer.report(
+                folder=str(folder_path),
+                output=str(output_path),
+                format=format_type,
+                frames=len(images),
+                size_bytes=output_path.stat().st_size
+            )
+            for line in metrics.format_summary(report, unit="프레임"):
+                self.anim_log_message(line)
+            try:
+                report_path = metrics.write_report(report, metrics.report_path_for(output_path))
+                self.anim_log_message(f"📄 실행 리포트: {report_path}")
+            except OSError as e:
+                self.anim_log_message(f"⚠️ 실행 리포트 저장 실패: {str(e)}")
+            
+            # 작업 완료 기록 (다음 실행 시 복원하지 않음)
+            job_id = self.animation_jobs.get(folder_path_str)
+            if self.job_store is not None and job_id is not None:
+                self.job_store.finish_job(job_id)
+            
+        except pipeline.ProcessingCancelled:
+            raise
         except ValueError as e:
             self.anim_log_message(f"❌ 설정값 오류: {str(e)}")
         except Exception as e:
@@ -1206,10 +1734,48 @@ class BackgroundRemover:
         
         # 이 메서드는 개별 폴더 처리이므로 finish_animation_processing 호출하지 않음
     
+    def plan_animation_memory(self, image_files, prevent_ghost):
+        """
+        프레임 헤더 크기로 메모리를 추정해 원본 즉시 해제 모드 사용 여부 결정 → (사용 여부, 캔버스 크기)
+        예산이 없거나 헤더를 읽을 수 없으면 기존 방식(전체 로딩 후 크기 통일)
+        """
+        budget = memory_budget.MemoryBudget(self.get_memory_budget_mb(self.anim_log_message))
+        if not budget.enabled:
+            return False, None
+        
+        sizes = {path: memory_budget.read_image_size(path) for path in set(image_files)}
+        if None in sizes.values():
+            return False, None
+        source_sizes = list(sizes.values())
+        canvas_size = (max(width for width, _ in source_sizes), max(height for _, height in source_sizes))
+        
+        estimate = memory_budget.estimate_animation_bytes(source_sizes, len(image_files), canvas_size, prevent_ghost)
+        if budget.fits(estimate):
+            return False, None
+        
+        limit = memory_budget.format_mb(budget.limit)
+        if not prevent_ghost:
+            self.anim_log_message(f"⚠️ 예상 메모리 {memory_budget.format_mb(estimate)}가 예산({limit})을 넘음 "
+                                  "(잔상 방지를 끄면 원본 프레임을 그대로 인코딩하므로 원본 즉시 해제 불가)")
+            return False, None
+        
+        release_estimate = memory_budget.estimate_animation_bytes(
+            source_sizes, len(image_files), canvas_size, True, release_sources=True
+        )
+        self.anim_log_message(f"💾 예상 메모리 {memory_budget.format_mb(estimate)}가 예산({limit})을 넘어 "
+                              f"원본 즉시 해제 모드로 전환 (캔버스와 인코더 메모리는 유지, "
+                              f"예상 {memory_budget.format_mb(release_estimate)})")
+        if not budget.fits(release_estimate):
+            self.anim_log_message("⚠️ 원본 즉시 해제 모드도 예산보다 큼: 프레임 수나 크기를 줄이는 것을 권장")
+        return True, canvas_size
+    
     def finish_animation_processing(self):
         """애니메이션 생성 완료 후 UI 상태 복원"""
         self.create_animation_btn.config(state='normal', text='🎬 애니메이션 생성')
-        self.anim_progress_label.config(text="대기 중...")
+        self.anim_pause_btn.config(state='disabled', text='⏸️ 일시정지')
+        self.anim_stop_btn.config(state='disabled')
+        if not self.animation_control.cancelled:
+            self.anim_progress_label.config(text="대기 중...")
     
     def on_drop(self, event):
         """드래그 앤 드롭 이벤트 처리 (다중 폴더 지원)"""
@@ -1225,8 +1791,7 @@ class BackgroundRemover:
             for item in files:
                 if os.path.isdir(item):
                     # 이미지 파일이 있는지 확인
-                    image_files = self.get_image_files(item)
-                    if image_files:
+                    if self.has_image_files(item, recursive=self.recursive_search.get()):
                         valid_folders.append(item)
                     else:
                         invalid_items.append(f"{os.path.basename(item)} (이미지 없음)")
@@ -1239,7 +1804,7 @@ class BackgroundRemover:
                 for folder_path in valid_folders:
                     self.add_folder_to_queue_internal(folder_path)
                     added_count += 1
-                    image_files = self.get_image_files(folder_path)
+                    image_files = self.get_image_files(folder_path, recursive=self.recursive_search.get())
                     self.log_message(f"드래그 앤 드롭으로 대기열에 추가: {folder_path} ({len(image_files)}개 이미지)")
                 
                 # 첫 번째 폴더를 현재 선택된 폴더로 설정
@@ -1277,6 +1842,7 @@ class BackgroundRemover:
         """대기열에 폴더 추가 (내부 호출)"""
         if folder_path not in self.folder_queue:
             self.folder_queue.append(folder_path)
+            self.folder_jobs[folder_path] = self.add_job("remove", folder_path)
             self.update_queue_display()
             self.log_message(f"📋 대기열에 추가: {os.path.basename(folder_path)}")
         else:
@@ -1288,6 +1854,7 @@ class BackgroundRemover:
         if selection:
             index = selection[0]
             removed_folder = self.folder_queue.pop(index)
+            self.remove_job(self.folder_jobs.pop(removed_folder, None))
             self.update_queue_display()
             self.log_message(f"📋 대기열에서 제거: {os.path.basename(removed_folder)}")
         else:
@@ -1298,6 +1865,8 @@ class BackgroundRemover:
         if self.folder_queue:
             result = messagebox.askyesno("확인", f"대기열의 모든 폴더({len(self.folder_queue)}개)를 삭제하시겠습니까?")
             if result:
+                for folder_path in self.folder_queue:
+                    self.remove_job(self.folder_jobs.pop(folder_path, None))
                 self.folder_queue.clear()
                 self.update_queue_display()
                 self.log_message("📋 대기열이 모두 삭제되었습니다.")
@@ -1308,7 +1877,8 @@ class BackgroundRemover:
         """대기열 표시 업데이트"""
         self.queue_listbox.delete(0, tk.END)
         for folder_path in self.folder_queue:
-            display_text = f"{os.path.basename(folder_path)} ({len(self.get_image_files(folder_path))}개 이미지)"
+            image_files = self.get_image_files(folder_path, recursive=self.recursive_search.get())
+            display_text = f"{os.path.basename(folder_path)} ({len(image_files)}개 이미지)"
             self.queue_listbox.insert(tk.END, display_text)
     
     def add_animation_folder_to_queue(self):
@@ -1321,6 +1891,7 @@ class BackgroundRemover:
         """애니메이션 대기열에 폴더 추가 (내부 호출)"""
         if folder_path not in self.animation_queue:
             self.animation_queue.append(folder_path)
+            self.animation_jobs[folder_path] = self.add_job("animate", folder_path)
             self.update_animation_queue_display()
             self.anim_log_message(f"📋 대기열에 추가: {os.path.basename(folder_path)}")
         else:
@@ -1332,6 +1903,7 @@ class BackgroundRemover:
         if selection:
             index = selection[0]
             removed_folder = self.animation_queue.pop(index)
+            self.remove_job(self.animation_jobs.pop(removed_folder, None))
             self.update_animation_queue_display()
             self.anim_log_message(f"📋 대기열에서 제거: {os.path.basename(removed_folder)}")
         else:
@@ -1342,12 +1914,50 @@ class BackgroundRemover:
         if self.animation_queue:
             result = messagebox.askyesno("확인", f"대기열의 모든 폴더({len(self.animation_queue)}개)를 삭제하시겠습니까?")
             if result:
+                for folder_path in self.animation_queue:
+                    self.remove_job(self.animation_jobs.pop(folder_path, None))
                 self.animation_queue.clear()
                 self.update_animation_queue_display()
                 self.anim_log_message("📋 대기열이 모두 삭제되었습니다.")
         else:
             messagebox.showinfo("알림", "대기열이 이미 비어있습니다.")
     
+    def add_job(self, kind, folder_path):
+        """작업 저장소에 대기열 항목 기록 → 작업 id (저장소가 없으면 None)"""
+        if self.job_store is None:
+            return None
+        return self.job_store.add_job(kind, folder_path)
+    
+    def remove_job(self, job_id):
+        """대기열에서 제거된 항목의 작업 기록 삭제"""
+        if self.job_store is not None and job_id is not None:
+            self.job_store.remove_job(job_id)
+    
+    def restore_pending_jobs(self):
+        """이전 실행에서 끝나지 않은 작업을 대기열에 복원 (배경 제거는 완료된 파일부터 이어서 처리)"""
+        if self.job_store is None:
+            return
+        
+        restored = 0
+        for kind, queue, jobs, log in (
+            ("remove", self.folder_queue, self.folder_jobs, self.log_message),
+            ("animate", self.animation_queue, self.animation_jobs, self.anim_log_message),
+        ):
+            for job in self.job_store.pending_jobs(kind):
+                folder_path = job['folder']
+                if not os.path.isdir(folder_path) or folder_path in queue:
+                    # 폴더가 사라졌거나 중복된 기록은 정리
+                    self.job_store.remove_job(job['id'])
+                    continue
+                queue.append(folder_path)
+                jobs[folder_path] = job['id']
+                restored += 1
+                log(f"♻️ 이전 대기열 복원: {os.path.basename(folder_path)}")
+        
+        if restored:
+            self.update_queue_display()
+            self.update_animation_queue_display()
+    
     def update_animation_queue_display(self):
         """애니메이션 대기열 표시 업데이트"""
         self.anim_queue_listbox.delete(0, tk.END)
@@ -1388,6 +1998,12 @@ class BackgroundRemover:
         self.model_description.config(text=description)
         self.log_message(f"AI 모델 변경: {description}")
     
+    def on_output_format_change(self, event=None):
+        """출력 형식 변경시 설명 업데이트"""
+        description = processing.OUTPUT_FORMATS.get(self.output_format.get(), "")
+        self.output_format_description.config(text=description)
+        self.log_message(f"출력 형식 변경: {description}")
+    
     def select_folder(self):
         """다중 폴더 선택 대화상자"""
         # 다중 폴더 선택을 위한 커스텀 대화상자 생성
@@ -1444,7 +2060,7 @@ class BackgroundRemover:
             for folder in selected_folders:
                 if os.path.isdir(folder):
                     # 이미지 파일 확인
-                    image_files = self.get_image_files(folder)
+                    image_files = self.get_image_files(folder, recursive=self.recursive_search.get())
                     if image_files:
                         self.add_folder_to_queue_internal(folder)
                         added_count += 1
@@ -1474,47 +2090,23 @@ class BackgroundRemover:
         cancel_btn = tk.Button(button_frame, text="❌ 취소", command=folder_window.destroy)
         cancel_btn.pack(side=tk.LEFT, padx=5)
     
-    def get_image_files(self, folder_path):
-        """폴더에서 지원되는 이미지 파일 목록 반환"""
-        image_files = []
-        folder = Path(folder_path)
-        
-        for file_path in folder.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in self.supported_formats:
-                image_files.append(file_path)
-        
-        return sorted(image_files)
+    def get_image_files(self, folder_path, recursive=False, natural=False):
+        """폴더에서 지원되는 이미지 파일 목록 반환 (recursive: 하위 폴더 포함, natural: 자연 정렬)"""
+        return file_utils.list_image_files(
+            folder_path, self.supported_formats, recursive=recursive, natural=natural
+        )
+    
+    def has_image_files(self, folder_path, recursive=False):
+        """폴더에 지원되는 이미지 파일이 있는지 확인 (전체 목록을 만들지 않음)"""
+        return file_utils.has_image_files(folder_path, self.supported_formats, recursive=recursive)
     
     def get_unique_folder_path(self, base_folder, folder_name):
         """중복된 폴더명이 있을 경우 고유한 폴더 경로 반환"""
-        unique_folder = base_folder / folder_name
-        if not unique_folder.exists():
-            return unique_folder
-        
-        counter = 2
-        while True:
-            unique_folder = base_folder / f"{folder_name}_{counter}"
-            if not unique_folder.exists():
-                return unique_folder
-            counter += 1
+        return PathAllocator(base_folder).allocate(folder_name)
     
     def get_unique_file_path(self, folder, filename):
         """중복된 파일명이 있을 경우 고유한 파일 경로 반환"""
-        file_path = Path(filename)
-        stem = file_path.stem
-        suffix = file_path.suffix
-        
-        unique_file = folder / filename
-        if not unique_file.exists():
-            return unique_file
-        
-        counter = 2
-        while True:
-            unique_filename = f"{stem}_{counter}{suffix}"
-            unique_file = folder / unique_filename
-            if not unique_file.exists():
-                return unique_file
-            counter += 1
+        return PathAllocator(folder).allocate(filename)
     
     def log_message(self, message):
         """로그 메시지 출력"""
@@ -1533,13 +2125,43 @@ class BackgroundRemover:
         
         # UI 상태 변경
         self.start_btn.config(state='disabled', text='⏳ 큐 처리 중...')
+        self.pause_btn.config(state='normal', text='⏸️ 일시정지')
+        self.stop_btn.config(state='normal')
         self.progress['value'] = 0
         self.progress_label.config(text="큐 처리 중...")
         
-        # 별도 스레드에서 처리 (UI 블로킹 방지)
-        thread = threading.Thread(target=self.process_queue)
-        thread.daemon = True
-        thread.start()
+        # 별도 스레드에서 처리 (UI 블로킹 방지, 중지/일시정지는 control로 전달)
+        self.processing_control = pipeline.JobControl()
+        self.processing_thread = self.start_worker(
+            self.process_queue, "remove", pipeline.OUTPUT_ROOT, self.log_message
+        )
+    
+    def toggle_pause_processing(self):
+        """배경 제거 큐 일시정지/재개"""
+        self.toggle_pause(self.processing_control, self.pause_btn, self.progress_label, self.log_message)
+    
+    def stop_processing(self):
+        """배경 제거 큐 중지 (현재 이미지 처리 후)"""
+        self.request_stop(self.processing_control, self.stop_btn, self.pause_btn, self.log_message)
+    
+    def toggle_pause(self, control, pause_btn, progress_label, log):
+        """일시정지/재개 전환 (작업 스레드는 다음 이미지/프레임 전에 대기)"""
+        if control.paused:
+            control.resume()
+            pause_btn.config(text='⏸️ 일시정지')
+            log("▶️ 처리를 재개합니다.")
+        else:
+            control.pause()
+            pause_btn.config(text='▶️ 계속')
+            progress_label.config(text="일시정지됨")
+            log("⏸️ 일시정지: 현재 항목을 마친 뒤 대기합니다.")
+    
+    def request_stop(self, control, stop_btn, pause_btn, log):
+        """중지 요청 (현재 항목을 마친 뒤 중지, 완료된 파일은 기록 유지)"""
+        control.cancel()
+        stop_btn.config(state='disabled')
+        pause_btn.config(state='disabled', text='⏸️ 일시정지')
+        log("⏹️ 중지 요청: 현재 항목을 마친 뒤 중지합니다.")
     
     def process_queue(self):
         """폴더 대기열 처리"""
@@ -1557,6 +2179,7 @@ class BackgroundRemover:
                 self.root.update()
                 
                 # 개별 폴더 처리
+                self.processing_control.checkpoint()
                 self.process_single_folder(folder_path)
                 
                 self.log_message(f"✅ [{folder_idx + 1}/{total_folders}] 완료: {os.path.basename(folder_path)}")
@@ -1574,6 +2197,10 @@ class BackgroundRemover:
                 f"📁 결과 저장 위치: transparent/ 폴더"
             )
             
+        except pipeline.ProcessingCancelled:
+            self.progress_label.config(text="중지됨")
+            self.log_message("⏹️ 처리가 중지되었습니다. 저장이 끝난 파일은 기록되어 다음 실행 시 이어서 처리됩니다.")
+        
         except Exception as e:
             self.log_message(f"❌ 큐 처리 오류: {str(e)}")
             messagebox.showerror("오류", f"큐 처리 중 오류가 발생했습니다:\n{str(e)}")
@@ -1581,25 +2208,11 @@ class BackgroundRemover:
         finally:
             self.finish_processing()
     
-    def create_rembg_session(self):
+    def create_rembg_session(self, model_name=None):
         """선택된 설정으로 rembg 세션 생성"""
-        try:
+        if model_name is None:
             model_name = self.selected_model.get()
-            self.log_message(f"🤖 AI 모델 로딩: {self.model_options[model_name]}")
-            
-            # 모델에 따른 세션 생성
-            if model_name in ["u2net", "u2netp", "u2net_human_seg", "silueta", "isnet-general-use"]:
-                session = new_session(model_name)
-            else:
-                # 기본값으로 fallback
-                self.log_message(f"⚠️ 모델 '{model_name}' 지원되지 않음. u2net으로 변경")
-                session = new_session("u2net")
-            
-            return session
-        except Exception as e:
-            self.log_message(f"❌ 모델 로딩 실패: {str(e)}")
-            # 기본 모델로 fallback
-            return new_session("u2net")
+        return pipeline.create_session(model_name, log=self.log_message)
     
     def install_alpha_matting_dependencies(self):
         """Alpha Matting 의존성 자동 설치"""
@@ -1727,322 +2340,266 @@ class BackgroundRemover:
                 f"오류: {str(e)}"
             )
 
-    def process_with_rembg(self, input_data, session):
-        """rembg를 사용하여 배경 제거 처리"""
+    def get_removal_settings(self):
+        """GUI 입력값으로 처리 설정 생성 (잘못된 값은 해당 기능을 끄거나 기본값 사용)"""
+        output_format, png_compress_level, encode_workers = self.get_output_settings()
+        settings = pipeline.RemovalSettings(
+            model=self.selected_model.get(),
+            alpha_matting=self.enable_alpha_matting.get(),
+            proxy_inference=self.enable_proxy_inference.get(),
+            resize=self.enable_resize.get(),
+            maintain_aspect=self.maintain_aspect.get(),
+            resize_before_inference=self.resize_before_inference.get(),
+            compare_resize_accuracy=self.compare_resize_accuracy.get(),
+            output_format=output_format,
+            png_compress_level=png_compress_level,
+            encode_workers=encode_workers,
+            recursive=self.recursive_search.get(),
+            memory_budget_mb=self.get_memory_budget_mb(self.log_message),
+            mask_cache=self.enable_mask_cache.get()
+        )
+        
+        if settings.alpha_matting:
+            try:
+                settings.foreground_threshold = int(self.alpha_matting_foreground_threshold.get())
+                settings.background_threshold = int(self.alpha_matting_background_threshold.get())
+                settings.erode_size = int(self.alpha_matting_erode_size.get())
+            except ValueError as e:
+                self.log_message(f"⚠️ Alpha Matting 설정 오류: {str(e)}. 기본 처리 사용")
+                settings.alpha_matting = False
+        
+        if settings.proxy_inference:
+            try:
+                settings.proxy_max_side = int(self.proxy_max_side.get())
+            except ValueError:
+                self.log_message("⚠️ 프록시 최대 변 길이가 올바르지 않음. 기본 처리 사용")
+                settings.proxy_inference = False
+        
+        if settings.resize:
+            try:
+                settings.resize_width = int(self.resize_width.get())
+                settings.resize_height = int(self.resize_height.get())
+            except ValueError:
+                self.log_message("오류: 올바른 크기 값을 입력해주세요")
+                settings.resize = False
+        
+        return settings
+
+    def process_with_rembg(self, input_source, session, settings, timer=None):
+        """
+        rembg를 사용하여 배경 제거 처리 (결과는 RGBA PIL Image, 인코딩은 호출 측에서)
+        input_source: 파일 경로, PIL Image 또는 인코딩된 버퍼 (경로는 PIL이 직접 지연 로딩)
+        timer: 단계별 시간 기록용 metrics.StageTimer (선택)
+        """
         try:
-            if self.enable_alpha_matting.get():
-                # Alpha Matting 사용
-                try:
-                    from rembg.bg import alpha_matting_cutout
-                    
-                    # 임계값들 가져오기
-                    fg_threshold = int(self.alpha_matting_foreground_threshold.get())
-                    bg_threshold = int(self.alpha_matting_background_threshold.get())
-                    erode_size = int(self.alpha_matting_erode_size.get())
-                    
-                    self.log_message(f"  🎯 Alpha Matting 적용 (FG:{fg_threshold}, BG:{bg_threshold}, Erode:{erode_size})")
-                    
-                    # 먼저 기본 rembg로 마스크 생성
-                    from PIL import Image
-                    import io
-                    
-                    # input_data를 PIL Image로 변환
-                    input_image = Image.open(io.BytesIO(input_data))
-                    
-                    # RGB 모드로 변환 (RGBA나 다른 모드일 경우 대비)
-                    if input_image.mode != 'RGB':
-                        input_image = input_image.convert('RGB')
-                    
-                    # 기본 rembg로 마스크 생성
-                    mask_data = remove(input_data, session=session)
-                    mask_image = Image.open(io.BytesIO(mask_data))
-                    
-                    # 마스크에서 알파 채널만 추출 (RGBA -> L 모드)
-                    if mask_image.mode == 'RGBA':
-                        mask_image = mask_image.split()[-1]  # 알파 채널만 추출
-                    elif mask_image.mode != 'L':
-                        mask_image = mask_image.convert('L')  # 그레이스케일로 변환
-                    
-                    # trimap 생성 (Alpha Matting용)
-                    import numpy as np
-                    mask_array = np.array(mask_image)
-                    
-                    # 마스크 통계 확인
-                    unique_values = np.unique(mask_array)
-                    self.log_message(f"  📊 마스크 값 분포: min={mask_array.min()}, max={mask_array.max()}, unique={len(unique_values)}")
-                    
-                    # trimap 생성: 0(배경), 128(불확실), 255(전경)
-                    trimap = np.zeros_like(mask_array, dtype=np.uint8)
-                    
-                    # 마스크 값을 0-1 범위로 정규화
-                    mask_normalized = mask_array.astype(np.float32) / 255.0
-                    fg_norm = fg_threshold / 255.0
-                    bg_norm = bg_threshold / 255.0
-                    
-                    # 높은 값(전경) 영역을 255로 설정
-                    trimap[mask_normalized > fg_norm] = 255  # 확실한 전경
-                    
-                    # 낮은 값(배경) 영역을 0으로 설정  
-                    trimap[mask_normalized < bg_norm] = 0    # 확실한 배경
-                    
-                    # 중간 값은 128로 설정 (불확실한 영역)
-                    trimap[(mask_normalized >= bg_norm) & (mask_normalized <= fg_norm)] = 128
-                    
-                    # trimap 통계 확인
-                    fg_count = np.sum(trimap == 255)
-                    bg_count = np.sum(trimap == 0)
-                    uncertain_count = np.sum(trimap == 128)
-                    
-                    self.log_message(f"  🎯 Trimap - 전경: {fg_count}, 배경: {bg_count}, 불확실: {uncertain_count}")
-                    
-                    # 전경이 없으면 임계값 조정
-                    if fg_count == 0:
-                        self.log_message(f"  ⚠️ 전경 영역이 없음. 임계값을 자동 조정합니다.")
-                        # 마스크의 상위 20% 값을 전경으로 설정
-                        fg_auto_threshold = np.percentile(mask_array[mask_array > 0], 80)
-                        fg_auto_norm = fg_auto_threshold / 255.0
-                        trimap[mask_normalized > fg_auto_norm] = 255
-                        fg_count = np.sum(trimap == 255)
-                        self.log_message(f"  🔧 자동 조정된 전경 임계값: {fg_auto_threshold:.1f} (정규화: {fg_auto_norm:.3f}), 전경 픽셀: {fg_count}")
-                    
-                    # PIL Image로 변환
-                    trimap_image = Image.fromarray(trimap, mode='L')
-                    
-                    self.log_message(f"  🔍 원본: {input_image.mode} {input_image.size}, Trimap: {trimap_image.mode} {trimap_image.size}")
-                    
-                    # Alpha Matting으로 경계 개선 (정규화된 임계값 사용)
-                    result_image = alpha_matting_cutout(
-                        input_image,
-                        trimap_image,
-                        fg_norm,  # 0-1 범위 정규화된 값 사용
-                        bg_norm,  # 0-1 범위 정규화된 값 사용
-                        erode_size
+            try:
+                return pipeline.remove_image(input_source, session, settings, log=self.log_message, timer=timer)
+            except ImportError as e:
+                self.log_message(f"  ⚠️ Alpha Matting 라이브러리 없음: {str(e)}")
+                
+                # 이미 사용자가 설치를 거부했다면 묻지 않음
+                if not self.alpha_matting_install_declined:
+                    # 사용자에게 설치 여부 확인
+                    install_choice = messagebox.askyesno(
+                        "Alpha Matting 라이브러리 필요",
+                        "Alpha Matting을 사용하려면 추가 라이브러리가 필요합니다.\n\n"
+                        "필요한 패키지:\n"
+                        "- pymatting (Alpha Matting 핵심)\n"
+                        "- opencv-python (이미지 처리)\n" 
+                        "- scipy (수치 계산)\n\n"
+                        "지금 자동으로 설치하시겠습니까?\n"
+                        "(인터넷 연결이 필요하며, 시간이 걸릴 수 있습니다)"
                     )
                     
-                    # 결과를 bytes로 변환
-                    output_buffer = io.BytesIO()
-                    result_image.save(output_buffer, format='PNG')
-                    output_data = output_buffer.getvalue()
-                    
-                except ImportError as e:
-                    self.log_message(f"  ⚠️ Alpha Matting 라이브러리 없음: {str(e)}")
-                    
-                    # 이미 사용자가 설치를 거부했다면 묻지 않음
-                    if not self.alpha_matting_install_declined:
-                        # 사용자에게 설치 여부 확인
-                        from tkinter import messagebox
-                        install_choice = messagebox.askyesno(
-                            "Alpha Matting 라이브러리 필요",
-                            "Alpha Matting을 사용하려면 추가 라이브러리가 필요합니다.\n\n"
-                            "필요한 패키지:\n"
-                            "- pymatting (Alpha Matting 핵심)\n"
-                            "- opencv-python (이미지 처리)\n" 
-                            "- scipy (수치 계산)\n\n"
-                            "지금 자동으로 설치하시겠습니까?\n"
-                            "(인터넷 연결이 필요하며, 시간이 걸릴 수 있습니다)"
-                        )
-                        
-                        if not install_choice:
-                            # 사용자가 설치를 거부했음을 기억
-                            self.alpha_matting_install_declined = True
-                            self.log_message("  📋 Alpha Matting 설치가 취소되었습니다. 기본 배경 제거를 사용합니다.")
-                            
-                    if not self.alpha_matting_install_declined and 'install_choice' in locals() and install_choice:
-                        # 설치 시도
-                        install_success = self.install_alpha_matting_dependencies()
-                        if install_success:
-                            # 설치 성공 시 현재 처리는 기본 모드로 하고 재시작 예정
-                            self.log_message("  📋 현재 처리는 기본 모드를 사용합니다.")
-                            self.log_message("  🚀 재시작 후 Alpha Matting이 활성화됩니다!")
-                            
-                            # 현재 처리 중단 방지를 위해 기본 처리로 진행
-                            output_data = remove(input_data, session=session)
-                            return output_data  # 재시작 전에 현재 작업 완료
-                        else:
-                            self.log_message("  ❌ 설치 실패. 기본 처리를 사용합니다.")
-                    
-                    # 설치가 취소되었거나 이미 거부된 경우 기본 처리
-                    output_data = remove(input_data, session=session)
-                    
-                except ValueError as e:
-                    self.log_message(f"  ⚠️ Alpha Matting 설정 오류: {str(e)}. 기본 처리 사용")
-                    output_data = remove(input_data, session=session)
-                except Exception as e:
-                    self.log_message(f"  ❌ Alpha Matting 처리 오류: {str(e)}. 기본 처리 사용")
-                    output_data = remove(input_data, session=session)
-            else:
-                # 기본 rembg 처리
-                output_data = remove(input_data, session=session)
-            
-            return output_data
+                    if not install_choice:
+                        # 사용자가 설치를 거부했음을 기억
+                        self.alpha_matting_install_declined = True
+                        self.log_message("  📋 Alpha Matting 설치가 취소되었습니다. 기본 배경 제거를 사용합니다.")
+                    elif self.install_alpha_matting_dependencies():
+                        # 설치 성공 시 현재 처리는 기본 모드로 하고 재시작 예정
+                        self.log_message("  📋 현재 처리는 기본 모드를 사용합니다.")
+                        self.log_message("  🚀 재시작 후 Alpha Matting이 활성화됩니다!")
+                    else:
+                        self.log_message("  ❌ 설치 실패. 기본 처리를 사용합니다.")
+                
+                # 설치가 취소되었거나 재시작 전인 경우 기본 처리 (프록시 추론은 마스크만 사용)
+                fallback_settings = dataclasses.replace(settings, alpha_matting=False)
+                return pipeline.remove_image(input_source, session, fallback_settings, log=self.log_message, timer=timer)
         except Exception as e:
             self.log_message(f"  ❌ 배경 제거 실패: {str(e)}")
             raise
 
-    def resize_image(self, image):
-        """이미지 리사이즈 처리"""
-        if not self.enable_resize.get():
-            return image
+    def get_memory_budget_mb(self, log):
+        """메모리 예산(MB) 입력값 (잘못된 값은 제한 없음)"""
+        try:
+            return max(0, int(self.memory_budget_mb.get() or 0))
+        except ValueError:
+            log("⚠️ 메모리 예산이 올바르지 않음. 제한 없이 처리")
+            return 0
+    
+    def get_output_settings(self):
+        """출력 형식, PNG 압축 레벨, 인코딩 작업자 수 반환 (잘못된 값은 기본값 사용)"""
+        output_format = self.output_format.get()
+        if output_format not in processing.OUTPUT_FORMATS:
+            output_format = "png"
         
         try:
-            target_width = int(self.resize_width.get())
-            target_height = int(self.resize_height.get())
-            
-            if self.maintain_aspect.get():
-                # 비율 유지하며 리사이즈
-                image.thumbnail((target_width, target_height), Image.Resampling.LANCZOS)
-            else:
-                # 강제 리사이즈
-                image = image.resize((target_width, target_height), Image.Resampling.LANCZOS)
-                
-            return image
+            png_compress_level = min(9, max(0, int(self.png_compress_level.get())))
         except ValueError:
-            self.log_message("오류: 올바른 크기 값을 입력해주세요")
-            return image
-        except Exception as e:
-            self.log_message(f"리사이즈 오류: {str(e)}")
-            return image
+            self.log_message("⚠️ PNG 압축 레벨이 올바르지 않음. 기본값 사용")
+            png_compress_level = processing.DEFAULT_PNG_COMPRESS_LEVEL
+        
+        try:
+            encode_workers = max(1, int(self.encode_workers.get()))
+        except ValueError:
+            self.log_message("⚠️ 인코딩 작업자 수가 올바르지 않음. 기본값 사용")
+            encode_workers = pipeline.DEFAULT_ENCODE_WORKERS
+        
+        return output_format, png_compress_level, encode_workers
+
+    def start_folder_job(self, folder_path_str):
+        """
+        폴더 작업 시작 → (작업 id, 설정, 출력 폴더, 완료 파일 dict)
+        이전에 시작했던 작업이면 저장된 설정과 출력 폴더로 이어서 처리
+        """
+        job_id = self.folder_jobs.get(folder_path_str)
+        job = self.job_store.get_job(job_id) if self.job_store is not None and job_id is not None else None
+        if job is not None and job['status'] == STATUS_DONE:
+            # 이미 끝난 작업을 다시 실행하면 새 작업으로 기록
+            job = None
+        
+        if job is not None and job['output_folder'] and Path(job['output_folder']).is_dir():
+            settings = pipeline.RemovalSettings.from_dict(job['settings'])
+            output_folder = Path(job['output_folder'])
+            completed = self.job_store.completed_files(job_id)
+            self.log_message(f"♻️ 이전 작업 이어서 처리 (완료 {len(completed)}개, 이전 설정 사용): {output_folder}")
+            self.job_store.start_job(job_id)
+            return job_id, settings, output_folder, completed
+        
+        settings = self.get_removal_settings()
+        output_folder = pipeline.create_output_folder(folder_path_str, log=self.log_message)
+        if self.job_store is not None:
+            if job is None:
+                job_id = self.job_store.add_job("remove", folder_path_str)
+                self.folder_jobs[folder_path_str] = job_id
+            self.job_store.start_job(job_id, output_folder=output_folder, settings=settings.to_dict())
+        return job_id, settings, output_folder, {}
 
     def process_single_folder(self, folder_path_str):
-        """단일 폴더 이미지 처리"""
+        """단일 폴더 이미지 처리 (파일별 완료 기록, 중단 시 다음 실행에서 이어서 처리)"""
+        folder_name = Path(folder_path_str).name
         try:
-            folder_path = Path(folder_path_str)
-            folder_name = folder_path.name  # 선택한 폴더명 추출
-            
-            # 스크립트와 같은 위치에 transparent 폴더 생성
-            script_dir = Path(__file__).parent
-            output_base_folder = script_dir / "transparent"
-            output_base_folder.mkdir(exist_ok=True)
-            
-            # 중복된 폴더명이 있을 경우 고유한 폴더 경로 생성
-            output_folder = self.get_unique_folder_path(output_base_folder, folder_name)
-            output_folder.mkdir(parents=True, exist_ok=True)
-            
-            if output_folder.name != folder_name:
-                self.log_message(f"📁 출력 폴더 생성 (중복으로 인한 이름 변경): {output_folder}")
-            else:
-                self.log_message(f"📁 출력 폴더 생성: {output_folder}")
-            
-            # 이미지 파일 목록
-            image_files = self.get_image_files(folder_path)
-            
-            if not image_files:
+            if not self.has_image_files(folder_path_str, recursive=self.recursive_search.get()):
                 self.log_message("❌ 처리할 이미지 파일이 없습니다.")
-                self.finish_processing()
                 return
             
-            # rembg 세션 생성 (한 번만 생성하여 성능 향상)
-            session = self.create_rembg_session()
+            job_id, settings, output_folder, completed = self.start_folder_job(folder_path_str)
             
-            total_files = len(image_files)
-            processed = 0
-            success_count = 0
-            
-            # 처리 설정 정보 로그
-            self.log_message(f"🚀 총 {total_files}개 파일 처리 시작")
-            self.log_message(f"🤖 사용 모델: {self.model_options[self.selected_model.get()]}")
-            if self.enable_alpha_matting.get():
-                self.log_message(f"🎯 Alpha Matting: 활성화")
-            if self.enable_resize.get():
-                self.log_message(f"📏 리사이즈: {self.resize_width.get()}x{self.resize_height.get()}" + 
-                               (" (비율유지)" if self.maintain_aspect.get() else " (강제변경)"))
-            
-            for image_path in image_files:
-                try:
-                    self.log_message(f"🖼️ 처리 중: {image_path.name}")
-                    
-                    # 원본 이미지 읽기
-                    with open(image_path, 'rb') as input_file:
-                        input_data = input_file.read()
-                    
-                    # 선택된 설정으로 배경 제거
-                    output_data = self.process_with_rembg(input_data, session)
-                    
-                    # 리사이즈가 활성화된 경우 처리
-                    if self.enable_resize.get():
-                        # PIL Image로 변환
-                        from io import BytesIO
-                        image = Image.open(BytesIO(output_data))
-                        
-                        # 원본 크기 로그
-                        original_size = image.size
-                        self.log_message(f"  원본 크기: {original_size[0]}x{original_size[1]}")
-                        
-                        # 리사이즈 적용
-                        resized_image = self.resize_image(image)
-                        new_size = resized_image.size
-                        self.log_message(f"  리사이즈 후: {new_size[0]}x{new_size[1]}")
-                        
-                        # 다시 바이트로 변환
-                        output_io = BytesIO()
-                        resized_image.save(output_io, format='PNG', optimize=True)
-                        output_data = output_io.getvalue()
-                    
-                    # 결과 저장 (PNG 형식으로 저장하여 투명도 유지)
-                    output_filename = image_path.stem + '.png'
-                    output_path = self.get_unique_file_path(output_folder, output_filename)
-                    
-                    with open(output_path, 'wb') as output_file:
-                        output_file.write(output_data)
-                    
-                    if output_path.name != output_filename:
-                        self.log_message(f"✅ 저장 완료 (중복으로 인한 이름 변경): {output_path.name}")
-                    else:
-                        self.log_message(f"✅ 저장 완료: {output_filename}")
-                    
-                    success_count += 1
-                    
-                except Exception as e:
-                    self.log_message(f"❌ 오류 ({image_path.name}): {str(e)}")
-                
-                processed += 1
-                
-                # 진행률 업데이트
-                progress_percent = (processed / total_files) * 100
-                self.progress['value'] = progress_percent
-                self.progress_label.config(text=f"{processed}/{total_files} 완료")
+            # rembg 세션 생성 (한 번만 생성하여 성능 향상)
+            session = self.create_rembg_session(settings.model)
+            
+            def on_file_done(relative_path, output_path):
+                if self.job_store is not None:
+                    self.job_store.mark_file_done(job_id, relative_path, output_path)
+            
+            # 처리는 탐색과 동시에 바로 시작하므로 전체 개수는 별도 스레드에서 세고,
+            # 세는 동안에는 진행 막대를 왕복 표시(indeterminate)로 움직임
+            file_count = {}
+            
+            def count_files():
+                file_count['total'] = sum(1 for _ in file_utils.iter_image_files(
+                    folder_path_str, pipeline.SUPPORTED_FORMATS, recursive=settings.recursive
+                ))
+            
+            threading.Thread(target=count_files, name="count-files", daemon=True).start()
+            self.progress.config(mode='indeterminate')
+            self.progress['value'] = 0
+            
+            def on_progress(processed):
+                total = file_count.get('total')
+                if total is None:
+                    self.progress.step(10)
+                    self.progress_label.config(text=f"{processed}개 완료 (전체 개수 확인 중)")
+                else:
+                    # 이어서 처리하면 이전에 완료한 파일은 건너뛰므로 남은 파일 수 기준
+                    remaining = max(processed, total - len(completed))
+                    self.progress.config(mode='determinate')
+                    self.progress['value'] = processed / remaining * 100 if remaining else 100
+                    self.progress_label.config(text=f"{processed}/{remaining} 완료")
                 self.root.update()
             
+            try:
+                stats = pipeline.process_folder(
+                    folder_path_str,
+                    output_folder,
+                    settings,
+                    remove_fn=lambda source, timer, image_settings: self.process_with_rembg(
+                        source, session, image_settings, timer
+                    ),
+                    log=self.log_message,
+                    progress=on_progress,
+                    completed=completed,
+                    on_file_done=on_file_done,
+                    control=self.processing_control
+                )
+            finally:
+                self.progress.config(mode='determinate')
+            
+            if self.job_store is not None:
+                self.job_store.finish_job(job_id)
+            
+            model_name = self.model_options.get(settings.model, settings.model)
             self.log_message(f"\n🎉 처리 완료!")
-            self.log_message(f"✅ 성공: {success_count}개, ❌ 실패: {total_files - success_count}개")
-            self.log_message(f"🤖 사용 모델: {self.model_options[self.selected_model.get()]}")
-            if self.enable_alpha_matting.get():
+            self.log_message(f"✅ 성공: {stats['success']}개, ❌ 실패: {stats['failed']}개" +
+                           (f", ⏭️ 이전 완료: {stats['skipped']}개" if stats['skipped'] else ""))
+            self.log_message(f"🤖 사용 모델: {model_name}")
+            if settings.alpha_matting:
                 self.log_message(f"🎯 Alpha Matting: 사용됨")
-            if self.enable_resize.get():
-                self.log_message(f"📏 리사이즈: {self.resize_width.get()}x{self.resize_height.get()}" + 
-                               (" (비율유지)" if self.maintain_aspect.get() else " (강제변경)"))
+            if settings.resize:
+                self.log_message(f"📏 리사이즈: {settings.describe_resize()}")
+            if stats['comparisons']:
+                summary = pipeline.summarize_comparisons(stats['comparisons'])
+                self.log_message(f"🔬 정확도 비교 ({summary['count']}개): 평균 IoU={summary['mean_iou']:.4f}, 최저 IoU={summary['worst_iou']:.4f}, 평균 알파오차={summary['mean_mad']:.2f}")
+            report = stats.get('report')
+            if report is not None:
+                for line in metrics.format_summary(report):
+                    self.log_message(line)
+                if stats.get('report_path'):
+                    self.log_message(f"📄 실행 리포트: {stats['report_path']}")
             self.log_message(f"📁 결과 저장 위치: {output_folder}")
             
             # 완료 메시지
-            model_info = f"\n🤖 모델: {self.model_options[self.selected_model.get()]}"
-            alpha_info = f"\n🎯 Alpha Matting: {'사용' if self.enable_alpha_matting.get() else '미사용'}"
-            resize_info = ""
-            if self.enable_resize.get():
-                resize_info = f"\n📏 리사이즈: {self.resize_width.get()}x{self.resize_height.get()}" + \
-                             (" (비율유지)" if self.maintain_aspect.get() else " (강제변경)")
+            model_info = f"\n🤖 모델: {model_name}"
+            alpha_info = f"\n🎯 Alpha Matting: {'사용' if settings.alpha_matting else '미사용'}"
+            resize_info = f"\n📏 리사이즈: {settings.describe_resize()}" if settings.resize else ""
+            speed_info = ""
+            if report is not None and report['items_per_sec'] is not None:
+                speed_info = f"\n🚀 처리 속도: {report['items_per_sec']:.2f}장/초"
             
             messagebox.showinfo(
                 "🎉 처리 완료", 
                 f"이미지 처리가 완료되었습니다!\n"
-                f"✅ 성공: {success_count}개\n"
-                f"❌ 실패: {total_files - success_count}개"
-                f"{model_info}{alpha_info}{resize_info}\n\n"
+                f"✅ 성공: {stats['success']}개\n"
+                f"❌ 실패: {stats['failed']}개"
+                f"{model_info}{alpha_info}{resize_info}{speed_info}\n\n"
                 f"📁 저장 위치:\n{output_folder}"
             )
             
-        except Exception as e:
-            self.log_message(f"전체 처리 오류: {str(e)}")
-            messagebox.showerror("오류", f"처리 중 오류가 발생했습니다:\n{str(e)}")
-        
+        except pipeline.ProcessingCancelled:
+            raise
         except Exception as e:
             self.log_message(f"❌ 폴더 처리 오류 ({folder_name}): {str(e)}")
+            messagebox.showerror("오류", f"처리 중 오류가 발생했습니다:\n{str(e)}")
         
         # 이 메서드는 개별 폴더 처리이므로 finish_processing 호출하지 않음
     
     def finish_processing(self):
         """처리 완료 후 UI 상태 복원"""
         self.start_btn.config(state='normal', text='🚀 배경 제거 시작')
-        self.progress_label.config(text="완료")
+        self.pause_btn.config(state='disabled', text='⏸️ 일시정지')
+        self.stop_btn.config(state='disabled')
+        if not self.processing_control.cancelled:
+            self.progress_label.config(text="완료")
     
     def on_closing(self):
         """GUI 창 닫힘 처리"""
@@ -2055,15 +2612,20 @@ class BackgroundRemover:
                 # 작업 진행 중일 때 확인 대화상자
                 from tkinter import messagebox
                 if messagebox.askokcancel("종료 확인", 
-                    "작업이 진행 중입니다. 정말 종료하시겠습니까?\n진행 중인 작업이 중단될 수 있습니다."):
-                    self.log_message("사용자에 의한 프로그램 종료")
-                    self.root.quit()  # 이벤트 루프 종료
-                    self.root.destroy()  # 창 닫기
+                    "작업이 진행 중입니다. 정말 종료하시겠습니까?\n"
+                    "현재 항목을 마친 뒤 종료하며, 완료된 파일은 기록되어 다음 실행 시 이어서 처리됩니다."):
+                    self.log_message("사용자에 의한 프로그램 종료: 현재 항목을 마무리하는 중...")
+                    # 작업 스레드에 중지 신호를 보내고 끝날 때까지 기다린 뒤 종료 (쓰는 중인 파일 보호)
+                    self.processing_control.cancel()
+                    self.animation_control.cancel()
+                    self.close_when_idle()
                 else:
                     return  # 취소 시 종료하지 않음
             else:
                 # 일반적인 종료
                 self.log_message("프로그램 정상 종료")
+                self.close_preview()
+                self.close_job_store()
                 self.root.quit()  # 이벤트 루프 종료
                 self.root.destroy()  # 창 닫기
         except Exception as e:
@@ -2072,6 +2634,30 @@ class BackgroundRemover:
             self.root.quit()
             self.root.destroy()
     
+    def close_when_idle(self):
+        """작업 스레드가 모두 끝나면 창 닫기 (메인 루프를 막지 않도록 주기적으로 확인)"""
+        workers = (self.processing_thread, self.animation_thread)
+        if any(worker is not None and worker.is_alive() for worker in workers):
+            self.root.after(100, self.close_when_idle)
+            return
+        
+        self.close_preview()
+        self.close_job_store()
+        self.root.quit()  # 이벤트 루프 종료
+        self.root.destroy()  # 창 닫기
+    
+    def close_preview(self):
+        """미리보기 작업 스레드 종료"""
+        if self.preview_renderer is not None:
+            self.preview_renderer.close()
+            self.preview_renderer = None
+    
+    def close_job_store(self):
+        """작업 저장소 연결 닫기"""
+        if self.job_store is not None:
+            self.job_store.close()
+            self.job_store = None
+    
     def run(self):
         """애플리케이션 실행"""
         self.root.mainloop()
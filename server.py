@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+로컬 HTTP 배경 제거 서버 (표준 라이브러리 http.server만 사용, 외부 서비스 없음)
+모델 세션을 메모리에 유지하므로 요청마다 모델을 다시 불러오지 않음 (요청 지연 ≈ 추론 시간)
+
+엔드포인트:
+    GET  /health      상태 (로드된 모델, 처리/대기 중인 요청 수)
+    POST /remove      이미지 1장(본문 그대로) → 결과 이미지
+                      multipart/form-data 여러 장 → multipart/mixed로 처리되는 대로 한 장씩 스트리밍
+    POST /animate     multipart/form-data 프레임(보낸 순서대로) → 애니메이션 파일
+
+사용 예:
+    python server.py --port 8765 --workers 1 --queue-size 8 --preload u2netp
+    curl --data-binary @in.png "http://127.0.0.1:8765/remove?format=webp" -o out.webp
+    curl -F a=@1.png -F b=@2.png "http://127.0.0.1:8765/remove?model=isnet-general-use"
+    curl -F f1=@1.png -F f2=@2.png "http://127.0.0.1:8765/animate?format=gif&duration=80" -o anim.gif
+"""
+
+import argparse
+import io
+import json
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+from email import policy
+from email.parser import BytesParser
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image
+
+import animation
+import file_utils
+import pipeline
+import processing
+
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BODY_MB = 256
+
+# 결과 형식별 Content-Type
+OUTPUT_CONTENT_TYPES = {
+    "png": "image/png",
+    "webp": "image/webp",
+    "qoi": "image/qoi",
+    "npy": "application/octet-stream",
+}
+ANIMATION_CONTENT_TYPES = {
+    "webp": "image/webp",
+    "gif": "image/gif",
+}
+
+
+def log(message):
+    """로그 메시지 출력"""
+    print(message, flush=True)
+
+
+class BadRequest(ValueError):
+    """요청 값이 올바르지 않음 (400으로 응답)"""
+
+
+class SessionCache:
+    """
+    모델별 rembg 세션을 한 번만 만들어 서버가 종료될 때까지 유지 (추론은 여러 스레드에서 공유)
+    로딩은 잠금 밖에서 하고 같은 모델을 기다리는 요청만 Future로 대기 (다른 모델 요청과 /health는 막지 않음)
+    """
+
+    def __init__(self):
+        self._sessions = {}  # 모델 → 세션 Future
+        self._lock = threading.Lock()
+
+    def get(self, model_name):
+        # 무거운 모델은 pipeline이 프로세스에 하나만 유지 (로딩 중복도 pipeline에서 막음)
+        if pipeline.model_profile(model_name) is not None:
+            return pipeline.create_session(model_name, log=log)
+
+        with self._lock:
+            future = self._sessions.get(model_name)
+            loading = future is None
+            if loading:
+                future = self._sessions[model_name] = Future()
+        if not loading:
+            return future.result()
+
+        try:
+            session = pipeline.create_session(model_name, log=log)
+        except BaseException as e:
+            # 실패한 로딩은 남겨 두지 않음 (다음 요청이 다시 시도)
+            with self._lock:
+                self._sessions.pop(model_name, None)
+            future.set_exception(e)
+            raise
+        future.set_result(session)
+        return session
+
+    def loaded(self):
+        with self._lock:
+            futures = list(self._sessions.items())
+        loaded = [name for name, future in futures if future.done() and future.exception() is None]
+        heavy = pipeline.heavy_session_model()
+        return loaded + [heavy] if heavy is not None else loaded
+
+
+class RequestLimiter:
+    """
+    동시 처리 제한과 대기열 (백프레셔)
+    workers: 동시에 추론/인코딩하는 이미지 수, queue_size: 자리를 기다릴 수 있는 요청 수
+    둘 다 차 있으면 새 요청은 바로 503으로 거절 (클라이언트는 Retry-After 후 재시도)
+    """
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._slots = threading.BoundedSemaphore(workers)
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._busy = 0
+
+    def admit(self):
+        """요청 접수 (대기열이 가득 차면 False)"""
+        with self._lock:
+            if self._admitted >= self.workers + self.queue_size:
+                return False
+            self._admitted += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self._admitted -= 1
+
+    @contextmanager
+    def slot(self):
+        """처리 자리 하나 사용 (빌 때까지 대기)"""
+        with self._slots:
+            with self._lock:
+                self._busy += 1
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._busy -= 1
+
+    def status(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'busy': self._busy,
+                'waiting': self._admitted - self._busy,
+            }
+
+
+def _query_value(query, name, default=None):
+    values = query.get(name)
+    return values[-1] if values else default
+
+
+def _query_flag(query, name, default=False):
+    value = _query_value(query, name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes", "on", "")
+
+
+def _query_int(query, name, default):
+    value = _query_value(query, name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise BadRequest(f"{name}은(는) 정수여야 합니다: {value}")
+
+
+def settings_from_query(query):
+    """쿼리 문자열로 배경 제거 설정 생성 (cli.py remove 옵션과 같은 의미)"""
+    settings = pipeline.RemovalSettings(
+        model=_query_value(query, "model", "u2netp"),
+        alpha_matting=_query_flag(query, "alpha_matting"),
+        foreground_threshold=_query_int(query, "fg_threshold", 270),
+        background_threshold=_query_int(query, "bg_threshold", 10),
+        erode_size=_query_int(query, "erode_size", 10),
+        maintain_aspect=not _query_flag(query, "stretch"),
+        output_format=_query_value(query, "format", "png"),
+        png_compress_level=min(9, max(0, _query_int(query, "png_level", processing.DEFAULT_PNG_COMPRESS_LEVEL))),
+    )
+    if settings.model not in pipeline.model_options():
+        raise BadRequest(f"알 수 없는 모델: {settings.model}")
+    if settings.output_format not in processing.OUTPUT_FORMATS:
+        raise BadRequest(f"지원하지 않는 출력 형식: {settings.output_format}")
+
+    if _query_value(query, "proxy") is not None:
+        settings.proxy_inference = True
+        # 값 없이 ?proxy만 주면 기본 크기
+        settings.proxy_max_side = (_query_int(query, "proxy", 0) if _query_value(query, "proxy") else 0) or \
+            processing.DEFAULT_PROXY_MAX_SIDE
+
+    resize = _query_value(query, "resize")
+    if resize:
+        try:
+            settings.resize_width, settings.resize_height = (int(value) for value in resize.lower().split("x"))
+        except ValueError:
+            raise BadRequest(f"resize는 가로x세로 형식이어야 합니다: {resize}")
+        settings.resize = True
+        settings.resize_before_inference = _query_flag(query, "prescale")
+    return settings
+
+
+def parse_multipart(content_type, body):
+    """multipart/form-data 본문 → [(파일 이름, bytes)] (보낸 순서 유지)"""
+    message = BytesParser(policy=policy.HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+    )
+    if not message.is_multipart():
+        raise BadRequest("multipart 본문을 해석할 수 없습니다")
+
+    files = []
+    for index, part in enumerate(message.iter_parts()):
+        data = part.get_payload(decode=True)
+        if not data:
+            continue
+        filename = part.get_filename() or part.get_param("name", header="content-disposition") or f"image_{index}"
+        files.append((filename, data))
+    return files
+
+
+class RemovalRequestHandler(BaseHTTPRequestHandler):
+    """배경 제거/애니메이션 요청 처리 (요청마다 스레드 하나)"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive와 chunked 스트리밍 응답
+    server_version = "RemoveBG/1.0"
+
+    def log_message(self, format, *args):
+        log(f"🌐 {self.address_string()} {format % args}")
+
+    # 응답 헬퍼
+    def send_json(self, status, payload, headers=None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_bytes(self, data, content_type, filename=None, headers=None):
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if filename:
+            self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def read_body(self):
+        """요청 본문 읽기 (크기 제한 초과 시 413, 길이 없으면 411, 숫자가 아니거나 음수면 400) → bytes 또는 None(이미 응답함)"""
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self.close_connection = True
+            self.send_json(HTTPStatus.LENGTH_REQUIRED, {'error': "Content-Length가 필요합니다"})
+            return None
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self.send_json(HTTPStatus.BAD_REQUEST, {'error': "Content-Length가 올바르지 않습니다"})
+            return None
+        if length > self.server.max_body_bytes:
+            # 본문을 읽지 않았으므로 연결을 재사용하지 않음
+            self.close_connection = True
+            self.send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                           {'error': f"본문이 너무 큽니다 (최대 {self.server.max_body_bytes // (1024 * 1024)}MB)"})
+            return None
+        return self.rfile.read(length)
+
+    # 라우팅
+    def do_GET(self):
+        if urlsplit(self.path).path == "/health":
+            self.send_json(HTTPStatus.OK, {
+                'status': "ok",
+                'models': self.server.sessions.loaded(),
+                **self.server.limiter.status(),
+            })
+        else:
+            self.send_json(HTTPStatus.NOT_FOUND, {'error': "알 수 없는 경로"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        handler = {"/remove": self.handle_remove, "/animate": self.handle_animate}.get(url.path)
+        if handler is None:
+            self.close_connection = True
+            self.send_json(HTTPStatus.NOT_FOUND, {'error': "알 수 없는 경로"})
+            return
+
+        # 대기열이 가득 차면 본문을 받기 전에 거절 (백프레셔)
+        if not self.server.limiter.admit():
+            self.close_connection = True
+            self.send_json(HTTPStatus.SERVICE_UNAVAILABLE, {'error': "대기열이 가득 찼습니다"}, {"Retry-After": "1"})
+            return
+
+        try:
+            body = self.read_body()
+            if body is None:
+                return
+            handler(parse_qs(url.query, keep_blank_values=True), body)
+        except BadRequest as e:
+            self.send_json(HTTPStatus.BAD_REQUEST, {'error': str(e)})
+        except Exception as e:
+            log(f"❌ 요청 처리 오류: {str(e)}")
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)})
+        finally:
+            self.server.limiter.leave()
+
+    def request_files(self, body):
+        """본문 → [(파일 이름, bytes)] (multipart면 여러 장, 아니면 본문 전체가 이미지 1장)"""
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("multipart/"):
+            return parse_multipart(content_type, body), True
+        return [("image", body)], False
+
+    # 배경 제거
+    def remove_one(self, data, settings):
+        """이미지 1장 배경 제거 → (인코딩된 결과, 처리 시간 ms)"""
+        session = self.server.sessions.get(settings.model)
+        with self.server.limiter.slot():
+            started = time.perf_counter()
+            image = pipeline.remove_image(pipeline.prescale_source(data, settings), session, settings)
+            image = pipeline.resize_image(image, settings)
+            encoded = processing.encode_image(image, settings.output_format, settings.png_compress_level)
+            return encoded, (time.perf_counter() - started) * 1000
+
+    def handle_remove(self, query, body):
+        settings = settings_from_query(query)
+        files, multipart = self.request_files(body)
+        if not files:
+            raise BadRequest("이미지가 없습니다")
+        content_type = OUTPUT_CONTENT_TYPES[settings.output_format]
+        suffix = processing.OUTPUT_SUFFIXES[settings.output_format]
+
+        if not multipart:
+            data, elapsed_ms = self.remove_one(files[0][1], settings)
+            self.send_bytes(data, content_type, headers={"X-Processing-Ms": f"{elapsed_ms:.1f}"})
+            return
+
+        # 여러 장: 처리되는 대로 multipart/mixed 파트를 chunked로 전송 (실패한 파일은 JSON 파트)
+        boundary = uuid.uuid4().hex
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", f"multipart/mixed; boundary={boundary}")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        for filename, data in files:
+            stem = filename.rsplit(".", 1)[0]
+            try:
+                result, elapsed_ms = self.remove_one(data, settings)
+                part_headers = (
+                    f"Content-Type: {content_type}\r\n"
+                    f'Content-Disposition: attachment; filename="{stem}{suffix}"\r\n'
+                    f"X-Processing-Ms: {elapsed_ms:.1f}\r\n"
+                )
+            except Exception as e:
+                log(f"❌ 오류 ({filename}): {str(e)}")
+                result = json.dumps({'filename': filename, 'error': str(e)}, ensure_ascii=False).encode("utf-8")
+                part_headers = "Content-Type: application/json; charset=utf-8\r\n"
+            self.write_chunk(f"--{boundary}\r\n{part_headers}\r\n".encode("utf-8") + result + b"\r\n")
+
+        self.write_chunk(f"--{boundary}--\r\n".encode("ascii"))
+        self.write_chunk(b"")
+
+    # 애니메이션
+    def handle_animate(self, query, body):
+        format_type = _query_value(query, "format", "webp")
+        if format_type not in ANIMATION_CONTENT_TYPES:
+            raise BadRequest(f"지원하지 않는 애니메이션 형식: {format_type}")
+        duration = _query_int(query, "duration", 100)
+        quality = _query_int(query, "quality", 80)
+        loop = _query_flag(query, "loop", True)
+        prevent_ghost = _query_flag(query, "prevent_ghost", True)
+
+        files, _multipart = self.request_files(body)
+        if _query_value(query, "order") == "name":
+            files.sort(key=lambda item: file_utils.natural_sort_key(item[0]))
+        if len(files) < 2:
+            raise BadRequest("애니메이션을 만들려면 최소 2개 이상의 프레임이 필요합니다")
+
+        with self.server.limiter.slot():
+            started = time.perf_counter()
+            frames = [Image.open(io.BytesIO(data)).convert('RGBA') for _filename, data in files]
+            if prevent_ghost:
+                size = (max(frame.width for frame in frames), max(frame.height for frame in frames))
+                frames = [animation.center_on_canvas(frame, size) for frame in frames]
+            data = animation.encode_animation(frames, format_type, duration, loop, quality, prevent_ghost)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.send_bytes(data, ANIMATION_CONTENT_TYPES[format_type], headers={"X-Processing-Ms": f"{elapsed_ms:.1f}"})
+
+
+class RemovalServer(ThreadingHTTPServer):
+    """요청마다 스레드를 만들고, 세션 캐시와 동시 처리 제한을 공유하는 HTTP 서버"""
+
+    daemon_threads = True
+
+    def __init__(self, address, workers=1, queue_size=8, max_body_mb=DEFAULT_MAX_BODY_MB):
+        super().__init__(address, RemovalRequestHandler)
+        self.sessions = SessionCache()
+        self.limiter = RequestLimiter(max(1, workers), max(0, queue_size))
+        self.max_body_bytes = max_body_mb * 1024 * 1024
+
+
+def build_parser():
+    """명령줄 인자 파서 생성"""
+    parser = argparse.ArgumentParser(description="로컬 배경 제거 HTTP 서버")
+    parser.add_argument("--host", default="127.0.0.1", help="바인딩 주소 (기본값: 이 컴퓨터에서만 접속)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=1, help="동시에 처리할 이미지 수")
+    parser.add_argument("--queue-size", type=int, default=8, help="처리 자리를 기다릴 수 있는 요청 수 (넘으면 503)")
+    parser.add_argument("--max-body-mb", type=int, default=DEFAULT_MAX_BODY_MB, help="요청 본문 최대 크기(MB)")
+    parser.add_argument("--preload", nargs="*", default=["u2netp"], metavar="MODEL",
+                        choices=list(pipeline.model_options().keys()), help="시작할 때 미리 로딩할 모델")
+    return parser
+
+
+def main(argv=None):
+    """메인 함수"""
+    args = build_parser().parse_args(argv)
+    server = RemovalServer((args.host, args.port), args.workers, args.queue_size, args.max_body_mb)
+    for model_name in args.preload:
+        server.sessions.get(model_name)
+
+    host, port = server.server_address[:2]
+    log(f"🚀 서버 시작: http://{host}:{port} (동시 처리 {server.limiter.workers}개, "
+        f"대기열 {server.limiter.queue_size}개, Ctrl+C로 종료)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log("⏹️ 서버를 종료합니다.")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
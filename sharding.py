@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+여러 컴퓨터로 한 폴더 나눠 처리하기 (공유 파일 시스템)
+--shard i/N: 입력 폴더 기준 상대 경로의 해시로 파일을 N개로 나누고 i번째 몫만 처리
+작업 가로채기: 자기 몫을 끝낸 노드가 다른 노드의 남은 파일을 잠금 파일(원자적 생성)로 가져가서 처리
+출력 이름은 모든 노드가 같은 파일 목록으로 똑같이 정하므로, 같은 출력 폴더에 써도 이름이 겹치지 않음
+"""
+
+import hashlib
+import os
+import socket
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+
+from file_utils import PathAllocator, atomic_output
+
+# 다른 노드의 잠금을 오래된 것으로 보고 가져갈 때까지의 시간 (초, 0이면 가져가지 않음)
+DEFAULT_LOCK_TIMEOUT = 600
+
+# 잠금 파일 폴더 (출력 폴더 안, 모든 노드가 공유)
+LOCK_FOLDER_NAME = ".shard-locks"
+LOCK_DONE = "done"
+
+
+@dataclass
+class ShardSpec:
+    """분할 처리 설정 (작업 저장소의 작업 설정에 함께 저장되어 이어서 처리할 때 복원)"""
+    index: int = 1  # 1부터 count까지
+    count: int = 1
+    work_stealing: bool = False
+    lock_timeout: float = DEFAULT_LOCK_TIMEOUT
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        """저장된 설정 복원 (없으면 None)"""
+        if not data:
+            return None
+        names = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
+
+    def owns(self, relative_key):
+        """이 노드 몫의 파일인지"""
+        return shard_of(relative_key, self.count) == self.index - 1
+
+    @property
+    def label(self):
+        """파일 이름용 표시 (shard-2-of-4)"""
+        return f"shard-{self.index}-of-{self.count}"
+
+    @property
+    def owner(self):
+        """잠금 파일에 기록할 노드 이름 (같은 노드가 다시 실행하면 자기 잠금을 이어받음)"""
+        return f"{socket.gethostname()} {self}"
+
+
+def parse_shard(text):
+    """'i/N' 형식 분할 지정 파싱 → (i, N), 잘못된 형식이면 ValueError"""
+    try:
+        index, count = (int(value) for value in text.split("/"))
+    except ValueError:
+        raise ValueError(f"분할은 i/N 형식이어야 합니다: {text}")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"분할 번호는 1부터 {max(count, 1)}까지입니다: {text}")
+    return index, count
+
+
+def shard_of(relative_key, count):
+    """상대 경로 → 0부터 count-1까지의 분할 번호 (프로세스마다 바뀌는 hash() 대신 SHA-1 사용)"""
+    digest = hashlib.sha1(relative_key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def shared_output_folder(folder, output_root):
+    """모든 노드가 함께 쓰는 출력 폴더 (이름_2처럼 새로 만들지 않고 같은 이름 폴더 사용)"""
+    output_folder = Path(output_root) / Path(folder).name
+    output_folder.mkdir(parents=True, exist_ok=True)
+    return output_folder
+
+
+def plan_outputs(folder, image_files, output_suffix):
+    """
+    정렬된 전체 파일 목록 → [(이미지 경로, 출력 상대 경로)]
+    기존 출력 폴더 내용을 보지 않고 목록만으로 이름을 정하므로 모든 노드에서 결과가 같음
+    (a.jpg와 a.png가 함께 있으면 a.png, a_2.png), 다시 실행하면 같은 이름에 덮어씀
+    """
+    folder = Path(folder)
+    allocators = {}
+    planned = []
+    for image_path in image_files:
+        relative_path = image_path.relative_to(folder)
+        allocator = allocators.get(relative_path.parent)
+        if allocator is None:
+            allocator = allocators[relative_path.parent] = PathAllocator(relative_path.parent, taken=())
+        planned.append((image_path, allocator.allocate(image_path.stem + output_suffix)))
+    return planned
+
+
+def order_for_shard(folder, planned, shard):
+    """
+    이 노드가 처리할 순서의 [(이미지 경로, 출력 상대 경로)]
+    작업 가로채기를 쓰면 자기 몫 뒤에 다른 노드 몫을 다음 번호 노드부터 이어 붙임
+    (가로채는 노드들이 같은 노드의 파일에 몰리지 않도록)
+    """
+    folder = Path(folder)
+    buckets = [[] for _ in range(shard.count)]
+    for item in planned:
+        buckets[shard_of(item[0].relative_to(folder).as_posix(), shard.count)].append(item)
+    own = shard.index - 1
+    if not shard.work_stealing:
+        return buckets[own]
+    ordered = []
+    for offset in range(shard.count):
+        ordered.extend(buckets[(own + offset) % shard.count])
+    return ordered
+
+
+def report_path(output_folder, shard):
+    """노드별 실행 리포트 경로 (run_report.shard-i-of-N.json, 나중에 merge-reports로 합침)"""
+    return Path(output_folder) / f"run_report.{shard.label}.json"
+
+
+def find_shard_reports(output_folder):
+    """출력 폴더의 노드별 실행 리포트 목록"""
+    return sorted(Path(output_folder).glob("run_report.shard-*.json"))
+
+
+class LockDirectory:
+    """
+    공유 폴더의 파일별 잠금 (파일 하나를 한 노드만 처리하도록)
+    잠금 파일은 O_CREAT|O_EXCL로 원자적으로 만들고, 처리가 끝나면 완료 표시를 남김
+    완료 표시가 없는 잠금이 timeout초보다 오래되면 중단된 노드로 보고 가져감
+    (두 노드가 동시에 가져가면 한 파일을 두 번 처리할 수 있지만 출력 이름이 같아 결과는 같음)
+    """
+
+    def __init__(self, folder, owner, timeout=DEFAULT_LOCK_TIMEOUT):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.owner = owner
+        self.timeout = timeout
+        self.stolen = 0  # 오래된 잠금을 가져간 횟수 (로그용)
+
+    def _path(self, relative_key):
+        return self.folder / (hashlib.sha1(relative_key.encode("utf-8")).hexdigest() + ".lock")
+
+    def claim(self, relative_key):
+        """파일 처리 권한 획득 → 이 노드가 처리해야 하면 True"""
+        path = self._path(relative_key)
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return self._reclaim(path)
+        with os.fdopen(fd, "w", encoding="utf-8") as lock_file:
+            lock_file.write(self.owner)
+        return True
+
+    def _reclaim(self, path):
+        """이미 있는 잠금: 자기 잠금(재실행)이나 오래된 미완료 잠금이면 가져감"""
+        try:
+            content = path.read_text(encoding="utf-8")
+            age = time.time() - path.stat().st_mtime
+        except OSError:
+            return False
+        owner, _, state = content.partition("\n")
+        if state == LOCK_DONE:
+            return False
+        if owner == self.owner:
+            return True
+        # 내용이 비어 있으면 다른 노드가 방금 만들고 아직 쓰는 중
+        if not owner or not self.timeout or age < self.timeout:
+            return False
+        self._write(path, self.owner)
+        self.stolen += 1
+        return True
+
+    def finish(self, relative_key):
+        """처리 완료 표시 (다른 노드가 다시 가져가지 않음)"""
+        self._write(self._path(relative_key), f"{self.owner}\n{LOCK_DONE}")
+
+    @staticmethod
+    def _write(path, content):
+        with atomic_output(path) as temp_path:
+            Path(temp_path).write_text(content, encoding="utf-8")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+공유 메모리 이미지 전달 (프로세스 작업자용)
+디코딩한 배열을 pickle로 복사해 보내는 대신 공유 메모리 블록에 한 번 쓰고, 작업자에게는 핸들(블록 이름/모양)만 전달
+작업자는 같은 블록을 배열로 바로 보고(복사 없음), 결과도 조정 프로세스가 미리 잡아 둔 블록에 써서 핸들로 돌려줌
+블록은 풀에서 재사용하므로 이미지마다 공유 메모리를 새로 만들고 지우지 않음
+"""
+
+import sys
+import threading
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# 새 블록 크기 단위 (조금씩 다른 크기의 이미지가 같은 블록을 재사용할 수 있도록 올림)
+BLOCK_ALIGNMENT = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ArrayHandle:
+    """공유 메모리 블록 안의 배열 위치 (작업자에게 pickle로 보내는 것은 이 핸들뿐)"""
+    name: str
+    shape: tuple
+    dtype: str
+
+    @property
+    def nbytes(self):
+        return int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize
+
+
+def _open_block(name):
+    """이미 있는 블록 열기 (3.13 이상은 resource tracker에 등록하지 않음, 해제는 만든 프로세스가 담당)"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedBufferPool:
+    """
+    조정 프로세스 쪽 공유 메모리 블록 풀 (여러 스레드에서 사용 가능)
+    acquire로 충분히 큰 빈 블록을 빌리고(없으면 생성) release로 돌려놓음, close하면 모든 블록 삭제
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blocks = {}  # 이름 → SharedMemory
+        self._free = []  # 빌려주지 않은 블록 이름
+        self.created = 0  # 새로 만든 블록 수 (재사용 확인용)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _acquire_block(self, nbytes):
+        """nbytes 이상인 빈 블록 중 가장 작은 것을 빌림 (없으면 생성)"""
+        with self._lock:
+            candidates = [name for name in self._free if self._blocks[name].size >= nbytes]
+            if candidates:
+                name = min(candidates, key=lambda candidate: self._blocks[candidate].size)
+                self._free.remove(name)
+                return self._blocks[name]
+        size = -(-max(nbytes, 1) // BLOCK_ALIGNMENT) * BLOCK_ALIGNMENT
+        block = shared_memory.SharedMemory(create=True, size=size)
+        with self._lock:
+            self._blocks[block.name] = block
+            self.created += 1
+        return block
+
+    def allocate(self, shape, dtype=np.uint8):
+        """shape 배열을 담을 블록을 빌려 핸들 반환 (작업자가 결과를 쓸 자리)"""
+        dtype = np.dtype(dtype)
+        block = self._acquire_block(int(np.prod(shape)) * dtype.itemsize)
+        return ArrayHandle(block.name, tuple(int(value) for value in shape), dtype.str)
+
+    def put(self, array):
+        """배열을 블록에 복사하고 핸들 반환 (이후 작업자와 주고받을 때는 복사 없음)"""
+        array = np.asarray(array)
+        handle = self.allocate(array.shape, array.dtype)
+        self.view(handle)[...] = array
+        return handle
+
+    def view(self, handle):
+        """조정 프로세스에서 핸들의 배열 보기 (블록을 돌려놓기 전까지만 사용)"""
+        with self._lock:
+            block = self._blocks[handle.name]
+        return np.ndarray(handle.shape, dtype=handle.dtype, buffer=block.buf)
+
+    def release(self, handle):
+        """빌린 블록 돌려놓기 (다음 이미지에서 재사용)"""
+        with self._lock:
+            if handle.name in self._blocks and handle.name not in self._free:
+                self._free.append(handle.name)
+
+    def close(self):
+        """모든 블록 닫고 삭제 (작업자가 모두 끝난 뒤 호출)"""
+        with self._lock:
+            blocks = list(self._blocks.values())
+            self._blocks.clear()
+            self._free.clear()
+        for block in blocks:
+            try:
+                block.close()
+                block.unlink()
+            except (BufferError, OSError):
+                pass
+
+
+# 작업자 프로세스에서 연 블록 (프로세스가 끝날 때까지 열어 두고 재사용)
+_attached = {}
+
+
+def attach(handle):
+    """작업자 프로세스에서 핸들의 배열 보기 (복사 없음, 블록은 한 번만 열고 재사용)"""
+    block = _attached.get(handle.name)
+    if block is None:
+        block = _attached[handle.name] = _open_block(handle.name)
+    return np.ndarray(handle.shape, dtype=handle.dtype, buffer=block.buf)
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Alpha Matting 파라미터 탐색 (전경/배경 임계값, 침식 크기 조합)
+표본 이미지마다 모델 마스크를 한 번만 추론하고, 모든 조합의 trimap + matting을 작업자 프로세스에서 병렬 계산
+결과는 조합별 썸네일을 나란히 놓은 contact sheet(PNG)와 조합별 시간 리포트(JSON)로 저장
+"""
+
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+import file_utils
+import metrics
+import pipeline
+import preview
+import processing
+import shm_transport
+import worker_pool
+
+# 결과 폴더 (스크립트와 같은 위치)
+SWEEP_ROOT = Path(__file__).parent / "sweep"
+
+DEFAULT_SAMPLE_COUNT = 4
+DEFAULT_SWEEP_MAX_SIDE = 1024  # 표본 이미지를 이 크기로 줄여서 탐색 (0이면 원본 크기)
+DEFAULT_CELL_SIZE = 192  # contact sheet 썸네일 칸 크기
+LABEL_WIDTH = 150
+
+
+def _log(log, message):
+    """log 콜백이 있을 때만 메시지 출력"""
+    if log is not None:
+        log(message)
+
+
+@dataclass(frozen=True)
+class MattingParams:
+    """Alpha Matting 조합 하나"""
+    foreground_threshold: int
+    background_threshold: int
+    erode_size: int
+
+    @property
+    def label(self):
+        return f"fg {self.foreground_threshold} / bg {self.background_threshold} / erode {self.erode_size}"
+
+    def to_dict(self):
+        return {'fg': self.foreground_threshold, 'bg': self.background_threshold, 'erode': self.erode_size}
+
+
+def parse_values(text):
+    """
+    값 목록 파싱: '200,240,270' 또는 범위 '시작:끝:간격' (끝 포함), 둘을 쉼표로 섞어 써도 됨
+    """
+    values = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if ":" in part:
+            pieces = [int(piece) for piece in part.split(":")]
+            if len(pieces) not in (2, 3):
+                raise ValueError(f"범위는 시작:끝 또는 시작:끝:간격 형식이어야 합니다: {part}")
+            start, end = pieces[0], pieces[1]
+            step = pieces[2] if len(pieces) == 3 else 1
+            if step <= 0:
+                raise ValueError(f"범위 간격은 1 이상이어야 합니다: {part}")
+            values.extend(range(start, end + 1, step))
+        else:
+            values.append(int(part))
+    if not values:
+        raise ValueError(f"값이 없습니다: {text}")
+    return list(dict.fromkeys(values))
+
+
+def parameter_grid(fg_values, bg_values, erode_values):
+    """모든 조합 목록 (전경 → 배경 → 침식 순으로 정렬)"""
+    return [MattingParams(fg, bg, erode) for fg, bg, erode in itertools.product(fg_values, bg_values, erode_values)]
+
+
+def sample_images(folder, count=DEFAULT_SAMPLE_COUNT, recursive=False):
+    """폴더에서 고르게 떨어진 표본 이미지 count장 (자연 정렬 기준, 매번 같은 표본)"""
+    image_files = file_utils.list_image_files(folder, pipeline.SUPPORTED_FORMATS, recursive=recursive, natural=True)
+    if count <= 0 or len(image_files) <= count:
+        return image_files
+    if count == 1:
+        return [image_files[len(image_files) // 2]]
+    return [image_files[round(index * (len(image_files) - 1) / (count - 1))] for index in range(count)]
+
+
+def _thumbnail(image, cell_size):
+    thumb = image.copy()
+    thumb.thumbnail((cell_size, cell_size), Image.Resampling.LANCZOS)
+    return thumb
+
+
+def _evaluate(image_handle, mask_handle, params, cell_size, erode_size):
+    """
+    작업자 프로세스에서 실행: 공유 메모리의 이미지/마스크로 조합 하나 계산 → (소요 시간, 경계 비율, 썸네일)
+    erode_size: 축소한 표본 크기에 맞춘 침식 크기 (params.erode_size는 원본 픽셀 기준)
+    경계 비율: 알파가 0도 255도 아닌 픽셀 비율 (높을수록 부드러운 경계)
+    """
+    image = Image.fromarray(shm_transport.attach(image_handle))
+    mask = Image.fromarray(shm_transport.attach(mask_handle))
+    started = time.perf_counter()
+    # 프로세스끼리 코어를 나눠 쓰므로 타일 계산은 프로세스마다 스레드 하나
+    result = pipeline.matting_from_mask(
+        image, mask, params.foreground_threshold, params.background_threshold, erode_size, workers=1
+    )
+    elapsed = time.perf_counter() - started
+    alpha = np.asarray(result.getchannel('A'))
+    soft = float(np.count_nonzero((alpha > 0) & (alpha < 255))) / alpha.size
+    return elapsed, soft, _thumbnail(result, cell_size)
+
+
+def run_sweep(image_paths, grid, session, max_side=DEFAULT_SWEEP_MAX_SIDE, workers=None,
+              cell_size=DEFAULT_CELL_SIZE, log=None):
+    """
+    파라미터 탐색 실행 → (리포트 dict, contact sheet PIL Image)
+    이미지마다 마스크를 한 번 추론한 뒤 (이미지, 조합) 작업을 작업자 프로세스 workers개(기본값: 코어 수)에 나눠 계산
+    이미지와 마스크는 공유 메모리로 한 번만 올리고 작업자에게는 핸들만 전달
+    침식 크기는 원본 픽셀 기준: max_side로 축소한 표본에는 축소 비율만큼 줄여 적용 (미리보기와 같은 방식)
+    """
+    import pymatting  # noqa: F401 - 의존성 없으면 작업자를 띄우기 전에 ImportError
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    samples = []  # 이미지별 {'path', 'size', 'infer_ms', 'baseline'(마스크만 사용한 썸네일)}
+    handles = []  # 이미지별 (이미지 핸들, 마스크 핸들)
+    times = {params: [None] * len(image_paths) for params in grid}
+    soft = {params: [None] * len(image_paths) for params in grid}
+    thumbs = {params: [None] * len(image_paths) for params in grid}
+    errors = []
+    started = time.perf_counter()
+
+    context = multiprocessing.get_context("fork" if worker_pool.fork_available() else "spawn")
+    with shm_transport.SharedBufferPool() as buffers:
+        # 마스크 추론 (이미지마다 한 번, 이 프로세스의 세션 사용)
+        for path in image_paths:
+            image = processing.load_rgb_image(processing.open_input(path))
+            original_size = image.size
+            if max_side and max(image.size) > max_side:
+                image = image.resize(processing.proxy_size(image.size, max_side), Image.Resampling.LANCZOS)
+            infer_started = time.perf_counter()
+            mask = pipeline.mask_channel(processing.predict_mask(image, session))
+            infer_ms = (time.perf_counter() - infer_started) * 1000
+            _log(log, f"🖼️ 마스크 추론: {Path(path).name} ({image.size[0]}x{image.size[1]}, {infer_ms:.0f}ms)")
+            samples.append({
+                'path': str(path),
+                'original_size': list(original_size),
+                'size': list(image.size),
+                'infer_ms': round(infer_ms, 2),
+                'baseline': _thumbnail(processing.naive_cutout(image, mask), cell_size),
+                'erode_scale': round(max(image.size) / max(original_size), 4),
+            })
+            handles.append((buffers.put(np.asarray(image)), buffers.put(np.asarray(mask))))
+
+        total = len(grid) * len(image_paths)
+        _log(log, f"🔬 조합 {len(grid)}개 x 이미지 {len(image_paths)}장 = {total}건을 작업자 프로세스 {workers}개로 계산")
+        if any(sample['size'] != sample['original_size'] for sample in samples):
+            _log(log, "  📏 침식 크기는 원본 픽셀 기준 (축소한 표본에는 축소 비율만큼 줄여 적용)")
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        try:
+            futures = {}
+            for params in grid:
+                for index, (image_handle, mask_handle) in enumerate(handles):
+                    erode_size = processing.scaled_erode_size(
+                        params.erode_size, samples[index]['size'], samples[index]['original_size']
+                    )
+                    future = executor.submit(_evaluate, image_handle, mask_handle, params, cell_size, erode_size)
+                    futures[future] = (params, index)
+
+            done = 0
+            for future in as_completed(futures):
+                params, index = futures[future]
+                done += 1
+                try:
+                    times[params][index], soft[params][index], thumbs[params][index] = future.result()
+                except Exception as e:
+                    errors.append({'params': params.to_dict(), 'image': samples[index]['path'], 'error': str(e)})
+                    _log(log, f"❌ 계산 실패 ({params.label}, {Path(samples[index]['path']).name}): {str(e)}")
+                if done % max(1, total // 10) == 0 or done == total:
+                    _log(log, f"  ⏳ {done}/{total}")
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    combinations = []
+    for params in grid:
+        measured = sorted(value for value in times[params] if value is not None)
+        combinations.append({
+            **params.to_dict(),
+            'total_ms': round(sum(measured) * 1000, 2),
+            'p50_ms': round(metrics.percentile(measured, 50) * 1000, 2),
+            'max_ms': round(measured[-1] * 1000, 2) if measured else None,
+            'per_image_ms': [round(value * 1000, 2) if value is not None else None for value in times[params]],
+            'soft_edge_pct': [round(value * 100, 3) if value is not None else None for value in soft[params]],
+        })
+
+    report = {
+        'created_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'elapsed_s': round(elapsed, 3),
+        'workers': workers,
+        'max_side': max_side,
+        'erode_units': "original_px",  # 조합의 erode는 원본 픽셀 기준 (표본별 적용 배율은 images[].erode_scale)
+        'images': [{key: value for key, value in sample.items() if key != 'baseline'} for sample in samples],
+        'combinations': combinations,
+        'errors': errors,
+    }
+    sheet = contact_sheet(samples, grid, thumbs, combinations, cell_size)
+    return report, sheet
+
+
+def contact_sheet(samples, grid, thumbs, combinations, cell_size=DEFAULT_CELL_SIZE):
+    """
+    contact sheet: 열은 표본 이미지, 첫 행은 마스크만 사용한 결과, 이후 행은 조합별 Alpha Matting 결과
+    왼쪽 칸에 조합과 이미지당 중앙값 시간 표시 (투명 영역은 체크무늬)
+    """
+    header = 24
+    columns = len(samples)
+    rows = len(grid) + 1
+    sheet = Image.new('RGB', (LABEL_WIDTH + columns * cell_size, header + rows * cell_size), (255, 255, 255))
+    draw = ImageDraw.Draw(sheet)
+
+    for column, sample in enumerate(samples):
+        name = Path(sample['path']).name
+        if len(name) > 28:
+            name = name[:25] + "..."
+        draw.text((LABEL_WIDTH + column * cell_size + 4, 6), name, fill=(0, 0, 0))
+
+    labels = [("mask only", f"infer p50 {metrics.percentile(sorted(s['infer_ms'] for s in samples), 50):.0f} ms")]
+    labels += [(params.label.replace(" / ", "\n"), f"p50 {combination['p50_ms']:.0f} ms")
+               for params, combination in zip(grid, combinations)]
+    row_thumbs = [[sample['baseline'] for sample in samples]] + [thumbs[params] for params in grid]
+
+    for row, ((title, timing), images) in enumerate(zip(labels, row_thumbs)):
+        top = header + row * cell_size
+        draw.line([(0, top), (sheet.size[0], top)], fill=(222, 226, 230))
+        draw.multiline_text((6, top + 6), f"{title}\n{timing}", fill=(0, 0, 0))
+        for column, thumb in enumerate(images):
+            left = LABEL_WIDTH + column * cell_size
+            if thumb is None:
+                draw.text((left + 6, top + 6), "failed", fill=(220, 53, 69))
+                continue
+            offset = ((cell_size - thumb.size[0]) // 2, (cell_size - thumb.size[1]) // 2)
+            sheet.paste(preview.checkerboard(thumb), (left + offset[0], top + offset[1]))
+    return sheet
+
@@ -0,0 +1,6 @@
+"""테스트에서 프로젝트 최상위 모듈(sharding, file_utils 등)을 불러올 수 있도록 경로 추가"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,40 @@
+"""PathAllocator 이름 중복 처리와 자연 정렬"""
+
+import os
+
+from file_utils import PathAllocator, natural_sort_key
+
+
+def test_allocate_suffixes_duplicates(tmp_path):
+    allocator = PathAllocator(tmp_path)
+    names = [allocator.allocate(name).name for name in ("a.png", "a.png", "b.png", "a.png", "a.jpg")]
+    assert names == ["a.png", "a_2.png", "b.png", "a_3.png", "a.jpg"]
+
+
+def test_allocate_skips_existing_files(tmp_path):
+    (tmp_path / "a.png").write_bytes(b"")
+    (tmp_path / "a_2.png").write_bytes(b"")
+    allocator = PathAllocator(tmp_path)
+    assert allocator.allocate("a.png").name == "a_3.png"
+    assert allocator.allocate("c.png").name == "c.png"
+
+
+def test_taken_replaces_folder_listing(tmp_path):
+    (tmp_path / "a.png").write_bytes(b"")
+    # taken을 주면 폴더를 읽지 않음 (이어서 처리할 때 기록된 이름만 사용)
+    assert PathAllocator(tmp_path, taken=[]).allocate("a.png").name == "a.png"
+    assert PathAllocator(tmp_path, taken=["b.png"]).allocate("b.png").name == "b_2.png"
+
+
+def test_allocate_respects_filesystem_case(tmp_path):
+    allocator = PathAllocator(tmp_path, taken=["A.png"])
+    expected = "a_2.png" if os.path.normcase("A") == os.path.normcase("a") else "a.png"
+    assert allocator.allocate("a.png").name == expected
+
+
+def test_natural_sort_key():
+    names = ["frame10.png", "frame2.png", "Frame1.png", "frame2b.png", "frame02.png"]
+    ordered = sorted(names, key=natural_sort_key)
+    assert ordered.index("Frame1.png") < ordered.index("frame2.png") < ordered.index("frame10.png")
+    assert ordered.index("frame2.png") < ordered.index("frame2b.png")
+    assert sorted(["b", "a10", "a9"], key=natural_sort_key) == ["a9", "a10", "b"]
@@ -0,0 +1,52 @@
+"""작업 저장소: 작업 상태, 파일별 완료 기록, 다시 열었을 때 복원"""
+
+from job_store import STATUS_DONE, STATUS_QUEUED, STATUS_RUNNING, JobStore
+
+
+def test_job_lifecycle(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    try:
+        job_id = store.add_job("remove", tmp_path / "images", settings={'model': "u2netp"})
+        job = store.get_job(job_id)
+        assert job['status'] == STATUS_QUEUED
+        assert job['settings'] == {'model': "u2netp"}
+
+        store.start_job(job_id, output_folder=tmp_path / "out", settings={'model': "u2net"})
+        job = store.get_job(job_id)
+        assert job['status'] == STATUS_RUNNING
+        assert job['output_folder'] == str(tmp_path / "out")
+        assert job['settings'] == {'model': "u2net"}
+
+        # 다시 시작할 때 값을 주지 않으면 이전 출력 폴더와 설정 유지
+        store.start_job(job_id)
+        assert store.get_job(job_id)['output_folder'] == str(tmp_path / "out")
+
+        store.finish_job(job_id)
+        assert store.get_job(job_id)['status'] == STATUS_DONE
+        assert store.pending_jobs("remove") == []
+    finally:
+        store.close()
+
+
+def test_completed_files_survive_reopen(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    store = JobStore(path)
+    job_id = store.add_job("remove", "images")
+    other_id = store.add_job("animate", "frames")
+    store.mark_file_done(job_id, "a.png", "out/a.png")
+    store.mark_file_done(job_id, "sub/a.png", "out/sub/a.png")
+    store.mark_file_done(job_id, "a.png", "out/a_2.png")  # 같은 파일을 다시 기록하면 덮어씀
+    store.close()
+
+    store = JobStore(path)
+    try:
+        assert store.completed_files(job_id) == {"a.png": "out/a_2.png", "sub/a.png": "out/sub/a.png"}
+        assert store.completed_files(other_id) == {}
+        assert [job['id'] for job in store.pending_jobs("remove")] == [job_id]
+        assert [job['id'] for job in store.pending_jobs("animate")] == [other_id]
+
+        store.remove_job(job_id)
+        assert store.get_job(job_id) is None
+        assert store.completed_files(job_id) == {}
+    finally:
+        store.close()
@@ -0,0 +1,64 @@
+"""노드별 실행 리포트 합치기"""
+
+import metrics
+
+
+def _report(started_at, finished_at, items, stages, **extra):
+    report = {
+        'created_at': "2026-01-01T00:00:00",
+        'started_at': started_at,
+        'finished_at': finished_at,
+        'items': items,
+        'elapsed_s': finished_at - started_at,
+        'items_per_sec': None,
+        'peak_rss_mb': None,
+        'stages': stages,
+    }
+    report.update(extra)
+    return report
+
+
+def _stage(count, total_ms, p50_ms, p95_ms, max_ms):
+    return {'count': count, 'total_ms': total_ms, 'p50_ms': p50_ms, 'p95_ms': p95_ms, 'max_ms': max_ms}
+
+
+def test_merge_spans_nodes_by_epoch_times():
+    # created_at(현지 시각)은 노드마다 시간대가 달라도 경과 시간은 epoch 시각으로 계산
+    first = _report(1000.0, 1010.0, 10, {}, created_at="2026-01-01T09:00:10", success=9, failed=1)
+    second = _report(1005.0, 1020.0, 20, {}, created_at="2026-01-01T00:00:20", success=20, peak_rss_mb=300.0)
+    merged = metrics.merge_reports([first, second])
+    assert merged['elapsed_s'] == 20.0
+    assert merged['items'] == 30
+    assert merged['items_per_sec'] == 1.5
+    assert (merged['started_at'], merged['finished_at']) == (1000.0, 1020.0)
+    assert (merged['success'], merged['failed']) == (29, 1)
+    assert merged['peak_rss_mb'] == 300.0
+    assert merged['nodes'] == 2
+
+
+def test_merge_stages():
+    first = _report(0.0, 1.0, 1, {'infer': _stage(1, 100.0, 100.0, 100.0, 100.0)})
+    second = _report(0.0, 1.0, 3, {'infer': _stage(3, 600.0, 200.0, 250.0, 300.0),
+                                   'encode': _stage(3, 30.0, 10.0, 10.0, 10.0)})
+    stages = metrics.merge_reports([first, second])['stages']
+    assert list(stages) == ['infer', 'encode']
+    assert stages['infer'] == _stage(4, 700.0, 175.0, 250.0, 300.0)  # p50은 횟수 가중 평균
+    assert stages['encode'] == _stage(3, 30.0, 10.0, 10.0, 10.0)
+
+
+def test_merge_falls_back_to_created_at_for_old_reports():
+    old = _report(0.0, 0.0, 5, {}, created_at="2026-01-01T00:00:10")
+    del old['started_at'], old['finished_at']
+    old['elapsed_s'] = 10.0
+    merged = metrics.merge_reports([old])
+    assert merged['elapsed_s'] == 10.0
+
+
+def test_timer_report_has_epoch_times():
+    timer = metrics.StageTimer()
+    with timer.stage("infer"):
+        pass
+    timer.count_item()
+    report = timer.report()
+    assert report['started_at'] <= report['finished_at']
+    assert report['stages']['infer']['count'] == 1
@@ -0,0 +1,124 @@
+"""분할 처리: 파일 분배, 노드 간 같은 출력 이름, 잠금 파일 가져가기/완료/오래된 잠금 회수"""
+
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+import sharding
+from sharding import LockDirectory, ShardSpec
+
+KEYS = [f"sub{index % 3}/frame_{index}.png" for index in range(200)]
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 7])
+def test_every_file_lands_in_exactly_one_shard(count):
+    specs = [ShardSpec(index=index, count=count) for index in range(1, count + 1)]
+    for key in KEYS:
+        assert sum(spec.owns(key) for spec in specs) == 1
+
+
+def test_shard_of_is_stable():
+    # 프로세스마다 바뀌는 hash()가 아니라 내용 해시이므로 노드가 달라도 같은 값
+    assert [sharding.shard_of(key, 4) for key in KEYS] == [sharding.shard_of(key, 4) for key in KEYS]
+    assert sharding.shard_of("a.png", 4) == int.from_bytes(
+        hashlib.sha1(b"a.png").digest()[:8], "big") % 4
+
+
+def test_parse_shard():
+    assert sharding.parse_shard("2/4") == (2, 4)
+    for text in ("0/4", "5/4", "1/0", "a/b", "2"):
+        with pytest.raises(ValueError):
+            sharding.parse_shard(text)
+
+
+def _make_files(folder, names):
+    paths = []
+    for name in names:
+        path = folder / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+        paths.append(path)
+    return paths
+
+
+def test_plan_outputs_is_identical_on_every_node(tmp_path):
+    folder = tmp_path / "images"
+    files = _make_files(folder, ["a.jpg", "a.png", "b.png", "sub/a.png"])
+    planned = sharding.plan_outputs(folder, files, ".png")
+    assert [(path.relative_to(folder).as_posix(), output.as_posix()) for path, output in planned] == [
+        ("a.jpg", "a.png"), ("a.png", "a_2.png"), ("b.png", "b.png"), ("sub/a.png", "sub/a.png"),
+    ]
+
+    # 출력 폴더를 보지 않고 입력 목록만으로 정하므로 다른 노드가 먼저 저장해도 이름이 같음
+    (tmp_path / "a.png").write_bytes(b"")
+    assert sharding.plan_outputs(folder, files, ".png") == planned
+
+
+def test_order_for_shard(tmp_path):
+    folder = tmp_path / "images"
+    files = _make_files(folder, [f"{index}.png" for index in range(30)])
+    planned = sharding.plan_outputs(folder, files, ".png")
+
+    own = sharding.order_for_shard(folder, planned, ShardSpec(index=2, count=3))
+    assert own and all(sharding.shard_of(path.relative_to(folder).as_posix(), 3) == 1 for path, _ in own)
+
+    stealing = sharding.order_for_shard(folder, planned, ShardSpec(index=2, count=3, work_stealing=True))
+    assert stealing[:len(own)] == own
+    assert sorted(stealing) == sorted(planned)
+
+
+def test_lock_claim_and_finish(tmp_path):
+    first = LockDirectory(tmp_path, "node-a 1/2")
+    second = LockDirectory(tmp_path, "node-b 2/2")
+    assert first.claim("a.png")
+    assert not second.claim("a.png")
+    # 같은 노드가 다시 실행하면 자기 잠금을 이어받음
+    assert first.claim("a.png")
+
+    first.finish("a.png")
+    assert not second.claim("a.png")
+    assert not first.claim("a.png")
+
+
+def _age_lock(directory, key, seconds):
+    path = directory._path(key)
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+    return path
+
+
+def test_stale_lock_is_reclaimed(tmp_path):
+    crashed = LockDirectory(tmp_path, "node-a 1/2")
+    survivor = LockDirectory(tmp_path, "node-b 2/2", timeout=60)
+    assert crashed.claim("a.png")
+    assert not survivor.claim("a.png")
+
+    path = _age_lock(crashed, "a.png", 120)
+    assert survivor.claim("a.png")
+    assert survivor.stolen == 1
+    assert Path(path).read_text(encoding="utf-8") == "node-b 2/2"
+    assert not crashed.claim("a.png")
+
+
+def test_finished_or_fresh_locks_are_not_reclaimed(tmp_path):
+    owner = LockDirectory(tmp_path, "node-a 1/2")
+    never = LockDirectory(tmp_path, "node-b 2/2", timeout=0)
+    other = LockDirectory(tmp_path, "node-c 3/3", timeout=60)
+
+    assert owner.claim("done.png")
+    owner.finish("done.png")
+    _age_lock(owner, "done.png", 120)
+    assert not other.claim("done.png")
+
+    assert owner.claim("running.png")
+    _age_lock(owner, "running.png", 120)
+    assert not never.claim("running.png")  # timeout 0: 가져가지 않음
+
+    # 다른 노드가 방금 만들고 아직 쓰지 않은 빈 잠금
+    empty = owner._path("empty.png")
+    empty.write_text("", encoding="utf-8")
+    _age_lock(owner, "empty.png", 120)
+    assert not other.claim("empty.png")
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+폴더 감시 모드 (새로 들어오거나 바뀐 이미지만 계속 배경 제거)
+Linux는 inotify, 그 외(또는 inotify를 쓸 수 없거나 NFS/SMB 같은 네트워크 공유 폴더일 때)는 주기적 폴더 검사로 변경 감지
+연속으로 쓰이는 파일은 debounce 시간 동안 변경이 없을 때 한 번만 처리하고,
+결과는 transparent/ 아래 입력 폴더 구조 그대로(같은 이름 덮어쓰기) 저장
+(a.jpg와 a.png처럼 확장자만 다른 입력이 같은 폴더에 있으면 원본 파일 이름 전체로 a.jpg.png, a.png.png 저장)
+"""
+
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+import animation
+import file_utils
+import pipeline
+import processing
+from file_utils import PathAllocator
+
+DEFAULT_DEBOUNCE = 2.0  # 마지막 변경 후 이 시간(초) 동안 조용하면 처리
+DEFAULT_POLL_INTERVAL = 2.0
+
+# 다른 컴퓨터에서 쓴 파일은 inotify 이벤트가 오지 않는 파일 시스템 (/proc/mounts의 형식 이름, 앞부분 일치)
+NETWORK_FILESYSTEMS = ("nfs", "cifs", "smb", "fuse.sshfs", "9p")
+
+
+def _log(log, message):
+    """log 콜백이 있을 때만 메시지 출력"""
+    if log is not None:
+        log(message)
+
+
+def _is_candidate(path):
+    """배경 제거 대상 이미지 파일인지 (쓰는 중인 임시 파일 제외)"""
+    return path.suffix.lower() in pipeline.SUPPORTED_FORMATS and not path.name.endswith(file_utils.PARTIAL_SUFFIX)
+
+
+def _load_frame(path):
+    """출력 파일 → RGBA 프레임 (npy는 RGBA 배열로 저장됨)"""
+    if path.suffix == ".npy":
+        return Image.fromarray(np.load(path))
+    with Image.open(path) as image:
+        return image.convert('RGBA')
+
+
+def _unescape_mount_path(value):
+    """/proc/mounts 경로의 8진수 이스케이프(공백 → \\040 등) 복원"""
+    return re.sub(r"\\([0-7]{3})", lambda match: chr(int(match.group(1), 8)), value)
+
+
+def network_filesystem(folder, mounts_path="/proc/mounts"):
+    """폴더가 네트워크 파일 시스템에 있으면 그 형식 이름 (nfs4, cifs 등), 아니면 None (/proc/mounts가 없으면 None)"""
+    try:
+        with open(mounts_path, encoding="utf-8", errors="replace") as mounts:
+            entries = [line.split() for line in mounts]
+    except OSError:
+        return None
+    folder = Path(folder).resolve()
+    best = None
+    for entry in entries:
+        if len(entry) < 3:
+            continue
+        mount_point = Path(_unescape_mount_path(entry[1]))
+        if folder.is_relative_to(mount_point) and (best is None or len(mount_point.parts) > len(best[0].parts)):
+            best = (mount_point, entry[2])
+    if best is not None and best[1].startswith(NETWORK_FILESYSTEMS):
+        return best[1]
+    return None
+
+
+class PollingWatcher:
+    """주기적으로 폴더를 다시 읽어 (수정 시각, 크기)가 바뀐 파일을 찾는 감시기"""
+
+    def __init__(self, folders, recursive=False, interval=DEFAULT_POLL_INTERVAL):
+        self.folders = [Path(folder) for folder in folders]
+        self.recursive = recursive
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for folder in self.folders:
+            for path in file_utils.iter_image_files(folder, pipeline.SUPPORTED_FORMATS, recursive=self.recursive):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout):
+        """최대 timeout초 대기 후 바뀐 파일 집합 반환"""
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._scan()
+        changed = {path for path, signature in snapshot.items() if self._snapshot.get(path) != signature}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify 감시기 (libc를 ctypes로 직접 호출, 쓰기가 끝나거나 이동해 온 파일만 보고)"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+    def __init__(self, folders, recursive=False):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify는 Linux에서만 사용할 수 있습니다")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.folders = [Path(folder) for folder in folders]
+        self.recursive = recursive
+        self._watches = {}
+        for folder in self.folders:
+            self._add_tree(folder)
+
+    def _add_watch(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"{os.strerror(errno)}: {directory}")
+        self._watches[wd] = Path(directory)
+
+    def _add_tree(self, directory):
+        """폴더(와 하위 폴더)에 감시 추가"""
+        self._add_watch(directory)
+        if self.recursive:
+            for current, dirs, _files in os.walk(directory):
+                for name in dirs:
+                    self._add_watch(os.path.join(current, name))
+
+    def _rescan(self, directory):
+        """새 폴더가 생기거나 이벤트가 넘친 경우: 폴더 안 파일을 모두 변경으로 간주"""
+        return set(file_utils.iter_image_files(directory, pipeline.SUPPORTED_FORMATS, recursive=self.recursive))
+
+    def wait(self, timeout):
+        """최대 timeout초 동안 이벤트를 기다려 바뀐 파일 집합 반환"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # 이벤트 대기열이 넘쳐 일부를 놓쳤으므로 전체 다시 확인
+                for folder in self.folders:
+                    changed |= self._rescan(folder)
+                continue
+            if mask & self.IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & self.IN_ISDIR:
+                if self.recursive and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    try:
+                        self._add_tree(path)
+                    except OSError:
+                        continue
+                    changed |= self._rescan(path)
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+def create_watcher(folders, recursive=False, polling=False, poll_interval=DEFAULT_POLL_INTERVAL, log=None):
+    """inotify 감시기 생성 (사용할 수 없거나, 네트워크 공유 폴더가 있거나, polling=True면 주기적 검사)"""
+    if not polling:
+        for folder in folders:
+            fstype = network_filesystem(folder)
+            if fstype is not None:
+                # 다른 컴퓨터가 쓴 파일은 inotify 이벤트가 오지 않아 아무 오류 없이 멈춘 것처럼 보이므로 검사로 전환
+                _log(log, f"⚠️ '{folder}'는 네트워크 공유 폴더({fstype})라 inotify로는 다른 컴퓨터의 변경을 알 수 없음. "
+                          "주기적 검사로 대체")
+                polling = True
+                break
+    if not polling:
+        try:
+            watcher = InotifyWatcher(folders, recursive=recursive)
+            _log(log, "👀 변경 감지: inotify")
+            return watcher
+        except (OSError, AttributeError) as e:
+            _log(log, f"⚠️ inotify를 사용할 수 없음 ({str(e)}). 주기적 검사로 대체")
+    _log(log, f"👀 변경 감지: {poll_interval:g}초마다 폴더 검사")
+    return PollingWatcher(folders, recursive=recursive, interval=poll_interval)
+
+
+class WatchDaemon:
+    """
+    감시 폴더 → transparent/ 미러 트리 배경 제거 (모델 세션은 한 번만 생성해 계속 사용)
+    animation_format을 지정하면 프레임이 바뀐 출력 폴더의 애니메이션을 animation/에 다시 생성
+    """
+
+    def __init__(self, folders, settings, session, output_root=pipeline.OUTPUT_ROOT,
+                 animation_format=None, animation_duration=100, debounce=DEFAULT_DEBOUNCE, log=None):
+        self.settings = settings
+        self.session = session
+        self.animation_format = animation_format
+        self.animation_duration = animation_duration
+        self.debounce = debounce
+        self.log = log
+        self.control = None
+        self.output_suffix = processing.OUTPUT_SUFFIXES[settings.output_format]
+
+        # 감시 폴더별 출력 폴더 (실행마다 같은 위치에 덮어쓰도록 폴더 이름 그대로, 이름이 겹치면 _2 ...)
+        output_root = Path(output_root)
+        names = PathAllocator(output_root, taken=[])
+        self.outputs = {}
+        for folder in folders:
+            folder = Path(folder).resolve()
+            self.outputs[folder] = names.allocate(folder.name)
+
+    def _stem_groups(self, directory, cache):
+        """폴더의 입력 파일을 확장자를 뺀 이름별로 묶은 dict (cache: 한 번의 처리 동안 폴더마다 한 번만 읽음)"""
+        groups = cache.get(directory)
+        if groups is None:
+            groups = {}
+            try:
+                entries = list(directory.iterdir())
+            except OSError:
+                entries = []
+            for path in entries:
+                if _is_candidate(path) and path.is_file():
+                    groups.setdefault(path.stem, []).append(path)
+            cache[directory] = groups
+        return groups
+
+    def output_path_for(self, image_path, cache=None):
+        """
+        입력 파일 → 미러 트리의 출력 경로 (감시 폴더 밖이면 None)
+        출력 이름은 같은 폴더의 입력 파일 이름만으로 정해짐 (처리 순서와 무관하게 항상 같은 입력 → 같은 출력):
+        확장자만 다른 입력이 있으면 a.jpg → a.jpg.png, 없으면 a.jpg → a.png
+        """
+        for folder, output_folder in self.outputs.items():
+            try:
+                relative_path = image_path.relative_to(folder)
+            except ValueError:
+                continue
+            siblings = self._stem_groups(image_path.parent, {} if cache is None else cache).get(image_path.stem, [])
+            if any(path != image_path for path in siblings):
+                name = image_path.name + self.output_suffix
+            else:
+                name = image_path.stem + self.output_suffix
+            return output_folder / relative_path.parent / name
+        return None
+
+    def _remove_renamed_output(self, image_path, output_path, cache):
+        """
+        확장자만 다른 입력이 생기거나 없어져 출력 이름이 바뀌었으면 예전 이름의 출력 삭제
+        (남겨 두면 애니메이션에 같은 프레임이 두 번 들어감)
+        """
+        if output_path.name == image_path.name + self.output_suffix:
+            # a.png → a.jpg.png: 묶음에 입력이 둘 이상이라 a.png를 출력으로 쓰는 입력은 없음
+            old_path = output_path.with_name(image_path.stem + self.output_suffix)
+        else:
+            # a.jpg.png → a.png: a.jpg.png가 다른 입력(a.jpg.webp 등)의 출력이면 남겨 둠
+            if self._stem_groups(image_path.parent, cache).get(image_path.name):
+                return
+            old_path = output_path.with_name(image_path.name + self.output_suffix)
+        try:
+            old_path.unlink()
+            _log(self.log, f"🧹 이름이 바뀐 이전 출력 삭제: {old_path}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            _log(self.log, f"⚠️ 이전 출력 삭제 실패 ({old_path.name}): {str(e)}")
+
+    def is_stale(self, image_path, output_path):
+        """출력이 없거나 원본보다 오래되었으면 True"""
+        try:
+            source_mtime = image_path.stat().st_mtime_ns
+        except OSError:
+            return False  # 처리 전에 삭제됨
+        try:
+            return output_path.stat().st_mtime_ns < source_mtime
+        except OSError:
+            return True
+
+    def process_file(self, image_path, output_path):
+        """이미지 하나 배경 제거 후 저장 → 성공 여부"""
+        try:
+            _log(self.log, f"🖼️ 처리 중: {image_path}")
+            input_source = pipeline.prescale_source(image_path, self.settings)
+            output_image = pipeline.remove_image(input_source, self.session, self.settings, log=self.log)
+            output_image = pipeline.resize_image(output_image, self.settings)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            processing.save_output(output_image, output_path, self.settings.output_format,
+                                   self.settings.png_compress_level)
+            _log(self.log, f"✅ 저장 완료: {output_path}")
+            return True
+        except Exception as e:
+            _log(self.log, f"❌ 오류 ({image_path.name}): {str(e)}")
+            return False
+
+    def process_paths(self, paths, changed=True):
+        """
+        바뀐 파일 처리 → 결과가 바뀐 출력 폴더 집합
+        changed=True(감시 이벤트): 받은 파일은 출력 시각과 관계없이 다시 처리
+        (탐색기 복사, cp -p, rsync -t처럼 예전 수정 시각을 유지한 채 바뀐 파일도 처리되도록)
+        changed=False(catch_up): 출력이 없거나 원본보다 오래된 파일만 처리
+        """
+        updated_folders = set()
+        cache = {}
+        changed_paths = set(paths) if changed else set()
+        # 확장자만 다른 입력이 생기면 묶음 전체의 출력 이름이 바뀌므로 같은 이름의 다른 입력도 함께 확인
+        paths = set(paths)
+        for image_path in list(paths):
+            paths.update(self._stem_groups(image_path.parent, cache).get(image_path.stem, []))
+        for image_path in sorted(paths, key=file_utils.natural_sort_key):
+            if self.control is not None:
+                self.control.checkpoint()
+            output_path = self.output_path_for(image_path, cache)
+            if output_path is None:
+                continue
+            if image_path in changed_paths:
+                if not image_path.is_file():
+                    continue  # 처리 전에 삭제됨
+            elif not self.is_stale(image_path, output_path):
+                # 함께 확인한 같은 이름의 다른 입력은 출력 이름이 바뀌었을 때만 다시 처리
+                continue
+            if self.process_file(image_path, output_path):
+                self._remove_renamed_output(image_path, output_path, cache)
+                updated_folders.add(output_path.parent)
+        return updated_folders
+
+    def rebuild_animation(self, output_folder):
+        """출력 폴더의 결과 프레임으로 애니메이션 다시 생성 (animation/폴더명.형식, 덮어쓰기)"""
+        # 출력 형식의 파일만 프레임으로 사용 (qoi/npy 출력이면 입력 확장자 목록으로는 찾을 수 없음)
+        frames = file_utils.list_image_files(output_folder, {self.output_suffix}, natural=True)
+        if len(frames) < 2:
+            return
+        output_root = next(root for root in self.outputs.values() if output_folder.is_relative_to(root))
+        name = "_".join((output_root.name,) + output_folder.relative_to(output_root).parts)
+        output_path = pipeline.ANIMATION_ROOT / f"{name}.{self.animation_format}"
+        try:
+            images = []
+            for frame_path in frames:
+                images.append(_load_frame(frame_path))
+            size = (max(image.width for image in images), max(image.height for image in images))
+            images = [animation.center_on_canvas(image, size) for image in images]
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with file_utils.atomic_output(output_path) as temp_path:
+                animation.save_animation(images, temp_path, self.animation_format, self.animation_duration)
+            _log(self.log, f"🎬 애니메이션 갱신 ({len(images)}프레임): {output_path}")
+        except Exception as e:
+            _log(self.log, f"❌ 애니메이션 생성 오류 ({name}): {str(e)}")
+
+    def catch_up(self, recursive=False):
+        """시작 시 한 번: 출력이 없거나 오래된 파일 처리 (감시를 멈춘 사이 들어온 파일)"""
+        paths = set()
+        for folder in self.outputs:
+            paths.update(file_utils.iter_image_files(folder, pipeline.SUPPORTED_FORMATS, recursive=recursive))
+        return self.process_paths(paths, changed=False)
+
+    def run(self, watcher, control=None):
+        """
+        control이 중지될 때까지 감시 (변경 → debounce → 처리 → 애니메이션 갱신)
+        중지되면 처리 중이던 파일을 저장한 뒤 ProcessingCancelled 발생
+        """
+        self.control = control
+        updated = self.catch_up(recursive=watcher.recursive)
+        if self.animation_format:
+            for output_folder in sorted(updated):
+                self.rebuild_animation(output_folder)
+
+        pending = {}  # 파일 → 마지막 변경 감지 시각
+        _log(self.log, f"👀 감시 중 (debounce {self.debounce:g}초, 중지하려면 Ctrl+C)")
+        while True:
+            if control is not None:
+                control.checkpoint()
+            timeout = self.debounce if pending else 1.0
+            for path in watcher.wait(timeout):
+                if _is_candidate(path):
+                    pending[path] = time.monotonic()
+
+            now = time.monotonic()
+            ready = {path for path, changed_at in pending.items() if now - changed_at >= self.debounce}
+            if not ready:
+                continue
+            for path in ready:
+                del pending[path]
+
+            updated = self.process_paths(ready)
+            if self.animation_format:
+                for output_folder in sorted(updated):
+                    self.rebuild_animation(output_folder)
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+프로세스 작업자 풀 배경 제거
+조정 프로세스가 이미지를 디코딩해 공유 메모리에 올리고, 작업자 프로세스가 추론한 RGBA 결과를 공유 메모리로 돌려줌
+(이미지 bytes나 배열을 pickle로 복사하지 않음, shm_transport 참고)
+fork를 쓸 수 있으면(Linux) 모델을 부모 프로세스에서 한 번만 로딩한 뒤 작업자를 fork하므로,
+작업자들이 모델 가중치 메모리를 copy-on-write로 공유 (작업자별 RSS/PSS/고유 메모리를 로그와 리포트에 기록)
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageOps
+
+import memory_budget
+import metrics
+import pipeline
+import processing
+import shm_transport
+from metrics import stage
+
+
+def _log(log, message):
+    """log 콜백이 있을 때만 메시지 출력"""
+    if log is not None:
+        log(message)
+
+
+# 작업자 프로세스의 모델 세션 (fork 방식이면 부모가 미리 로딩한 세션을 물려받음)
+_sessions = {}
+_worker_threads = None
+
+
+def process_memory(pid=None):
+    """
+    프로세스 메모리(MB): rss_mb(상주), pss_mb(공유 페이지를 나눠 계산한 몫), private_mb(이 프로세스만 쓰는 몫)
+    작업자를 더 띄울 때 늘어나는 메모리는 private_mb에 가까움 (Linux 외에는 최대 RSS만 확인 가능)
+    """
+    try:
+        values = {}
+        with open(f"/proc/{pid or 'self'}/smaps_rollup") as smaps:
+            for line in smaps:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                    values[key] = int(rest.split()[0]) / 1024
+        return {
+            'rss_mb': round(values['Rss'], 1),
+            'pss_mb': round(values['Pss'], 1),
+            'private_mb': round(values['Private_Clean'] + values['Private_Dirty'], 1),
+        }
+    except (OSError, KeyError, ValueError, IndexError):
+        peak = metrics.peak_rss_mb()
+        return {'peak_rss_mb': peak} if peak is not None else {}
+
+
+def fork_available():
+    """모델을 물려받는 fork 방식을 쓸 수 있는지 (Windows/macOS는 spawn만 안전)"""
+    if sys.platform != "linux" or "fork" not in multiprocessing.get_all_start_methods():
+        return False
+    # 이미 TBB/OpenMP로 초기화된 numba는 fork 후 종료할 때 멈출 수 있음 (cli.py가 작업자를 fork하는 명령만 workqueue로 지정)
+    numba = sys.modules.get("numba")
+    if numba is not None:
+        try:
+            return numba.threading_layer() == "workqueue"
+        except ValueError:
+            return os.environ.get("NUMBA_THREADING_LAYER") == "workqueue"
+    return True
+
+
+def bounded_workers(workers, model_name=None, log=None):
+    """
+    무거운 모델(pipeline.HEAVY_MODELS)이면 작업자 수를 모델 최대 수와 지금 쓸 수 있는 메모리 / 작업자당 메모리 추정으로 제한
+    """
+    workers = max(1, workers)
+    profile = pipeline.model_profile(model_name) if model_name else None
+    if profile is None:
+        return workers
+    limit = profile['max_workers']
+    available = memory_budget.available_memory_mb()
+    if available is not None:
+        limit = min(limit, max(1, int(available // profile['worker_mb'])))
+    if workers > limit:
+        memory = f", 가능한 메모리 {available:.0f}MB" if available is not None else ""
+        _log(log, f"⚠️ '{model_name}'은(는) 메모리를 많이 쓰는 모델이라 작업자 프로세스 {workers}개 → {limit}개로 제한 "
+                  f"(작업자당 약 {profile['worker_mb']}MB{memory})")
+    return min(workers, limit)
+
+
+def _session(model_name, threads, log=None):
+    """이 프로세스의 모델 세션 (무거운 모델은 pipeline이 프로세스에 하나만 유지하므로 여기서 따로 잡고 있지 않음)"""
+    session = _sessions.get(model_name)
+    if session is None:
+        session = pipeline.create_session(model_name, log=log, threads=threads)
+        if pipeline.model_profile(model_name) is None:
+            _sessions[model_name] = session
+    return session
+
+
+def _init_worker(model_name, threads):
+    """작업자 시작 시 실행 (spawn 방식이면 여기서 모델 로딩, fork 방식이면 물려받은 세션 사용)"""
+    global _worker_threads
+    _worker_threads = threads
+    if model_name:
+        _session(model_name, threads)
+
+
+def _worker_status():
+    """작업자 pid와 메모리"""
+    return os.getpid(), process_memory()
+
+
+def _remove_in_worker(input_handle, output_handle, settings):
+    """작업자 프로세스에서 실행: 공유 메모리 입력 → 배경 제거 → 결과를 공유 메모리에 기록 → (단계별 측정값, pid, 메모리)"""
+    timer = metrics.StageTimer()
+    session = _session(settings.model, _worker_threads)
+    image = Image.fromarray(shm_transport.attach(input_handle))
+    result = pipeline.remove_image(image, session, settings, timer=timer)
+    if result.mode != 'RGBA':
+        result = result.convert('RGBA')
+    shm_transport.attach(output_handle)[...] = np.asarray(result)
+    samples = timer.samples()
+    # 디코딩은 조정 프로세스에서 이미 측정 (여기서는 메모리의 배열을 감싸기만 함)
+    samples.pop("decode", None)
+    return samples, os.getpid(), process_memory()
+
+
+class RemovalPool:
+    """
+    프로세스 작업자 풀 (process_folder의 remove_pool로 전달)
+    submit은 디코딩과 공유 메모리 복사까지만 하고 바로 Future를 돌려주므로, 여러 이미지가 작업자에서 동시에 추론됨
+    """
+
+    def __init__(self, workers, model=None, log=None):
+        """
+        model: 미리 로딩할 모델 (fork 방식이면 부모에서 한 번만 로딩해 작업자가 공유, spawn 방식이면 작업자마다 시작할 때 로딩)
+        작업자마다 추론 스레드는 코어 수 / 작업자 수 (프로세스끼리 코어를 나눠 쓰도록)
+        무거운 모델은 작업자 수를 모델별 최대 수와 가능한 메모리로 제한 (bounded_workers 참고)
+        """
+        self.workers = bounded_workers(workers, model, log=log)
+        self.model = model
+        self.threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self.start_method = "fork" if fork_available() else "spawn"
+        self.worker_memory = {}  # pid → 마지막으로 확인한 메모리
+        self._buffers = shm_transport.SharedBufferPool()
+        self._log = log
+
+        if model and self.start_method == "spawn" and sys.platform == "linux":
+            _log(log, "⚠️ numba가 fork에 안전하지 않은 스레드 방식(TBB/OpenMP)으로 초기화되어 작업자마다 모델을 로딩합니다. "
+                      "(NUMBA_THREADING_LAYER=workqueue로 실행하면 모델 공유)")
+
+        started = time.perf_counter()
+        parent_before = process_memory()
+        if model and self.start_method == "fork":
+            # fork 전에 부모에서 로딩 → 작업자는 가중치 페이지를 복사하지 않고 공유 (쓰기가 생긴 페이지만 복사)
+            _session(model, self.threads, log=log)
+        self.parent_memory = {'before_preload': parent_before, 'after_preload': process_memory()}
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker,
+            initargs=(model, self.threads)
+        )
+        # 작업자를 지금 시작 (fork는 다른 스레드가 생기기 전에, spawn은 모델 로딩 실패를 바로 확인)
+        for future in [self._executor.submit(_worker_status) for _ in range(self.workers)]:
+            pid, memory = future.result()
+            self.worker_memory[pid] = memory
+
+        if self.start_method == "fork":
+            mode = "fork, 부모에서 로딩한 모델 공유" if model else "fork"
+        else:
+            mode = "spawn, 작업자마다 모델 로딩" if model else "spawn"
+        _log(log, f"🧵 작업자 프로세스 {self.workers}개 시작 ({mode}, 작업자당 추론 스레드 {self.threads}개, "
+                  f"{time.perf_counter() - started:.1f}s, 공유 메모리로 이미지 전달)")
+        for line in self.format_memory():
+            _log(log, line)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """작업자 종료 후 공유 메모리 블록 삭제"""
+        self._executor.shutdown(wait=True)
+        self._buffers.close()
+
+    def memory_report(self):
+        """실행 리포트용 작업자 메모리 정보"""
+        return {
+            'workers': self.workers,
+            'start_method': self.start_method,
+            'preloaded_model': self.model if self.start_method == "fork" else None,
+            'threads_per_worker': self.threads,
+            'parent': self.parent_memory,
+            'worker_memory': [{'pid': pid, **memory} for pid, memory in sorted(self.worker_memory.items())],
+        }
+
+    def format_memory(self):
+        """작업자별 메모리 로그 줄 목록"""
+        lines = []
+        parent = self.parent_memory
+        if self.model and self.start_method == "fork" and 'rss_mb' in parent['after_preload']:
+            loaded = parent['after_preload']['rss_mb'] - parent['before_preload'].get('rss_mb', 0)
+            lines.append(f"🧠 부모 프로세스 모델 로딩: +{loaded:.0f}MB (작업자와 공유)")
+        for pid, memory in sorted(self.worker_memory.items()):
+            if 'rss_mb' in memory:
+                lines.append(f"🧠 작업자 {pid}: RSS {memory['rss_mb']:.0f}MB, PSS {memory['pss_mb']:.0f}MB, "
+                             f"고유 {memory['private_mb']:.0f}MB")
+            elif memory:
+                lines.append(f"🧠 작업자 {pid}: 최대 RSS {memory['peak_rss_mb']:.0f}MB")
+        private = [memory['private_mb'] for memory in self.worker_memory.values() if 'private_mb' in memory]
+        if private:
+            lines.append(f"🧠 작업자 하나를 더 띄우면 약 {max(private):.0f}MB 추가 (고유 메모리 최댓값 기준)")
+        return lines
+
+    @property
+    def buffers_created(self):
+        """지금까지 만든 공유 메모리 블록 수 (나머지는 재사용)"""
+        return self._buffers.created
+
+    def submit(self, source, timer, settings):
+        """이미지 하나 배경 제거 요청 → RGBA PIL Image Future (source: 경로, PIL Image 또는 bytes)"""
+        with stage(timer, "decode"):
+            # EXIF 회전은 여기서 반영 (배열로 보내면 EXIF 정보가 없어짐)
+            image = ImageOps.exif_transpose(processing.open_input(source))
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+            input_handle = self._buffers.put(np.asarray(image))
+        del image
+        output_handle = self._buffers.allocate((input_handle.shape[0], input_handle.shape[1], 4))
+
+        result = Future()
+
+        def on_done(worker_future):
+            try:
+                samples, pid, memory = worker_future.result()
+                self.worker_memory[pid] = memory
+                # 블록은 다음 이미지가 재사용하므로 결과는 여기서 한 번 복사
+                image = Image.fromarray(np.array(self._buffers.view(output_handle)))
+                if timer is not None:
+                    timer.extend(samples)
+                result.set_result(image)
+            except BaseException as e:
+                result.set_exception(e)
+            finally:
+                self._buffers.release(input_handle)
+                self._buffers.release(output_handle)
+
+        try:
+            self._executor.submit(_remove_in_worker, input_handle, output_handle, settings).add_done_callback(on_done)
+        except BaseException:
+            self._buffers.release(input_handle)
+            self._buffers.release(output_handle)
+            raise
+        return result